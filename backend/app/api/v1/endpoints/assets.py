@@ -1,9 +1,16 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
 from app.auth import verify_jwt_token
 from app import schemas
 from app.supabase_client import get_supabase_client
+from app.cache import invalidate_dashboard_summary
+from app.storage_upload import open_multipart_file, safe_filename, upload_stream, document_url, create_signed_url, StorageUploadError, UPLOAD_MAX_BYTES, SIGNED_URL_TTL
+from app.logger import logger
+import httpx
 import uuid
 
+# Room for multipart boundaries and part headers on top of the file itself.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
 router = APIRouter()
 
 
@@ -27,6 +34,7 @@ def create_asset(asset: schemas.AssetCreate, user=Depends(verify_jwt_token)):
     result = supabase.table("assets").insert(data).execute()
     if result.get("error"):
         raise HTTPException(status_code=400, detail=result["error"]["message"])
+    invalidate_dashboard_summary(user_id)
     return result["data"][0] if result["data"] else {}
 
 @router.put("/{id}", summary="Update asset by id")
@@ -37,6 +45,7 @@ def update_asset(id: int, asset: schemas.AssetCreate, user=Depends(verify_jwt_to
     result = supabase.table("assets").update(data).eq("id", id).eq("user_id", user_id).execute()
     if result.get("error"):
         raise HTTPException(status_code=400, detail=result["error"]["message"])
+    invalidate_dashboard_summary(user_id)
     return result["data"][0] if result["data"] else {}
 
 @router.delete("/{id}", summary="Delete asset by id")
@@ -46,6 +55,7 @@ def delete_asset(id: int, user=Depends(verify_jwt_token)):
     result = supabase.table("assets").delete().eq("id", id).eq("user_id", user_id).execute()
     if result.get("error"):
         raise HTTPException(status_code=400, detail=result["error"]["message"])
+    invalidate_dashboard_summary(user_id)
     return {"message": "Asset deleted"}
 
 # Fetch all liabilities for a household from Supabase
@@ -99,15 +109,43 @@ def create_asset_supabase(asset: schemas.AssetCreate, household_id: int):
         raise HTTPException(status_code=400, detail=result["error"]["message"])
     return {"message": "Asset added", "data": result["data"]}
 
-# Supabase: Upload PDF/document to storage bucket
+# Supabase: Upload PDF/document to storage bucket. The multipart body is
+# parsed incrementally and streamed to storage, so memory stays bounded by
+# UPLOAD_CHUNK_SIZE however large the file is. Objects are stored under the
+# uploader's user id so signed URLs can be limited to their owner.
 @router.post("/upload-supabase")
-async def upload_file_supabase(file: UploadFile = File(...)):
-    supabase = get_supabase_client()
+async def upload_file_supabase(request: Request, user=Depends(verify_jwt_token)):
+    user_id = user["sub"] if isinstance(user, dict) and "sub" in user else user.get("user_id")
+    if int(request.headers.get("content-length") or 0) > UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"File exceeds {UPLOAD_MAX_BYTES} bytes")
     bucket = "documents"
-    filename = f"{uuid.uuid4()}_{file.filename}"
-    file_bytes = await file.read()
-    res = supabase.storage.from_(bucket).upload(filename, file_bytes, file.content_type)
-    if res.get("error"):
-        raise HTTPException(status_code=400, detail=res["error"]["message"])
-    public_url = supabase.storage.from_(bucket).get_public_url(filename)
-    return {"filename": filename, "url": public_url}
+    original_name, content_type, chunks = await open_multipart_file(request, "file")
+    filename = f"{user_id}/{uuid.uuid4()}_{safe_filename(original_name)}"
+    try:
+        await upload_stream(bucket, filename, chunks, content_type)
+        url = await document_url(bucket, filename)
+    except (StorageUploadError, httpx.HTTPError) as e:
+        logger.error(f"[assets.upload_file_supabase] error={str(e)}")
+        raise HTTPException(status_code=400, detail="Upload failed")
+    return {"filename": filename, "url": url}
+
+# Short-lived signed URL for a stored document; the download then goes
+# straight to storage instead of through an API worker. Only documents under
+# the caller's own user id can be signed.
+@router.get("/documents/signed-url")
+async def get_document_signed_url(filename: str, expires_in: int = Query(SIGNED_URL_TTL, ge=1, le=3600), user=Depends(verify_jwt_token)):
+    user_id = user["sub"] if isinstance(user, dict) and "sub" in user else user.get("user_id")
+    owner, _, rest = filename.partition("/")
+    if owner != str(user_id) or not rest or ".." in rest.split("/"):
+        raise HTTPException(status_code=404, detail="Document not found")
+    try:
+        url = await create_signed_url("documents", filename, expires_in)
+    except StorageUploadError as e:
+        if e.status_code in (400, 404):
+            raise HTTPException(status_code=404, detail="Document not found")
+        logger.error(f"[assets.get_document_signed_url] error={str(e)}")
+        raise HTTPException(status_code=502, detail="Could not sign document URL")
+    except httpx.HTTPError as e:
+        logger.error(f"[assets.get_document_signed_url] error={str(e)}")
+        raise HTTPException(status_code=502, detail="Could not sign document URL")
+    return {"url": url, "expires_in": expires_in}
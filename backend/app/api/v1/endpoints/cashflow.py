@@ -0,0 +1,84 @@
+import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select, func, literal_column, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.auth import verify_jwt_token
+from app.database import get_async_db
+from app.models import IncomeRecord, ExpenseRecord
+
+router = APIRouter()
+
+
+def _monthly_totals(model, date_col, user_id, date_from, date_to, income: bool):
+    year = func.extract("year", date_col).label("year")
+    month = func.extract("month", date_col).label("month")
+    total = func.sum(model.amount)
+    stmt = select(
+        year,
+        month,
+        (total if income else literal_column("0")).label("income"),
+        (literal_column("0") if income else total).label("expenses"),
+    ).where(model.user_id == user_id)
+    if date_from is not None:
+        stmt = stmt.where(date_col >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(date_col <= date_to)
+    return stmt.group_by(year, month)
+
+
+def monthly_cashflow_query(user_id, date_from=None, date_to=None):
+    """One row per month with income and expenses merged.
+
+    Each side is pre-aggregated per month from its (user_id, date) index
+    (migrations/0013_income_expense_user_date_indexes.sql) before the merge,
+    so cost scales with months in range rather than with transactions.
+    """
+    per_table = union_all(
+        _monthly_totals(IncomeRecord, IncomeRecord.date_received, user_id, date_from, date_to, income=True),
+        _monthly_totals(ExpenseRecord, ExpenseRecord.date_incurred, user_id, date_from, date_to, income=False),
+    ).subquery()
+    return (
+        select(
+            per_table.c.year,
+            per_table.c.month,
+            func.sum(per_table.c.income).label("income"),
+            func.sum(per_table.c.expenses).label("expenses"),
+        )
+        .group_by(per_table.c.year, per_table.c.month)
+        .order_by(per_table.c.year, per_table.c.month)
+    )
+
+
+def _month_range(first, last):
+    year, month = first
+    while (year, month) <= last:
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+# GET /v1/cashflow/monthly
+@router.get("/monthly")
+async def get_monthly_cashflow(
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+    user=Depends(verify_jwt_token),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Returns: [{month: "YYYY-MM", income, expenses, net}] oldest first, with
+    months that have no records in between filled with zeros.
+    """
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    result = await db.execute(monthly_cashflow_query(user["sub"], date_from, date_to))
+    totals = {(int(r.year), int(r.month)): (float(r.income or 0), float(r.expenses or 0)) for r in result}
+    if not totals:
+        return []
+    first = (date_from.year, date_from.month) if date_from else min(totals)
+    last = (date_to.year, date_to.month) if date_to else max(totals)
+    months = []
+    for year, month in _month_range(first, last):
+        income, expenses = totals.get((year, month), (0.0, 0.0))
+        months.append({"month": f"{year:04d}-{month:02d}", "income": income, "expenses": expenses, "net": income - expenses})
+    return months
@@ -1,55 +1,94 @@
 
 from fastapi import APIRouter, HTTPException, Request
-import asyncpg
-import os
+from app.pg_pool import pg_connection, check_pg_pool, pg_pool_stats
+from app.cache import dashboard_summary_cache
+from app.epfo_contributions import contributions_total
+from app.logger import logger
+import asyncio
 import datetime
 
 router = APIRouter()
 
-# Helper to get asyncpg connection
-async def get_pg_conn():
-    pg_url = os.environ.get("SUPABASE_DB_URL") or os.environ.get("DATABASE_URL")
-    if not pg_url:
-        raise RuntimeError("SUPABASE_DB_URL or DATABASE_URL env var required")
-    return await asyncpg.connect(pg_url)
+# Totals, EPFO balance and last_updated in one round-trip. Each table is read
+# once via its user_id index (see migrations/0011_dashboard_summary_indexes.sql);
+# GREATEST skips NULLs so tables with no rows don't blank out last_updated.
+DASHBOARD_SUMMARY_SQL = """
+    SELECT
+        a.total AS total_assets,
+        l.total AS total_liabilities,
+        e.total AS epfo_balance,
+        GREATEST(a.updated_at, l.updated_at, e.updated_at) AS last_updated
+    FROM
+        (SELECT COALESCE(SUM(value),0) AS total, MAX(updated_at) AS updated_at FROM assets WHERE user_id = $1) a,
+        (SELECT COALESCE(SUM(value),0) AS total, MAX(updated_at) AS updated_at FROM liabilities WHERE user_id = $1) l,
+        (SELECT COALESCE(SUM(balance),0) AS total, MAX(updated_at) AS updated_at FROM epfo_data WHERE user_id = $1) e
+"""
 
 # GET /v1/dashboard/summary
 @router.get("/summary")
 async def get_dashboard_summary(request: Request, user_id: str):
     """
     Returns: {
-      total_assets, total_liabilities, net_worth, epfo_balance, last_updated
+      total_assets, total_liabilities, net_worth, epfo_balance,
+      epfo_contributions, last_updated
     }
     """
-    conn = await get_pg_conn()
+    cached = dashboard_summary_cache.get(user_id)
+    if cached is not None:
+        return cached
+    # epfo_contributions lives in the application database (SQLAlchemy), not
+    # behind the Supabase pool, so it is read side by side with the summary
+    row, contributions = await asyncio.gather(_fetch_summary_row(user_id), _fetch_contributions(user_id))
+    total_assets = row["total_assets"]
+    total_liabilities = row["total_liabilities"]
+    epfo_balance = row["epfo_balance"]
+    contributions_sum, contributions_updated = contributions or (None, None)
+    updated = [t for t in (row["last_updated"], contributions_updated) if t is not None]
+    last_updated = max(updated, key=_as_utc).isoformat() if updated else None
+    net_worth = total_assets - total_liabilities
+    summary = {
+        "total_assets": total_assets,
+        "total_liabilities": total_liabilities,
+        "net_worth": net_worth,
+        "epfo_balance": epfo_balance,
+        "epfo_contributions": contributions_sum,
+        "last_updated": last_updated,
+    }
+    # a failed contributions read isn't cached, so the next request retries it
+    if contributions is not None:
+        dashboard_summary_cache.set(user_id, summary)
+    return summary
+
+
+def _as_utc(ts):
+    # asyncpg returns aware timestamps, the SQLAlchemy side naive UTC ones
+    return ts if ts.tzinfo else ts.replace(tzinfo=datetime.timezone.utc)
+
+
+async def _fetch_summary_row(user_id):
+    async with pg_connection() as conn:
+        return await conn.fetchrow(DASHBOARD_SUMMARY_SQL, user_id)
+
+
+async def _fetch_contributions(user_id):
+    try:
+        return await contributions_total(user_id)
+    except Exception as e:
+        logger.error(f"[dashboard.get_dashboard_summary] epfo_contributions error={str(e)}")
+        return None
+
+
+# GET /v1/dashboard/pool - pool saturation metrics for sizing per replica
+@router.get("/pool")
+async def get_pool_status():
     try:
-        # Assets
-        assets_row = await conn.fetchrow("SELECT COALESCE(SUM(value),0) AS total FROM assets WHERE user_id = $1", user_id)
-        total_assets = assets_row["total"] if assets_row else 0
-        # Liabilities
-        liabilities_row = await conn.fetchrow("SELECT COALESCE(SUM(value),0) AS total FROM liabilities WHERE user_id = $1", user_id)
-        total_liabilities = liabilities_row["total"] if liabilities_row else 0
-        # EPFO
-        epfo_row = await conn.fetchrow("SELECT COALESCE(SUM(balance),0) AS total FROM epfo_data WHERE user_id = $1", user_id)
-        epfo_balance = epfo_row["total"] if epfo_row else 0
-        # Last updated (latest from any table)
-        last_updated_row = await conn.fetchrow("""
-            SELECT MAX(updated_at) AS last_updated FROM (
-                SELECT MAX(updated_at) AS updated_at FROM assets WHERE user_id = $1
-                UNION ALL
-                SELECT MAX(updated_at) FROM liabilities WHERE user_id = $1
-                UNION ALL
-                SELECT MAX(updated_at) FROM epfo_data WHERE user_id = $1
-            ) t
-        """, user_id)
-        last_updated = last_updated_row["last_updated"].isoformat() if last_updated_row and last_updated_row["last_updated"] else None
-        net_worth = total_assets - total_liabilities
-        return {
-            "total_assets": total_assets,
-            "total_liabilities": total_liabilities,
-            "net_worth": net_worth,
-            "epfo_balance": epfo_balance,
-            "last_updated": last_updated,
-        }
-    finally:
-        await conn.close()
+        healthy = await check_pg_pool()
+    except Exception:
+        healthy = False
+    return {"healthy": healthy, **pg_pool_stats()}
+
+
+# GET /v1/dashboard/cache - summary cache hit/miss/eviction counters
+@router.get("/cache")
+async def get_cache_status():
+    return dashboard_summary_cache.stats()
@@ -1,19 +1,18 @@
 from fastapi import APIRouter, HTTPException, Request
 from app.supabase_client import get_supabase_client
-import requests
-import os
+from app.surepass_client import sp_post, SurepassError
+from app.cache import invalidate_dashboard_summary
+import asyncio
 
 router = APIRouter()
 
-SUREPASS_API_KEY = os.getenv("SUREPASS_API_KEY", "<your-surepass-api-key>")
-SUREPASS_BASE_URL = "https://api.surepass.io/v1"
-
 # Store EPFO data in Supabase
 def store_epfo_in_supabase(user_id, data):
     supabase = get_supabase_client()
     result = supabase.table("epfo").insert({"user_id": user_id, **data}).execute()
     if result.get("error"):
         raise HTTPException(status_code=400, detail=result["error"]["message"])
+    invalidate_dashboard_summary(user_id)
     return result["data"]
 
 @router.post("/generate-otp")
@@ -24,12 +23,10 @@ async def generate_epfo_otp(request: Request):
     mobile = body.get("mobile")
     if not (user_id and uan and mobile):
         raise HTTPException(status_code=400, detail="user_id, uan, mobile required")
-    headers = {"Authorization": f"Bearer {SUREPASS_API_KEY}"}
-    otp_url = f"{SUREPASS_BASE_URL}/epfo/generate-otp"  # Example endpoint
-    otp_resp = requests.post(otp_url, json={"uan": uan, "mobile": mobile}, headers=headers)
-    if otp_resp.status_code != 200:
+    try:
+        otp_data = await sp_post("/v1/epfo/generate-otp", {"uan": uan, "mobile": mobile})
+    except SurepassError:
         raise HTTPException(status_code=400, detail="OTP generation failed")
-    otp_data = otp_resp.json()
     return {"message": "OTP sent", "data": otp_data}
 
 @router.post("/submit-otp")
@@ -40,14 +37,13 @@ async def submit_epfo_otp(request: Request):
     otp = body.get("otp")
     if not (user_id and uan and otp):
         raise HTTPException(status_code=400, detail="user_id, uan, otp required")
-    headers = {"Authorization": f"Bearer {SUREPASS_API_KEY}"}
-    submit_url = f"{SUREPASS_BASE_URL}/epfo/submit-otp"  # Example endpoint
-    submit_resp = requests.post(submit_url, json={"uan": uan, "otp": otp}, headers=headers)
-    if submit_resp.status_code != 200:
+    try:
+        passbook_data = await sp_post("/v1/epfo/submit-otp", {"uan": uan, "otp": otp})
+    except SurepassError:
         raise HTTPException(status_code=400, detail="OTP submit failed")
-    passbook_data = submit_resp.json()
-    # Store in Supabase
-    record = store_epfo_in_supabase(user_id, {"uan": uan, "passbook_data": passbook_data})
+    # Store in Supabase (supabase-py is sync, so run in thread)
+    loop = asyncio.get_running_loop()
+    record = await loop.run_in_executor(None, store_epfo_in_supabase, user_id, {"uan": uan, "passbook_data": passbook_data})
     return {"message": "EPFO passbook fetched", "data": record}
 
 @router.get("/user/{user_id}")
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import datetime
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.auth import verify_jwt_token
 from app.models import IncomeRecord, ExpenseRecord
 from app.schemas import IncomeRecordCreate, IncomeRecordOut, ExpenseRecordCreate, ExpenseRecordOut
-from typing import List
+from typing import List, Optional
+from app.pagination import record_query, split_page, stream_csv, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter()
 
@@ -22,10 +25,25 @@ def create_income(
 
 @router.get("/income", response_model=List[IncomeRecordOut])
 def get_income(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+    category: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|csv)$"),
     db: Session = Depends(get_db),
     user=Depends(verify_jwt_token),
 ):
-    return db.query(IncomeRecord).filter(IncomeRecord.user_id == user["id"]).all()
+    filters = dict(date_from=date_from, date_to=date_to, category=category)
+    if format == "csv":
+        stmt = record_query(IncomeRecord, IncomeRecord.date_received, user["id"], **filters)
+        return StreamingResponse(stream_csv(stmt, IncomeRecord), media_type="text/csv", headers={"Content-Disposition": 'attachment; filename="income.csv"'})
+    stmt = record_query(IncomeRecord, IncomeRecord.date_received, user["id"], cursor=cursor, limit=limit, **filters)
+    records, next_cursor = split_page(db.execute(stmt).scalars().all(), limit, "date_received")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return records
 
 @router.post("/expenses", response_model=ExpenseRecordOut, status_code=status.HTTP_201_CREATED)
 def create_expense(
@@ -41,7 +59,22 @@ def create_expense(
 
 @router.get("/expenses", response_model=List[ExpenseRecordOut])
 def get_expenses(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+    category: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|csv)$"),
     db: Session = Depends(get_db),
     user=Depends(verify_jwt_token),
 ):
-    return db.query(ExpenseRecord).filter(ExpenseRecord.user_id == user["id"]).all()
+    filters = dict(date_from=date_from, date_to=date_to, category=category)
+    if format == "csv":
+        stmt = record_query(ExpenseRecord, ExpenseRecord.date_incurred, user["id"], **filters)
+        return StreamingResponse(stream_csv(stmt, ExpenseRecord), media_type="text/csv", headers={"Content-Disposition": 'attachment; filename="expenses.csv"'})
+    stmt = record_query(ExpenseRecord, ExpenseRecord.date_incurred, user["id"], cursor=cursor, limit=limit, **filters)
+    records, next_cursor = split_page(db.execute(stmt).scalars().all(), limit, "date_incurred")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return records
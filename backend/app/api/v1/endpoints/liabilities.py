@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, Request
 from app.supabase_client import get_supabase_client
+from app.cache import invalidate_dashboard_summary
 
 router = APIRouter()
 
@@ -19,4 +20,5 @@ def add_liability(user_id: str, liability: dict):
     result = supabase.table("liabilities").insert(liability).execute()
     if result.get("error"):
         raise HTTPException(status_code=400, detail=result["error"]["message"])
+    invalidate_dashboard_summary(user_id)
     return {"message": "Liability added", "liability": result["data"]}
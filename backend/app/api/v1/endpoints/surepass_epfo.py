@@ -1,17 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
 from pydantic import BaseModel
 from app.surepass_client import sp_post
 from app.auth import verify_jwt_token
 from app.logger import logger
-from app.database import SessionLocal
-from sqlalchemy.orm import Session
+from app.cache import invalidate_dashboard_summary
+from app.epfo_normalize import normalize_epfo, parse_ledger
+from app.surepass_cache import invalidate_consent
+from app.epfo_contributions import upsert_contributions, monthly_contributions, financial_year_totals
+from app.database import get_async_db
+from sqlalchemy import select, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import models
+from app.pagination import MAX_PAGE_SIZE, decode_cursor, split_page
 import os
 import datetime
-from typing import Any, Dict
+from typing import Optional
 
 router = APIRouter()
 
+DEFAULT_SUMMARY_PAGE_SIZE = 20
+
 
 class GenerateOTPRequest(BaseModel):
     pan: str
@@ -23,6 +31,10 @@ class SubmitOTPRequest(BaseModel):
     transaction_id: str
     otp: str
 
+class VerifyOTPRequest(BaseModel):
+    transaction_id: str
+    otp: str
+
 class PassbookRequest(BaseModel):
     uan: str
     dob: str
@@ -34,12 +46,12 @@ class ConsentUpsertRequest(BaseModel):
     duration: str
     active: bool = True
 @router.post("/surepass/epfo/submit-otp")
-async def submit_otp(payload: SubmitOTPRequest, user=Depends(verify_jwt_token), db: Session = Depends(get_db)):
+async def submit_otp(payload: SubmitOTPRequest, user=Depends(verify_jwt_token), db: AsyncSession = Depends(get_async_db), idempotency_key: Optional[str] = Header(None)):
     try:
         uid = user.get("sub")
         logger.info(f"[surepass_epfo.submit_otp] user={uid} txn={payload.transaction_id}")
         body = {"transaction_id": payload.transaction_id, "otp": payload.otp}
-        resp = await sp_post("/v1/epfo/submit-otp", body)
+        resp = await sp_post("/v1/epfo/submit-otp", body, user_id=uid, idempotency_key=idempotency_key)
         # TODO: normalize/store as needed
         return {"success": True, "data": resp}
     except Exception as e:
@@ -47,14 +59,14 @@ async def submit_otp(payload: SubmitOTPRequest, user=Depends(verify_jwt_token),
         raise HTTPException(status_code=502, detail="Upstream Surepass error")
 
 @router.post("/surepass/epfo/passbook")
-async def epfo_passbook(payload: PassbookRequest, user=Depends(verify_jwt_token), db: Session = Depends(get_db)):
+async def epfo_passbook(payload: PassbookRequest, user=Depends(verify_jwt_token), db: AsyncSession = Depends(get_async_db), idempotency_key: Optional[str] = Header(None)):
     try:
         uid = user.get("sub")
         logger.info(f"[surepass_epfo.passbook] user={uid} uan={payload.uan}")
         body = {"uan": payload.uan, "dob": payload.dob}
         if payload.pan:
             body["pan"] = payload.pan
-        resp = await sp_post("/v1/epfo/passbook", body)
+        resp = await sp_post("/v1/epfo/passbook", body, user_id=uid, idempotency_key=idempotency_key)
         # TODO: normalize/store as needed
         return {"success": True, "data": resp}
     except Exception as e:
@@ -62,12 +74,13 @@ async def epfo_passbook(payload: PassbookRequest, user=Depends(verify_jwt_token)
         raise HTTPException(status_code=502, detail="Upstream Surepass error")
 
 @router.post("/consent/upsert")
-async def upsert_consent(payload: ConsentUpsertRequest, user=Depends(verify_jwt_token), db: Session = Depends(get_db)):
+async def upsert_consent(payload: ConsentUpsertRequest, user=Depends(verify_jwt_token), db: AsyncSession = Depends(get_async_db)):
     try:
         uid = user.get("sub")
         logger.info(f"[consent.upsert] user={uid} source={payload.source}")
         # Upsert consent
-        consent = db.query(models.Consent).filter(models.Consent.user_id == uid, models.Consent.source == payload.source).first()
+        result = await db.execute(select(models.Consent).where(models.Consent.user_id == uid, models.Consent.source == payload.source))
+        consent = result.scalars().first()
         if consent:
             consent.scope = payload.scope
             consent.duration = payload.duration
@@ -75,48 +88,92 @@ async def upsert_consent(payload: ConsentUpsertRequest, user=Depends(verify_jwt_
         else:
             consent = models.Consent(user_id=uid, source=payload.source, scope=payload.scope, duration=payload.duration, active=payload.active, created_at=datetime.datetime.utcnow())
             db.add(consent)
-        db.commit()
-        db.refresh(consent)
+        if not payload.active:
+            # revoked consent: drop cached Surepass data fetched under it
+            await invalidate_consent(db, uid, payload.source)
+        await db.commit()
+        await db.refresh(consent)
         return {"success": True, "consent": {"id": consent.id, "source": consent.source, "scope": consent.scope, "duration": consent.duration, "active": consent.active}}
     except Exception as e:
         logger.error(f"[consent.upsert] error={str(e)}")
         raise HTTPException(status_code=500, detail="Failed to upsert consent")
 
 @router.get("/rls/check")
-async def rls_check(user=Depends(verify_jwt_token), db: Session = Depends(get_db)):
+async def rls_check(user=Depends(verify_jwt_token), db: AsyncSession = Depends(get_async_db)):
     try:
         uid = user.get("sub")
         # Example: check if user has active consent for EPFO
-        consent = db.query(models.Consent).filter(models.Consent.user_id == uid, models.Consent.source == "epfo", models.Consent.active == True).first()
+        result = await db.execute(select(models.Consent.id).where(models.Consent.user_id == uid, models.Consent.source == "epfo", models.Consent.active == True).limit(1))
+        consent = result.scalar()
         return {"success": True, "rls": bool(consent)}
     except Exception as e:
         logger.error(f"[rls.check] error={str(e)}")
         raise HTTPException(status_code=500, detail="Failed to check RLS")
 
 
-def get_db():
-    db = SessionLocal()
+# (table, txn) pairs whose row is being written by another coalesced caller
+# in this process; checked and set without awaiting in between
+_recording_txns = set()
+
+
+async def _persist_once(key, exists, persist):
+    """Run persist() unless a coalesced caller is already writing `key` or
+    exists() finds it stored by an earlier (e.g. idempotent) request."""
+    if key in _recording_txns:
+        return
+    _recording_txns.add(key)
     try:
-        yield db
+        if await exists():
+            return
+        await persist()
     finally:
-        db.close()
+        _recording_txns.discard(key)
+
+
+async def _record_otp_request(db: AsyncSession, uid, payload: GenerateOTPRequest, txn):
+    async def exists():
+        result = await db.execute(select(models.EPFOOTPRequest.id).where(models.EPFOOTPRequest.transaction_id == txn).limit(1))
+        return result.scalar() is not None
+
+    async def persist():
+        db.add(models.EPFOOTPRequest(user_id=uid, pan=payload.pan, mobile=payload.mobile, transaction_id=txn))
+        await db.commit()
+
+    if txn is None:
+        await persist()
+    else:
+        await _persist_once(("otp", txn), exists, persist)
+
+
+async def _record_epfo_summary(db: AsyncSession, uid, txn, resp, rows, normalized):
+    s = models.EPFOSummary
+
+    async def exists():
+        result = await db.execute(select(s.id).where(s.user_id == uid, s.transaction_id == txn).limit(1))
+        return result.scalar() is not None
+
+    async def persist():
+        db.add(s(user_id=uid, transaction_id=txn, raw_json=resp, normalized_json=normalized))
+        if rows and normalized.get("uan"):
+            await upsert_contributions(db, uid, str(normalized["uan"]), rows, txn)
+        await db.commit()
+
+    await _persist_once(("summary", uid, txn), exists, persist)
 
 
 @router.post("/surepass/epfo/generate-otp")
-async def generate_otp(payload: GenerateOTPRequest, user=Depends(verify_jwt_token), db: Session = Depends(get_db)):
+async def generate_otp(payload: GenerateOTPRequest, user=Depends(verify_jwt_token), db: AsyncSession = Depends(get_async_db), idempotency_key: Optional[str] = Header(None)):
     try:
         uid = user.get("sub")
         logger.info(f"[surepass_epfo.generate_otp] user={uid}")
         body = {"pan": payload.pan, "mobile": payload.mobile}
         # call surepass
-        resp = await sp_post("/v1/epfo/generate-otp", body)
+        resp = await sp_post("/v1/epfo/generate-otp", body, user_id=uid, idempotency_key=idempotency_key)
         # expected resp contains transaction_id or similar
         txn = resp.get("transaction_id") or resp.get("txn_id") or resp.get("request_id")
-        # persist otp request
-        rec = models.EPFOOTPRequest(user_id=uid, pan=payload.pan, mobile=payload.mobile, transaction_id=txn)
-        db.add(rec)
-        db.commit()
-        db.refresh(rec)
+        # persist otp request once per transaction: coalesced double clicks
+        # and idempotent retries all come back with the same txn
+        await _record_otp_request(db, uid, payload, txn)
         return {"success": True, "transaction_id": txn, "message": "OTP generated", "raw": resp}
     except HTTPException:
         raise
@@ -126,62 +183,18 @@ async def generate_otp(payload: GenerateOTPRequest, user=Depends(verify_jwt_toke
 
 
 @router.post("/surepass/epfo/verify-otp")
-async def verify_otp(payload: VerifyOTPRequest, user=Depends(verify_jwt_token), db: Session = Depends(get_db)):
+async def verify_otp(payload: VerifyOTPRequest, user=Depends(verify_jwt_token), db: AsyncSession = Depends(get_async_db), idempotency_key: Optional[str] = Header(None)):
     try:
         uid = user.get("sub")
         logger.info(f"[surepass_epfo.verify_otp] user={uid} txn={payload.transaction_id}")
         body = {"transaction_id": payload.transaction_id, "otp": payload.otp}
-        resp = await sp_post("/v1/epfo/verify-otp", body)
-        # normalize and store summary
-        def normalize_epfo(raw: Any) -> Dict[str, Any]:
-            # Heuristic normalization for Surepass EPFO response
-            norm: Dict[str, Any] = {}
-            # Try common locations
-            try:
-                if isinstance(raw, dict):
-                    # passbook with balance
-                    pb = raw.get("passbook") or raw.get("data") or raw
-                    if isinstance(pb, dict):
-                        # balance
-                        bal = pb.get("balance") or pb.get("total_balance") or pb.get("current_balance")
-                        if bal is not None:
-                            norm["balance"] = bal
-                        # last contribution date
-                        last = pb.get("last_contribution_date") or pb.get("last_contribution") or pb.get("last_contribution_on")
-                        if last:
-                            norm["last_contribution"] = last
-                        # employer
-                        emp = pb.get("employer") or pb.get("employer_name") or pb.get("establishment")
-                        if emp:
-                            norm["employer"] = emp
-                        # member name / uan
-                        member = pb.get("member_name") or pb.get("name") or pb.get("member")
-                        if member:
-                            norm["member_name"] = member
-                        uan = pb.get("uan") or raw.get("uan") or pb.get("member_uan")
-                        if uan:
-                            norm["uan"] = uan
-                        # contributions count
-                        contribs = pb.get("contributions_count") or (isinstance(pb.get("contributions"), list) and len(pb.get("contributions")))
-                        if contribs:
-                            norm["contributions_count"] = contribs
-            except Exception:
-                pass
-            # fallback: include top-level keys if nothing found
-            if not norm and isinstance(raw, dict):
-                # try find numeric fields
-                for k in ("balance", "total", "amount"):
-                    if k in raw:
-                        norm["balance"] = raw.get(k)
-                        break
-            norm["normalized_at"] = datetime.datetime.utcnow().isoformat()
-            return norm
-
-        normalized = normalize_epfo(resp)
-        summary = models.EPFOSummary(user_id=uid, transaction_id=payload.transaction_id, raw_json=resp, normalized_json=normalized)
-        db.add(summary)
-        db.commit()
-        db.refresh(summary)
+        resp = await sp_post("/v1/epfo/verify-otp", body, user_id=uid, idempotency_key=idempotency_key)
+        # normalize and store summary plus the contribution ledger, once per
+        # transaction: coalesced double clicks and idempotent replays share it
+        rows = parse_ledger(resp)
+        normalized = normalize_epfo(resp, rows)
+        await _record_epfo_summary(db, uid, payload.transaction_id, resp, rows, normalized)
+        invalidate_dashboard_summary(uid)
         # return normalized payload for UI
         return {"success": True, "transaction_id": payload.transaction_id, "data": resp, "normalized": normalized}
     except HTTPException:
@@ -191,36 +204,120 @@ async def verify_otp(payload: VerifyOTPRequest, user=Depends(verify_jwt_token),
         raise HTTPException(status_code=502, detail="Upstream Surepass error")
 
 
+# Listing columns only: raw_json can be megabytes per fetch and is served
+# on demand by /epfo/summaries/{id}/raw.
+SUMMARY_COLUMNS = (
+    models.EPFOSummary.id,
+    models.EPFOSummary.transaction_id,
+    models.EPFOSummary.normalized_json,
+    models.EPFOSummary.created_at,
+)
+
+
+def _summary_out(r) -> dict:
+    return {
+        "id": r.id,
+        "transaction_id": r.transaction_id,
+        "normalized": r.normalized_json,
+        "created_at": r.created_at.isoformat() if r.created_at else None,
+    }
+
+
+def summaries_query(user_id, cursor=None, limit=None):
+    """Newest-first summaries, keyset-paginated on (created_at, id) over the
+    (user_id, created_at) index (migrations/0016_epfo_summaries_user_created_index.sql)."""
+    s = models.EPFOSummary
+    stmt = select(*SUMMARY_COLUMNS).where(s.user_id == user_id)
+    if cursor is not None:
+        created_at, summary_id = decode_cursor(cursor, datetime.datetime.fromisoformat, int)
+        stmt = stmt.where(or_(s.created_at < created_at, and_(s.created_at == created_at, s.id < summary_id)))
+    stmt = stmt.order_by(s.created_at.desc(), s.id.desc())
+    if limit is not None:
+        stmt = stmt.limit(limit + 1)
+    return stmt
+
+
 @router.get("/epfo/summaries")
-async def list_epfo_summaries(user=Depends(verify_jwt_token), db: Session = Depends(get_db)):
+async def list_epfo_summaries(
+    response: Response,
+    limit: int = Query(DEFAULT_SUMMARY_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    user=Depends(verify_jwt_token),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Newest first; pass the X-Next-Cursor response header back as
+    ``cursor`` for the next page."""
     try:
         uid = user.get("sub")
         logger.info(f"[surepass_epfo.list_epfo_summaries] user={uid}")
-        rows = db.query(models.EPFOSummary).filter(models.EPFOSummary.user_id == uid).order_by(models.EPFOSummary.created_at.desc()).all()
-        results = []
-        for r in rows:
-            results.append({
-                "id": r.id,
-                "transaction_id": r.transaction_id,
-                "raw": r.raw_json,
-                "normalized": r.normalized_json,
-                "created_at": r.created_at.isoformat() if r.created_at else None,
-            })
-        return {"success": True, "data": results}
+        result = await db.execute(summaries_query(uid, cursor, limit))
+        rows, next_cursor = split_page(result.all(), limit, "created_at")
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return {"success": True, "data": [_summary_out(r) for r in rows]}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"[surepass_epfo.list_epfo_summaries] error={str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch EPFO summaries")
 
 
+@router.get("/epfo/summaries/{summary_id}/raw")
+async def get_epfo_summary_raw(summary_id: int, user=Depends(verify_jwt_token), db: AsyncSession = Depends(get_async_db)):
+    try:
+        uid = user.get("sub")
+        s = models.EPFOSummary
+        result = await db.execute(select(s.raw_json).where(s.id == summary_id, s.user_id == uid))
+        row = result.first()
+    except Exception as e:
+        logger.error(f"[surepass_epfo.get_epfo_summary_raw] error={str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch EPFO summary")
+    if row is None:
+        raise HTTPException(status_code=404, detail="EPFO summary not found")
+    return {"success": True, "id": summary_id, "raw": row.raw_json}
+
+
 @router.get("/epfo/latest")
-async def latest_epfo_summary(user=Depends(verify_jwt_token), db: Session = Depends(get_db)):
+async def latest_epfo_summary(user=Depends(verify_jwt_token), db: AsyncSession = Depends(get_async_db)):
     try:
         uid = user.get("sub")
         logger.info(f"[surepass_epfo.latest_epfo_summary] user={uid}")
-        r = db.query(models.EPFOSummary).filter(models.EPFOSummary.user_id == uid).order_by(models.EPFOSummary.created_at.desc()).first()
+        result = await db.execute(summaries_query(uid).limit(1))
+        r = result.first()
         if not r:
             return {"success": True, "data": None}
-        return {"success": True, "data": {"id": r.id, "transaction_id": r.transaction_id, "raw": r.raw_json, "normalized": r.normalized_json, "created_at": r.created_at.isoformat()}}
+        return {"success": True, "data": _summary_out(r)}
     except Exception as e:
         logger.error(f"[surepass_epfo.latest_epfo_summary] error={str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch EPFO summary")
+
+
+@router.get("/epfo/contributions")
+async def list_epfo_contributions(
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+    user=Depends(verify_jwt_token),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Monthly contribution sums across all member ids, oldest first."""
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    try:
+        uid = user.get("sub")
+        return {"success": True, "data": await monthly_contributions(db, uid, date_from, date_to)}
+    except Exception as e:
+        logger.error(f"[surepass_epfo.list_epfo_contributions] error={str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch EPFO contributions")
+
+
+@router.get("/epfo/contributions/totals")
+async def epfo_contribution_totals(user=Depends(verify_jwt_token), db: AsyncSession = Depends(get_async_db)):
+    """Contribution totals per financial year plus the overall sum."""
+    try:
+        uid = user.get("sub")
+        by_year = await financial_year_totals(db, uid)
+        overall = {k: round(sum(y[k] for y in by_year), 2) for k in ("employee_share", "employer_share", "pension_share", "total")}
+        return {"success": True, "data": {"total": overall, "by_financial_year": by_year}}
+    except Exception as e:
+        logger.error(f"[surepass_epfo.epfo_contribution_totals] error={str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch EPFO contribution totals")
@@ -1,49 +1,40 @@
-from fastapi import APIRouter, HTTPException, Request, Depends
+from fastapi import APIRouter, HTTPException, Request, Depends, Header
 from app.auth import verify_jwt_token
 from app.supabase_client import get_supabase_client
-import requests
-import os
+from app.surepass_client import sp_post, SurepassError
+from app.surepass_cache import cached_fetch
+import asyncio
 import datetime
+from typing import Optional
 from pydantic import BaseModel
 
 router = APIRouter()
 
-SUREPASS_API_KEY = os.getenv("SUREPASS_API_KEY", "<your-surepass-api-key>")
-SUREPASS_BASE_URL = "https://api.surepass.io/v1"
-
 class AISRequest(BaseModel):
     pan: str
     year: str
+    force_refresh: bool = False
 
 @router.post("/surepass/itr/ais")
-async def itr_ais(payload: AISRequest, user=Depends(verify_jwt_token)):
+async def itr_ais(payload: AISRequest, user=Depends(verify_jwt_token), idempotency_key: Optional[str] = Header(None)):
     try:
         uid = user.get("sub")
         pan = payload.pan
         year = payload.year
         if not (uid and pan and year):
             raise HTTPException(status_code=400, detail="user_id, pan, year required")
-        headers = {"Authorization": f"Bearer {SUREPASS_API_KEY}"}
-        ais_url = f"{SUREPASS_BASE_URL}/itr/ais"
-        ais_resp = requests.post(ais_url, json={"pan": pan, "year": year}, headers=headers)
-        if ais_resp.status_code != 200:
+        try:
+            ais_data = await cached_fetch(
+                "ais", uid, pan, year,
+                lambda: sp_post("/v1/itr/ais", {"pan": pan, "year": year}, user_id=uid, idempotency_key=idempotency_key),
+                force_refresh=payload.force_refresh,
+            )
+        except SurepassError:
             raise HTTPException(status_code=400, detail="AIS fetch failed")
-        ais_data = ais_resp.json()
         # TODO: normalize/store as needed
         return {"success": True, "data": ais_data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch AIS: {str(e)}")
-from fastapi import APIRouter, HTTPException, Request, Depends
-from app.auth import verify_jwt_token
-from app.supabase_client import get_supabase_client
-import requests
-import os
-import datetime
-
-router = APIRouter()
-
-SUREPASS_API_KEY = os.getenv("SUREPASS_API_KEY", "<your-surepass-api-key>")
-SUREPASS_BASE_URL = "https://api.surepass.io/v1"
 
 # Collect Tax-ITR data, call Surepass, store in Supabase
 def store_itr_in_supabase(user_id, data):
@@ -53,6 +44,40 @@ def store_itr_in_supabase(user_id, data):
         raise HTTPException(status_code=400, detail=result["error"]["message"])
     return result["data"]
 
+async def fetch_pan(pan, user_id=None, force_refresh=False):
+    try:
+        return await cached_fetch(
+            "pan", user_id, pan, None,
+            lambda: sp_post("/v1/pan/comprehensive-plus", {"pan": pan}, user_id=user_id),
+            force_refresh=force_refresh,
+        )
+    except SurepassError:
+        raise HTTPException(status_code=400, detail="PAN verification failed")
+
+async def fetch_ais(pan, year, user_id=None, force_refresh=False):
+    try:
+        return await cached_fetch(
+            "ais", user_id, pan, year,
+            lambda: sp_post("/v1/itr/ais", {"pan": pan, "year": year}, user_id=user_id),
+            force_refresh=force_refresh,
+        )
+    except SurepassError:
+        raise HTTPException(status_code=400, detail="AIS fetch failed")
+
+async def fetch_pan_and_ais(pan, year, user_id=None, force_refresh=False):
+    # PAN and AIS lookups are independent, so issue them together. If either
+    # fails the sibling is cancelled rather than left running upstream.
+    pan_task = asyncio.create_task(fetch_pan(pan, user_id, force_refresh))
+    ais_task = asyncio.create_task(fetch_ais(pan, year, user_id, force_refresh))
+    try:
+        pan_data, ais_data = await asyncio.gather(pan_task, ais_task)
+    except BaseException:
+        pan_task.cancel()
+        ais_task.cancel()
+        await asyncio.gather(pan_task, ais_task, return_exceptions=True)
+        raise
+    return pan_data, ais_data
+
 @router.post("/collect")
 async def collect_itr(request: Request):
     body = await request.json()
@@ -61,21 +86,11 @@ async def collect_itr(request: Request):
     year = body.get("year")
     if not (user_id and pan and year):
         raise HTTPException(status_code=400, detail="user_id, pan, year required")
-    # Call Surepass PAN Comprehensive Plus
-    headers = {"Authorization": f"Bearer {SUREPASS_API_KEY}"}
-    pan_url = f"{SUREPASS_BASE_URL}/pan/comprehensive-plus"  # Example endpoint
-    pan_resp = requests.post(pan_url, json={"pan": pan}, headers=headers)
-    if pan_resp.status_code != 200:
-        raise HTTPException(status_code=400, detail="PAN verification failed")
-    pan_data = pan_resp.json()
-    # Call Surepass Get AIS
-    ais_url = f"{SUREPASS_BASE_URL}/itr/ais"  # Example endpoint
-    ais_resp = requests.post(ais_url, json={"pan": pan, "year": year}, headers=headers)
-    if ais_resp.status_code != 200:
-        raise HTTPException(status_code=400, detail="AIS fetch failed")
-    ais_data = ais_resp.json()
-    # Store in Supabase
-    record = store_itr_in_supabase(user_id, {"pan": pan, "year": year, "pan_data": pan_data, "ais_data": ais_data})
+    # Call Surepass PAN Comprehensive Plus and Get AIS concurrently
+    pan_data, ais_data = await fetch_pan_and_ais(pan, year, user_id, body.get("force_refresh") is True)
+    # Store in Supabase (supabase-py is sync, so run in thread)
+    loop = asyncio.get_running_loop()
+    record = await loop.run_in_executor(None, store_itr_in_supabase, user_id, {"pan": pan, "year": year, "pan_data": pan_data, "ais_data": ais_data})
     return {"message": "ITR data collected", "data": record}
 
 @router.get("/user/{user_id}")
@@ -96,17 +111,7 @@ async def itr_connect(request: Request, user=Depends(verify_jwt_token)):
     uid = user.get("sub")
     if not (uid and pan and year):
         raise HTTPException(status_code=400, detail="user_id, pan, year required")
-    headers = {"Authorization": f"Bearer {SUREPASS_API_KEY}"}
-    pan_url = f"{SUREPASS_BASE_URL}/pan/comprehensive-plus"
-    pan_resp = requests.post(pan_url, json={"pan": pan}, headers=headers)
-    if pan_resp.status_code != 200:
-        raise HTTPException(status_code=400, detail="PAN verification failed")
-    pan_data = pan_resp.json()
-    ais_url = f"{SUREPASS_BASE_URL}/itr/ais"
-    ais_resp = requests.post(ais_url, json={"pan": pan, "year": year}, headers=headers)
-    if ais_resp.status_code != 200:
-        raise HTTPException(status_code=400, detail="AIS fetch failed")
-    ais_data = ais_resp.json()
+    pan_data, ais_data = await fetch_pan_and_ais(pan, year, uid, body.get("force_refresh") is True)
     # Normalize summary for UI
     def normalize_itr(pan_data, ais_data):
         norm = {}
@@ -121,5 +126,6 @@ async def itr_connect(request: Request, user=Depends(verify_jwt_token)):
         return norm
     summary = normalize_itr(pan_data, ais_data)
     # Store in Supabase
-    record = store_itr_in_supabase(uid, {"pan": pan, "year": year, "pan_data": pan_data, "ais_data": ais_data, "summary": summary})
+    loop = asyncio.get_running_loop()
+    record = await loop.run_in_executor(None, store_itr_in_supabase, uid, {"pan": pan, "year": year, "pan_data": pan_data, "ais_data": ais_data, "summary": summary})
     return {"success": True, "summary": summary, "data": record}
@@ -3,7 +3,7 @@ from fastapi import APIRouter, HTTPException, Depends, Request
 from sqlalchemy.orm import Session
 from app import schemas, crud
 from app.database import SessionLocal
-from app.supabase_client import get_supabase_client
+from app.supabase_client import create_supabase_client
 
 router = APIRouter()
 
@@ -20,7 +20,8 @@ def supabase_signup(user: schemas.UserCreate):
     # Use mobile as email if email not provided
     email = user.email or f"{user.mobile}@foas.com"
     password = user.mobile  # For demo, use mobile as password (not secure)
-    supabase = get_supabase_client()
+    # Dedicated client: signing in on the shared client would leak the session
+    supabase = create_supabase_client()
     result = supabase.auth.sign_up({"email": email, "password": password, "phone": user.mobile})
     if result.get("error"):
         raise HTTPException(status_code=400, detail=result["error"]["message"])
@@ -31,7 +32,8 @@ def supabase_signup(user: schemas.UserCreate):
 def supabase_login(mobile: str):
     email = f"{mobile}@foas.com"
     password = mobile
-    supabase = get_supabase_client()
+    # Dedicated client: signing in on the shared client would leak the session
+    supabase = create_supabase_client()
     result = supabase.auth.sign_in_with_password({"email": email, "password": password})
     if result.get("error"):
         raise HTTPException(status_code=401, detail=result["error"]["message"])
@@ -1,8 +1,11 @@
 import os
+import time
+import hashlib
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
 import requests
+from app.cache import TTLCache
 
 # Get Supabase JWT secret from env
 SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET", "")
@@ -14,12 +17,30 @@ bearer_scheme = HTTPBearer()
 # JWKS_URL = f"https://{SUPABASE_PROJECT_ID}.supabase.co/auth/v1/keys"
 # ...
 
+# Verified claims keyed by SHA-256 of the exact token bytes, so a hit means this
+# token already passed signature verification. Entries never outlive the
+# token's exp, and are capped at TOKEN_CACHE_MAX_TTL so a rotated secret takes
+# effect promptly. Tokens without exp are never cached.
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+TOKEN_CACHE_MAX_TTL = float(os.getenv("TOKEN_CACHE_MAX_TTL", "300"))
+verified_token_cache = TTLCache(max_size=TOKEN_CACHE_MAX_ENTRIES, ttl=TOKEN_CACHE_MAX_TTL)
+
 def verify_jwt_token(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)):
     token = credentials.credentials
+    digest = hashlib.sha256(token.encode()).hexdigest()
+    cached = verified_token_cache.get(digest)
+    # wall-clock exp check on every hit: the TTL is monotonic and approximate
+    if cached is not None and cached["exp"] > time.time():
+        return dict(cached)
     try:
         payload = jwt.decode(token, SUPABASE_JWT_SECRET, algorithms=["HS256"])
-        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        remaining = exp - time.time()
+        if remaining > 0:
+            verified_token_cache.set(digest, payload, ttl=min(remaining, TOKEN_CACHE_MAX_TTL))
+    return dict(payload)
@@ -1,7 +1,9 @@
 import os
-import requests
+import time
+import asyncio
+import httpx
 from fastapi import Depends, HTTPException, status, Request
-from functools import lru_cache
+from app.logger import logger
 
 # Import jose (python-jose) dynamically to avoid static analysis failures in
 # environments that don't have python-jose installed. If unavailable, set jwt
@@ -13,21 +15,112 @@ _jose_spec = importlib.util.find_spec("jose")
 if _jose_spec is not None:
     _jose = importlib.import_module("jose")
     jwt = getattr(_jose, "jwt", None)
+    jwk = getattr(_jose, "jwk", None)
     JWTError = getattr(_jose, "JWTError", Exception)
 else:  # pragma: no cover - environment-dependent
     jwt = None
+    jwk = None
     JWTError = Exception
 
 SUPABASE_PROJECT_ID = os.getenv("SUPABASE_PROJECT_ID") or os.getenv("SUPABASE_URL", "").split(".co")[0].split("//")[-1]
 SUPABASE_JWKS_URL = f"https://{SUPABASE_PROJECT_ID}.supabase.co/auth/v1/keys"
 
-@lru_cache()
-def get_jwks():
-    resp = requests.get(SUPABASE_JWKS_URL)
-    resp.raise_for_status()
-    return resp.json()["keys"]
+# Keys are considered fresh for JWKS_TTL seconds; the background task refreshes
+# every JWKS_REFRESH_INTERVAL so requests normally never wait on a fetch. An
+# unknown kid triggers at most one refetch per JWKS_MIN_REFETCH_INTERVAL to stop
+# forged kids from hammering the JWKS endpoint.
+JWKS_TTL = float(os.getenv("JWKS_TTL", "3600"))
+JWKS_REFRESH_INTERVAL = float(os.getenv("JWKS_REFRESH_INTERVAL", "900"))
+JWKS_MIN_REFETCH_INTERVAL = float(os.getenv("JWKS_MIN_REFETCH_INTERVAL", "30"))
+JWKS_FETCH_TIMEOUT = float(os.getenv("JWKS_FETCH_TIMEOUT", "5"))
 
-def get_current_user(request: Request):
+
+class JWKSStore:
+    """Async JWKS cache holding parsed key objects by kid.
+
+    Concurrent refreshes share one in-flight fetch (single-flight), and a
+    failed refresh keeps serving the previous keys.
+    """
+
+    def __init__(self, url: str, ttl: float = JWKS_TTL, min_refetch_interval: float = JWKS_MIN_REFETCH_INTERVAL):
+        self.url = url
+        self.ttl = ttl
+        self.min_refetch_interval = min_refetch_interval
+        self._keys = {}
+        self._fetched_at = None
+        self._last_attempt = None
+        self._inflight = None
+        self._refresher = None
+
+    async def _fetch(self):
+        self._last_attempt = time.monotonic()
+        async with httpx.AsyncClient(timeout=JWKS_FETCH_TIMEOUT) as client:
+            resp = await client.get(self.url)
+            resp.raise_for_status()
+            raw_keys = resp.json()["keys"]
+        keys = {}
+        for k in raw_keys:
+            try:
+                keys[k["kid"]] = (jwk.construct(k, k.get("alg")), k.get("alg"))
+            except Exception as e:
+                logger.error(f"[jwks] skipping unparseable key kid={k.get('kid')} error={str(e)}")
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+    async def refresh(self):
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._fetch())
+        # shield: a cancelled request must not cancel the fetch others await
+        await asyncio.shield(self._inflight)
+
+    def _is_stale(self):
+        return self._fetched_at is None or time.monotonic() - self._fetched_at > self.ttl
+
+    async def get_key(self, kid):
+        """Return (key, alg) for kid, or None if it is not published."""
+        if self._is_stale():
+            await self._refresh_or_keep()
+        entry = self._keys.get(kid)
+        if entry is None and time.monotonic() - (self._last_attempt or 0) >= self.min_refetch_interval:
+            # possibly a rotated key we haven't seen yet
+            await self._refresh_or_keep()
+            entry = self._keys.get(kid)
+        return entry
+
+    async def _refresh_or_keep(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            if not self._keys:
+                raise
+            logger.error(f"[jwks] refresh failed, serving cached keys error={str(e)}")
+
+    async def _refresh_forever(self, interval):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"[jwks] background refresh failed error={str(e)}")
+            await asyncio.sleep(interval)
+
+    def start(self, interval: float = JWKS_REFRESH_INTERVAL):
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.ensure_future(self._refresh_forever(interval))
+
+    async def stop(self):
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+        self._refresher = None
+
+
+jwks_store = JWKSStore(SUPABASE_JWKS_URL)
+
+
+async def get_current_user(request: Request):
     auth = request.headers.get("Authorization")
     if not auth or not auth.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
@@ -36,13 +129,17 @@ def get_current_user(request: Request):
         if jwt is None:
             # Clear runtime error when jose isn't installed
             raise HTTPException(status_code=500, detail="jwt library not installed")
-        jwks = get_jwks()
         unverified_header = jwt.get_unverified_header(token)
-        kid = unverified_header["kid"]
-        key = next((k for k in jwks if k["kid"] == kid), None)
-        if not key:
+        kid = unverified_header.get("kid")
+        try:
+            entry = await jwks_store.get_key(kid)
+        except httpx.HTTPError as e:
+            logger.error(f"[jwks] fetch failed error={str(e)}")
+            raise HTTPException(status_code=503, detail="Unable to fetch signing keys")
+        if not entry:
             raise HTTPException(status_code=401, detail="Invalid token: key not found")
-        payload = jwt.decode(token, key, algorithms=[key["alg"]], options={"verify_aud": False})
+        key, alg = entry
+        payload = jwt.decode(token, key, algorithms=[alg], options={"verify_aud": False})
         return {"id": payload.get("sub"), "email": payload.get("email")}
     except JWTError as e:
         raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
@@ -0,0 +1,110 @@
+import os
+import io
+import csv
+import json
+import uuid
+import datetime
+from fastapi import Depends, HTTPException, Request
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.auth import verify_jwt_token
+from app.database import get_async_db
+from app.storage_upload import open_multipart_file, limit_size
+
+BULK_IMPORT_MAX_ROWS = int(os.getenv("BULK_IMPORT_MAX_ROWS", "10000"))
+BULK_IMPORT_MAX_BYTES = int(os.getenv("BULK_IMPORT_MAX_BYTES", str(10 * 1024 * 1024)))
+
+
+async def _read_limited(chunks) -> bytes:
+    # stop at BULK_IMPORT_MAX_BYTES instead of buffering whatever was sent
+    buf = bytearray()
+    async for chunk in limit_size(chunks, BULK_IMPORT_MAX_BYTES):
+        buf += chunk
+    return bytes(buf)
+
+
+def _decode(body: bytes) -> str:
+    try:
+        return body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Body must be UTF-8 encoded")
+
+
+async def read_rows(request: Request) -> list:
+    """Rows from a JSON array body, a text/csv body or a multipart `file` upload."""
+    if int(request.headers.get("content-length") or 0) > BULK_IMPORT_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Body exceeds {BULK_IMPORT_MAX_BYTES} bytes")
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        _, _, chunks = await open_multipart_file(request, "file")
+        rows = _parse_csv(_decode(await _read_limited(chunks)))
+    elif content_type.startswith("text/csv"):
+        rows = _parse_csv(_decode(await _read_limited(request.stream())))
+    else:
+        try:
+            rows = json.loads(_decode(await _read_limited(request.stream())))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or CSV")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or CSV")
+    if len(rows) > BULK_IMPORT_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_IMPORT_MAX_ROWS} rows per import")
+    return rows
+
+
+def _parse_csv(text: str) -> list:
+    # empty cells mean "not provided" so optional fields fall back to None
+    try:
+        return [{k: v for k, v in row.items() if v not in ("", None)} for row in csv.DictReader(io.StringIO(text))]
+    except csv.Error:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or CSV")
+
+
+def validate_rows(rows, schema, date_field):
+    """Validate every row; return (valid payload dicts, per-row errors).
+
+    Row numbers in errors are 1-based positions in the submitted data.
+    """
+    valid, errors = [], []
+    for i, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append({"row": i, "errors": [{"msg": "Row must be an object"}]})
+            continue
+        try:
+            data = schema.model_validate(row).model_dump()
+            data[date_field] = datetime.date.fromisoformat(data[date_field])
+        except ValidationError as e:
+            errors.append({"row": i, "errors": e.errors(include_url=False, include_context=False, include_input=False)})
+            continue
+        except ValueError:
+            errors.append({"row": i, "errors": [{"loc": [date_field], "msg": "Invalid ISO date"}]})
+            continue
+        valid.append(data)
+    return valid, errors
+
+
+async def bulk_insert(db, model, user_id, payloads) -> int:
+    """Insert payloads for user_id with one executemany in one transaction."""
+    if not payloads:
+        return 0
+    now = datetime.datetime.utcnow()
+    values = [{**p, "id": str(uuid.uuid4()), "user_id": user_id, "created_at": now, "updated_at": now} for p in payloads]
+    await db.execute(insert(model), values)
+    await db.commit()
+    return len(values)
+
+
+def bulk_import_route(model, schema, date_field):
+    """POST handler for /api/<records>/bulk: validate every row, insert the
+    valid ones; with atomic=true any invalid row rejects the whole import."""
+
+    async def bulk_import_records(request: Request, atomic: bool = False, user=Depends(verify_jwt_token), db: AsyncSession = Depends(get_async_db)):
+        rows = await read_rows(request)
+        payloads, errors = validate_rows(rows, schema, date_field)
+        if errors and atomic:
+            raise HTTPException(status_code=422, detail={"inserted": 0, "errors": errors})
+        inserted = await bulk_insert(db, model, user["sub"], payloads)
+        return {"inserted": inserted, "errors": errors}
+
+    return bulk_import_records
@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import threading
+import importlib
+from collections import OrderedDict
+from fastapi.encoders import jsonable_encoder
+
+_MISSING = object()
+
+
+class TTLCache:
+    """In-process cache with per-entry TTL and LRU eviction at max_size.
+
+    Thread-safe: sync route handlers run in the threadpool while async ones run
+    on the event loop, and both read/invalidate the same cache.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._data)
+        return {
+            "backend": "memory",
+            "size": size,
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class RedisCache:
+    """Same interface as TTLCache on top of any Redis-compatible client.
+
+    The client only needs get(key), set(key, value, ex=seconds) and
+    delete(key), so redis-py, fakeredis or a local stand-in all work. Values
+    are stored as JSON; eviction is left to the server's maxmemory policy.
+    """
+
+    def __init__(self, client, ttl: float = 60.0, prefix: str = "cache:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _count(self, attr):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def get(self, key, default=None):
+        try:
+            raw = self.client.get(self.prefix + str(key))
+        except Exception:
+            self._count("errors")
+            raw = None
+        if raw is None:
+            self._count("misses")
+            return default
+        self._count("hits")
+        return json.loads(raw)
+
+    def set(self, key, value, ttl: float = None):
+        try:
+            self.client.set(self.prefix + str(key), json.dumps(jsonable_encoder(value)), ex=max(1, int(self.ttl if ttl is None else ttl)))
+        except Exception:
+            self._count("errors")
+
+    def delete(self, key):
+        try:
+            self.client.delete(self.prefix + str(key))
+        except Exception:
+            self._count("errors")
+
+    def clear(self):
+        pass
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis",
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": 0,
+            "errors": self.errors,
+        }
+
+
+def build_cache(name: str, max_size: int, ttl: float):
+    """Build a cache from env: <NAME>_CACHE_REDIS_URL selects the Redis backend
+    (requires the optional `redis` package), otherwise an in-process TTLCache.
+    """
+    prefix = name.upper()
+    max_size = int(os.getenv(f"{prefix}_CACHE_MAX_ENTRIES", str(max_size)))
+    ttl = float(os.getenv(f"{prefix}_CACHE_TTL", str(ttl)))
+    redis_url = os.getenv(f"{prefix}_CACHE_REDIS_URL")
+    if redis_url and importlib.util.find_spec("redis") is not None:
+        redis = importlib.import_module("redis")
+        client = redis.Redis.from_url(redis_url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        return RedisCache(client, ttl=ttl, prefix=f"{name}:")
+    return TTLCache(max_size=max_size, ttl=ttl)
+
+
+# Per-user /api/v1/dashboard/summary results. Invalidated by the asset,
+# liability and EPFO write paths.
+dashboard_summary_cache = build_cache("dashboard_summary", max_size=1024, ttl=60.0)
+
+
+def invalidate_dashboard_summary(user_id):
+    if user_id is not None:
+        dashboard_summary_cache.delete(str(user_id))
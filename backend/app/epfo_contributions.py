@@ -0,0 +1,154 @@
+"""Persisted EPFO contribution ledger.
+
+Parsed passbook rows (app/epfo_normalize.py) are upserted into
+epfo_contributions, unique on (user_id, uan, member_id, month), so
+re-fetching the same passbook updates rows in place instead of piling up
+another JSON blob. Balances, charts and dashboard totals aggregate this table in SQL.
+"""
+import datetime
+import os
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal, get_async_engine
+from app.epfo_normalize import EPFOContribution, financial_year
+from app.models import EPFOContributionRecord
+
+UPSERT_BATCH_SIZE = int(os.getenv("EPFO_UPSERT_BATCH_SIZE", "1000"))
+
+CONFLICT_COLUMNS = ("user_id", "uan", "member_id", "month")
+UPDATE_COLUMNS = ("establishment", "employee_share", "employer_share", "pension_share", "transaction_id", "updated_at")
+
+
+def _insert_for(dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+    else:
+        raise ValueError(f"Upsert not supported for dialect {dialect}")
+    return insert
+
+
+def upsert_statement(dialect: str, values: List[dict]):
+    """INSERT ... ON CONFLICT/DUPLICATE KEY UPDATE for one batch of rows."""
+    stmt = _insert_for(dialect)(EPFOContributionRecord).values(values)
+    if dialect == "mysql":
+        return stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in UPDATE_COLUMNS})
+    return stmt.on_conflict_do_update(
+        index_elements=list(CONFLICT_COLUMNS),
+        set_={c: stmt.excluded[c] for c in UPDATE_COLUMNS},
+    )
+
+
+def _merge(rows: Iterable[EPFOContribution]) -> Dict[Tuple[str, datetime.date], list]:
+    # a month can be posted twice for one member id (arrears); one row per key
+    merged: Dict[Tuple[str, datetime.date], list] = {}
+    for row in rows:
+        key = (row.member_id or "", row.month)
+        acc = merged.get(key)
+        if acc is None:
+            merged[key] = [row.establishment, row.employee_share, row.employer_share, row.pension_share]
+        else:
+            acc[1] += row.employee_share
+            acc[2] += row.employer_share
+            acc[3] += row.pension_share
+    return merged
+
+
+async def upsert_contributions(db: AsyncSession, user_id, uan: str, rows: Iterable[EPFOContribution], transaction_id: Optional[str] = None) -> int:
+    """Upsert parsed ledger rows for one UAN; the caller commits. Returns
+    the number of distinct (member id, month) rows written."""
+    now = datetime.datetime.utcnow()
+    values = [
+        {
+            "user_id": user_id,
+            "uan": uan,
+            "member_id": member_id,
+            "month": month,
+            "establishment": establishment,
+            "employee_share": ee,
+            "employer_share": er,
+            "pension_share": eps,
+            "transaction_id": transaction_id,
+            "updated_at": now,
+        }
+        for (member_id, month), (establishment, ee, er, eps) in _merge(rows).items()
+    ]
+    dialect = db.get_bind().dialect.name
+    for i in range(0, len(values), UPSERT_BATCH_SIZE):
+        await db.execute(upsert_statement(dialect, values[i:i + UPSERT_BATCH_SIZE]))
+    return len(values)
+
+
+def _shares():
+    t = EPFOContributionRecord
+    return (
+        func.sum(t.employee_share).label("employee_share"),
+        func.sum(t.employer_share).label("employer_share"),
+        func.sum(t.pension_share).label("pension_share"),
+    )
+
+
+def monthly_contributions_query(user_id, date_from=None, date_to=None):
+    """Per-month sums across UANs and member ids, oldest first (charts)."""
+    t = EPFOContributionRecord
+    stmt = select(t.month, *_shares()).where(t.user_id == user_id)
+    if date_from is not None:
+        stmt = stmt.where(t.month >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(t.month <= date_to)
+    return stmt.group_by(t.month).order_by(t.month)
+
+
+def financial_year_totals_query(user_id):
+    """Per financial year (April-March) sums, keyed by the FY start year."""
+    t = EPFOContributionRecord
+    year = func.extract("year", t.month)
+    fy_start = case((func.extract("month", t.month) < 4, year - 1), else_=year).label("fy_start")
+    return (
+        select(fy_start, *_shares(), func.count(func.distinct(t.month)).label("months"))
+        .where(t.user_id == user_id)
+        .group_by(fy_start)
+        .order_by(fy_start)
+    )
+
+
+def _amounts(row) -> dict:
+    ee, er, eps = (Decimal(row.employee_share or 0), Decimal(row.employer_share or 0), Decimal(row.pension_share or 0))
+    return {
+        "employee_share": float(ee),
+        "employer_share": float(er),
+        "pension_share": float(eps),
+        "total": float(ee + er + eps),
+    }
+
+
+async def monthly_contributions(db: AsyncSession, user_id, date_from=None, date_to=None) -> List[dict]:
+    result = await db.execute(monthly_contributions_query(user_id, date_from, date_to))
+    return [{"month": r.month.strftime("%Y-%m"), **_amounts(r)} for r in result]
+
+
+async def financial_year_totals(db: AsyncSession, user_id) -> List[dict]:
+    result = await db.execute(financial_year_totals_query(user_id))
+    totals = []
+    for r in result:
+        fy = financial_year(datetime.date(int(r.fy_start), 4, 1))
+        totals.append({"financial_year": fy, **_amounts(r), "months": r.months})
+    return totals
+
+
+async def contributions_total(user_id):
+    """(sum of all shares, latest updated_at) for the dashboard summary, on a
+    session of its own since the dashboard route has no SQLAlchemy session."""
+    t = EPFOContributionRecord
+    stmt = select(
+        func.coalesce(func.sum(t.employee_share + t.employer_share + t.pension_share), 0),
+        func.max(t.updated_at),
+    ).where(t.user_id == user_id)
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        total, updated_at = (await db.execute(stmt)).one()
+    return float(total), updated_at
@@ -0,0 +1,258 @@
+"""Normalization of Surepass EPFO responses.
+
+Surepass has shipped several shapes for the same data: the summary fields
+sit under ``passbook``, ``data`` or at the top level, and the contribution
+ledger is either one flat ``contributions`` list or a ``companies`` map
+with one passbook per member id (one per employer). Field lookups are
+compiled once at import into tuples of key paths, so normalizing a
+response is a straight walk with no per-request setup.
+"""
+import datetime
+import re
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# containers probed for summary fields, in priority order ("" = top level)
+SUMMARY_CONTAINERS = ("passbook", "data", "")
+
+SUMMARY_FIELDS = {
+    "balance": ("balance", "total_balance", "current_balance"),
+    "last_contribution": ("last_contribution_date", "last_contribution", "last_contribution_on"),
+    "employer": ("employer", "employer_name", "establishment"),
+    "member_name": ("member_name", "name", "member", "full_name"),
+    "uan": ("uan", "member_uan"),
+    "contributions_count": ("contributions_count",),
+}
+
+# fields of one ledger entry; first key present wins
+ENTRY_FIELDS = {
+    "month": ("month_year", "wage_month", "month", "approved_on", "date"),
+    "employee_share": ("employee_share", "ee_share", "employee"),
+    "employer_share": ("employer_share", "er_share", "employer"),
+    "pension_share": ("pension_share", "pension", "eps_share", "eps"),
+    "kind": ("type", "transaction_type", "kind"),
+    "member_id": ("member_id", "memberid"),
+    "establishment": ("establishment_name", "company_name", "establishment"),
+}
+
+COMPANY_FIELDS = {
+    "member_id": ("member_id", "memberid"),
+    "establishment": ("company_name", "establishment_name", "establishment", "employer_name"),
+    "entries": ("passbook", "contributions", "entries"),
+}
+
+ZERO = Decimal(0)
+_MONTHS = {m: i for i, m in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1)}
+_NUMERIC_MONTH = re.compile(r"^(\d{1,2})[-/]?(\d{4})$")
+_ISO_MONTH = re.compile(r"^(\d{4})-(\d{1,2})(?:-\d{1,2})?")
+_DMY = re.compile(r"^\d{1,2}[-/](\d{1,2})[-/](\d{4})$")
+_NAMED_MONTH = re.compile(r"^([A-Za-z]{3})[A-Za-z]*[-/ ]?(\d{2}|\d{4})$")
+
+Path = Tuple[str, ...]
+_SCALARS = (str, int, float)
+
+
+def compile_paths(containers: Iterable[str], keys: Iterable[str]) -> Tuple[Path, ...]:
+    """Expand container x key alternatives into concrete key paths."""
+    keys = tuple(keys)
+    return tuple(tuple(p for p in (c, k) if p) for c in containers for k in keys)
+
+
+def extract(obj: Any, paths: Tuple[Path, ...], types: Optional[tuple] = None) -> Any:
+    """Value at the first path that resolves to something non-empty (and,
+    if ``types`` is given, of one of those types)."""
+    for path in paths:
+        value = obj
+        for key in path:
+            if not isinstance(value, dict):
+                value = None
+                break
+            value = value.get(key)
+        if value is not None and value != "" and (types is None or isinstance(value, types)):
+            return value
+    return None
+
+
+_SUMMARY_SPECS = {name: compile_paths(SUMMARY_CONTAINERS, keys) for name, keys in SUMMARY_FIELDS.items()}
+_ENTRY_SPECS = {name: compile_paths(("",), keys) for name, keys in ENTRY_FIELDS.items()}
+_COMPANY_SPECS = {name: compile_paths(("",), keys) for name, keys in COMPANY_FIELDS.items()}
+_LEDGER_SPECS = (
+    compile_paths(SUMMARY_CONTAINERS, ("companies", "establishments", "employers")),
+    compile_paths(SUMMARY_CONTAINERS, ("contributions", "passbook_entries", "entries", "passbook")),
+)
+
+
+@dataclass(frozen=True)
+class EPFOContribution:
+    """One monthly credit in the passbook of a single member id."""
+    member_id: Optional[str]
+    establishment: Optional[str]
+    month: datetime.date  # first day of the wage month
+    employee_share: Decimal
+    employer_share: Decimal
+    pension_share: Decimal
+
+    @property
+    def total(self) -> Decimal:
+        return self.employee_share + self.employer_share + self.pension_share
+
+    @property
+    def financial_year(self) -> str:
+        return financial_year(self.month)
+
+
+def financial_year(month: datetime.date) -> str:
+    """Indian financial year label (April-March), e.g. 2023-03 -> "2022-23"."""
+    start = month.year if month.month >= 4 else month.year - 1
+    return f"{start}-{(start + 1) % 100:02d}"
+
+
+def parse_amount(value: Any) -> Decimal:
+    if value is None or value == "":
+        return ZERO
+    if isinstance(value, (int, Decimal)):
+        amount = Decimal(value)
+    elif isinstance(value, float):
+        amount = Decimal(str(value))
+    else:
+        try:
+            amount = Decimal(str(value).replace(",", "").replace("₹", "").strip() or 0)
+        except InvalidOperation:
+            return ZERO
+    # NaN/Infinity would end up in normalized_json, which must stay valid JSON
+    return amount if amount.is_finite() else ZERO
+
+
+def parse_month(value: Any) -> Optional[datetime.date]:
+    """First day of the month named by MMYYYY, MM-YYYY, YYYY-MM[-DD],
+    DD-MM-YYYY or Mon-YYYY / Mon-YY; None if unrecognised."""
+    if isinstance(value, datetime.date):
+        return value.replace(day=1)
+    if not isinstance(value, str):
+        return None
+    s = value.strip()
+    year = month = None
+    m = _NUMERIC_MONTH.match(s)
+    if m:
+        month, year = int(m.group(1)), int(m.group(2))
+    elif (m := _ISO_MONTH.match(s)):
+        year, month = int(m.group(1)), int(m.group(2))
+    elif (m := _DMY.match(s)):
+        month, year = int(m.group(1)), int(m.group(2))
+    elif (m := _NAMED_MONTH.match(s)):
+        month = _MONTHS.get(m.group(1).lower())
+        year = int(m.group(2))
+        if year < 100:
+            year += 2000
+    if not month or not 1 <= month <= 12 or not datetime.MINYEAR <= year <= datetime.MAXYEAR:
+        return None
+    return datetime.date(year, month, 1)
+
+
+def _entry_to_row(entry: Any, member_id: Optional[str], establishment: Optional[str]) -> Optional[EPFOContribution]:
+    if not isinstance(entry, dict):
+        return None
+    kind = extract(entry, _ENTRY_SPECS["kind"])
+    # interest postings and transfers/withdrawals are not monthly contributions
+    if isinstance(kind, str) and kind.strip().upper() not in ("CR", "CREDIT", "CONTRIBUTION"):
+        return None
+    month = parse_month(extract(entry, _ENTRY_SPECS["month"]))
+    if month is None:
+        return None
+    return EPFOContribution(
+        member_id=extract(entry, _ENTRY_SPECS["member_id"]) or member_id,
+        establishment=extract(entry, _ENTRY_SPECS["establishment"]) or establishment,
+        month=month,
+        employee_share=parse_amount(extract(entry, _ENTRY_SPECS["employee_share"])),
+        employer_share=parse_amount(extract(entry, _ENTRY_SPECS["employer_share"])),
+        pension_share=parse_amount(extract(entry, _ENTRY_SPECS["pension_share"])),
+    )
+
+
+def _companies(value: Any) -> List[Tuple[Optional[str], Any]]:
+    # {"<member id>": {...}} or [{"member_id": ..., ...}]
+    if isinstance(value, dict):
+        return [(str(k), v) for k, v in value.items()]
+    if isinstance(value, list):
+        return [(None, v) for v in value]
+    return []
+
+
+def parse_ledger(raw: Any) -> List[EPFOContribution]:
+    """All contribution rows in the response, across every member id."""
+    rows: List[EPFOContribution] = []
+    companies = extract(raw, _LEDGER_SPECS[0], (dict, list))
+    for key, company in _companies(companies):
+        if not isinstance(company, dict):
+            continue
+        member_id = extract(company, _COMPANY_SPECS["member_id"]) or key
+        establishment = extract(company, _COMPANY_SPECS["establishment"])
+        for entry in extract(company, _COMPANY_SPECS["entries"], (list,)) or ():
+            row = _entry_to_row(entry, member_id, establishment)
+            if row is not None:
+                rows.append(row)
+    for entry in extract(raw, _LEDGER_SPECS[1], (list,)) or ():
+        row = _entry_to_row(entry, None, None)
+        if row is not None:
+            rows.append(row)
+    return rows
+
+
+def totals_by_financial_year(rows: Iterable[EPFOContribution]) -> List[Dict[str, Any]]:
+    """Per-FY sums of each share, oldest first; one pass over the ledger."""
+    columns: Dict[str, List[Decimal]] = {}
+    months: Dict[str, set] = {}
+    for row in rows:
+        fy = row.financial_year
+        acc = columns.get(fy)
+        if acc is None:
+            acc = columns[fy] = [ZERO, ZERO, ZERO]
+            months[fy] = set()
+        acc[0] += row.employee_share
+        acc[1] += row.employer_share
+        acc[2] += row.pension_share
+        months[fy].add(row.month)
+    return [
+        {
+            "financial_year": fy,
+            "employee_share": float(ee),
+            "employer_share": float(er),
+            "pension_share": float(eps),
+            "total": float(ee + er + eps),
+            "months": len(months[fy]),
+        }
+        for fy, (ee, er, eps) in sorted(columns.items())
+    ]
+
+
+def normalize_epfo(raw: Any, rows: Optional[List[EPFOContribution]] = None) -> Dict[str, Any]:
+    """Flat summary stored in EPFOSummary.normalized_json and shown in the UI.
+
+    ``rows`` may be passed when the caller already parsed the ledger.
+    """
+    norm: Dict[str, Any] = {}
+    if isinstance(raw, dict):
+        for name, paths in _SUMMARY_SPECS.items():
+            value = extract(raw, paths, _SCALARS)
+            if value is not None:
+                norm[name] = value
+        if rows is None:
+            rows = parse_ledger(raw)
+        if rows:
+            norm["contributions_count"] = len(rows)
+            norm.setdefault("last_contribution", max(r.month for r in rows).isoformat())
+            norm["member_ids"] = sorted({r.member_id for r in rows if r.member_id})
+            norm["totals_by_financial_year"] = totals_by_financial_year(rows)
+        elif "contributions_count" not in norm:
+            entries = extract(raw, _LEDGER_SPECS[1], (list,))
+            if entries:
+                norm["contributions_count"] = len(entries)
+        if "balance" not in norm:
+            for k in ("total", "amount"):
+                if raw.get(k) is not None:
+                    norm["balance"] = raw[k]
+                    break
+    norm["normalized_at"] = datetime.datetime.utcnow().isoformat()
+    return norm
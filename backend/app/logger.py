@@ -1,7 +1,39 @@
 
-import logging
+import os
 import sys
 import json
+import copy
+import queue
+import atexit
+import random
+import logging
+import importlib
+from logging.handlers import QueueHandler, QueueListener
+
+# orjson is optional; it serialises log records several times faster than the
+# stdlib encoder.
+_orjson = importlib.import_module("orjson") if importlib.util.find_spec("orjson") is not None else None
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Handlers run on a background thread fed by a queue, so request paths only
+# pay for building the record. LOG_ASYNC=0 writes synchronously (handy when
+# debugging ordering with prints).
+LOG_ASYNC = os.getenv("LOG_ASYNC", "1") == "1"
+# Fraction of successful (<400), fast requests written to the access log.
+# Errors and requests slower than ACCESS_LOG_SLOW_MS are always logged.
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "1.0"))
+ACCESS_LOG_SLOW_MS = float(os.getenv("ACCESS_LOG_SLOW_MS", "1000"))
+
+_exc_formatter = logging.Formatter()
+# Attributes every LogRecord has; anything else came in via `extra=`.
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+def _dumps(obj) -> str:
+    if _orjson is not None:
+        return _orjson.dumps(obj, default=str).decode()
+    return json.dumps(obj, default=str, ensure_ascii=False, separators=(",", ":"))
+
 
 class JsonFormatter(logging.Formatter):
     def format(self, record):
@@ -11,15 +43,54 @@ class JsonFormatter(logging.Formatter):
             "logger": record.name,
             "message": record.getMessage(),
         }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                log_record[key] = value
         if record.exc_info:
             log_record["exc_info"] = self.formatException(record.exc_info)
-        return json.dumps(log_record)
+        elif record.exc_text:
+            log_record["exc_info"] = record.exc_text
+        return _dumps(log_record)
+
+
+class _QueueHandler(QueueHandler):
+    """Resolve message args and tracebacks on the caller's thread (they may
+    change or go away), but leave JSON serialisation to the listener thread.
+    The stock prepare() would fold the traceback into the message text.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def should_log_access(status_code: int, duration_ms: float) -> bool:
+    """Sampling decision for one access-log line."""
+    if status_code >= 400 or duration_ms >= ACCESS_LOG_SLOW_MS or ACCESS_LOG_SAMPLE_RATE >= 1.0:
+        return True
+    return random.random() < ACCESS_LOG_SAMPLE_RATE
+
 
 handler = logging.StreamHandler(sys.stdout)
 handler.setFormatter(JsonFormatter())
 
+log_queue = queue.SimpleQueue()
+queue_handler = _QueueHandler(log_queue)
+listener = QueueListener(log_queue, handler, respect_handler_level=True)
+
 root = logging.getLogger()
-root.setLevel(logging.INFO)
-root.handlers = [handler]
+root.setLevel(LOG_LEVEL)
+if LOG_ASYNC:
+    root.handlers = [queue_handler]
+    listener.start()
+    # flush whatever is still queued when the process exits
+    atexit.register(listener.stop)
+else:
+    root.handlers = [handler]
 
 logger = logging.getLogger("family_office")
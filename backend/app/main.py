@@ -1,20 +1,44 @@
-from fastapi import FastAPI, Request, Depends
+from fastapi import FastAPI, Request, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 from app.auth import verify_jwt_token
-from fastapi.staticfiles import StaticFiles
+from app.uploads import CachedStaticFiles, UPLOADS_DIR
 from fastapi.middleware.cors import CORSMiddleware
 from app.middleware import LoggingMiddleware
 
-from app.api.v1.endpoints import users, households, assets, email_auth, tax_itr, epfo, profile, family, liabilities, insurance, reports, dashboard, income_expense
+from app.api.v1.endpoints import users, households, assets, email_auth, tax_itr, epfo, profile, family, liabilities, insurance, reports, dashboard, income_expense, cashflow
 from app.api.v1.endpoints import surepass_epfo
 from app.models import IncomeRecord, ExpenseRecord
-from app.database import SessionLocal
+from app.database import get_async_db, dispose_async_engine
+from app.bulk_import import bulk_import_route
+from app.pagination import record_query, split_page, stream_csv_async, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from app.schemas import IncomeRecordCreate, IncomeRecordOut, ExpenseRecordCreate, ExpenseRecordOut
 from fastapi import status
-from typing import List
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from contextlib import asynccontextmanager
+from app.surepass_client import close_client as close_surepass_client
+from app.storage_upload import close_client as close_storage_client
+from app.pg_pool import close_pg_pool
+from app.auth_helpers import jwks_store
+from app.metrics import render_metrics
 import datetime
+import os
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+	# Keep JWKS warm so requests don't block on a key fetch
+	jwks_store.start()
+	yield
+	await jwks_store.stop()
+	# Release pooled upstream connections on shutdown
+	await close_surepass_client()
+	await close_storage_client()
+	await close_pg_pool()
+	await dispose_async_engine()
+
 
-app = FastAPI(title="Family Office as a Service")
+app = FastAPI(title="Family Office as a Service", lifespan=lifespan)
 app.add_middleware(LoggingMiddleware)
 
 # Allow CORS for frontend
@@ -26,7 +50,8 @@ app.add_middleware(
 	allow_headers=["*"],
 )
 
-app.mount("/uploads", StaticFiles(directory="/tmp/uploads"), name="uploads")
+os.makedirs(UPLOADS_DIR, exist_ok=True)
+app.mount("/uploads", CachedStaticFiles(directory=UPLOADS_DIR), name="uploads")
 
 
 
@@ -42,6 +67,7 @@ app.include_router(reports.router, prefix="/api/v1/reports", tags=["reports"])
 app.include_router(dashboard.router, prefix="/api/v1/dashboard", tags=["dashboard"])
 app.include_router(email_auth.router, prefix="/api/v1/users", tags=["auth"])
 app.include_router(income_expense.router, prefix="/api/v1", tags=["income-expense"])
+app.include_router(cashflow.router, prefix="/api/v1/cashflow", tags=["cashflow"])
 app.include_router(tax_itr.router, prefix="/api/v1/tax-itr", tags=["tax-itr"])
 app.include_router(epfo.router, prefix="/api/v1/epfo", tags=["epfo"])
 app.include_router(surepass_epfo.router, prefix="/api", tags=["surepass"])
@@ -55,6 +81,13 @@ def protected_check(user=Depends(verify_jwt_token)):
 async def health():
     return {"status": "ok"}
 
+
+# Prometheus scrape endpoint (per-route latency, Surepass, pools, caches)
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 # Supabase Google OAuth endpoint
 import os
 from fastapi.responses import RedirectResponse
@@ -102,7 +135,7 @@ class ITRAISRequest(BaseModel):
 async def surepass_epfo_generate_otp(payload: EPFOGenerateOTPRequest, user=Depends(verify_jwt_token)):
 	try:
 		logger.info(f"EPFO Generate OTP request by user: {user.get('sub')}")
-		result = await sp_post("/epfo/generate-otp", payload.dict())
+		result = await sp_post("/epfo/generate-otp", payload.dict(), user_id=user.get("sub"))
 		return result
 	except Exception as e:
 		logger.error(f"EPFO Generate OTP error: {str(e)}")
@@ -112,7 +145,7 @@ async def surepass_epfo_generate_otp(payload: EPFOGenerateOTPRequest, user=Depen
 async def surepass_epfo_submit_otp(payload: EPFOSubmitOTPRequest, user=Depends(verify_jwt_token)):
 	try:
 		logger.info(f"EPFO Submit OTP request by user: {user.get('sub')}")
-		result = await sp_post("/epfo/submit-otp", payload.dict())
+		result = await sp_post("/epfo/submit-otp", payload.dict(), user_id=user.get("sub"))
 		return result
 	except Exception as e:
 		logger.error(f"EPFO Submit OTP error: {str(e)}")
@@ -122,7 +155,7 @@ async def surepass_epfo_submit_otp(payload: EPFOSubmitOTPRequest, user=Depends(v
 async def surepass_epfo_passbook(payload: EPFOPassbookRequest, user=Depends(verify_jwt_token)):
 	try:
 		logger.info(f"EPFO Passbook request by user: {user.get('sub')}")
-		result = await sp_post("/epfo/passbook", payload.dict())
+		result = await sp_post("/epfo/passbook", payload.dict(), user_id=user.get("sub"))
 		return result
 	except Exception as e:
 		logger.error(f"EPFO Passbook error: {str(e)}")
@@ -132,24 +165,15 @@ async def surepass_epfo_passbook(payload: EPFOPassbookRequest, user=Depends(veri
 async def surepass_itr_ais(payload: ITRAISRequest, user=Depends(verify_jwt_token)):
 	try:
 		logger.info(f"ITR AIS request by user: {user.get('sub')}")
-		result = await sp_post("/itr/ais", payload.dict())
+		result = await sp_post("/itr/ais", payload.dict(), user_id=user.get("sub"))
 		return result
 	except Exception as e:
 		logger.error(f"ITR AIS error: {str(e)}")
 		raise HTTPException(status_code=500, detail="Surepass ITR AIS failed")
 
 
-# Dependency to get DB session
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @app.post("/api/income", response_model=IncomeRecordOut, status_code=status.HTTP_201_CREATED)
-async def create_income_record(payload: IncomeRecordCreate, user=Depends(verify_jwt_token), db: Session = Depends(get_db)):
+async def create_income_record(payload: IncomeRecordCreate, user=Depends(verify_jwt_token), db: AsyncSession = Depends(get_async_db)):
     record = IncomeRecord(
         user_id=user["sub"],
         source=payload.source,
@@ -162,16 +186,37 @@ async def create_income_record(payload: IncomeRecordCreate, user=Depends(verify_
         updated_at=datetime.datetime.utcnow(),
     )
     db.add(record)
-    db.commit()
-    db.refresh(record)
+    await db.commit()
+    await db.refresh(record)
     return record
 
 @app.get("/api/income", response_model=List[IncomeRecordOut])
-async def list_income_records(user=Depends(verify_jwt_token), db: Session = Depends(get_db)):
-    return db.query(IncomeRecord).filter(IncomeRecord.user_id == user["sub"]).all()
+async def list_income_records(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+    category: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|csv)$"),
+    user=Depends(verify_jwt_token),
+    db: AsyncSession = Depends(get_async_db),
+):
+    filters = dict(date_from=date_from, date_to=date_to, category=category)
+    if format == "csv":
+        stmt = record_query(IncomeRecord, IncomeRecord.date_received, user["sub"], **filters)
+        return StreamingResponse(stream_csv_async(stmt, IncomeRecord), media_type="text/csv", headers={"Content-Disposition": 'attachment; filename="income.csv"'})
+    stmt = record_query(IncomeRecord, IncomeRecord.date_received, user["sub"], cursor=cursor, limit=limit, **filters)
+    result = await db.execute(stmt)
+    records, next_cursor = split_page(result.scalars().all(), limit, "date_received")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return records
+
+app.post("/api/income/bulk")(bulk_import_route(IncomeRecord, IncomeRecordCreate, "date_received"))
 
 @app.post("/api/expenses", response_model=ExpenseRecordOut, status_code=status.HTTP_201_CREATED)
-async def create_expense_record(payload: ExpenseRecordCreate, user=Depends(verify_jwt_token), db: Session = Depends(get_db)):
+async def create_expense_record(payload: ExpenseRecordCreate, user=Depends(verify_jwt_token), db: AsyncSession = Depends(get_async_db)):
     record = ExpenseRecord(
         user_id=user["sub"],
         category=payload.category,
@@ -185,10 +230,31 @@ async def create_expense_record(payload: ExpenseRecordCreate, user=Depends(verif
         updated_at=datetime.datetime.utcnow(),
     )
     db.add(record)
-    db.commit()
-    db.refresh(record)
+    await db.commit()
+    await db.refresh(record)
     return record
 
 @app.get("/api/expenses", response_model=List[ExpenseRecordOut])
-async def list_expense_records(user=Depends(verify_jwt_token), db: Session = Depends(get_db)):
-    return db.query(ExpenseRecord).filter(ExpenseRecord.user_id == user["sub"]).all()
+async def list_expense_records(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+    category: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|csv)$"),
+    user=Depends(verify_jwt_token),
+    db: AsyncSession = Depends(get_async_db),
+):
+    filters = dict(date_from=date_from, date_to=date_to, category=category)
+    if format == "csv":
+        stmt = record_query(ExpenseRecord, ExpenseRecord.date_incurred, user["sub"], **filters)
+        return StreamingResponse(stream_csv_async(stmt, ExpenseRecord), media_type="text/csv", headers={"Content-Disposition": 'attachment; filename="expenses.csv"'})
+    stmt = record_query(ExpenseRecord, ExpenseRecord.date_incurred, user["sub"], cursor=cursor, limit=limit, **filters)
+    result = await db.execute(stmt)
+    records, next_cursor = split_page(result.scalars().all(), limit, "date_incurred")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return records
+
+app.post("/api/expenses/bulk")(bulk_import_route(ExpenseRecord, ExpenseRecordCreate, "date_incurred"))
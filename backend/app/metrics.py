@@ -0,0 +1,103 @@
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client.core import GaugeMetricFamily, CounterMetricFamily
+
+# Dedicated registry so importing the app twice (tests, reloads) doesn't
+# trip duplicate-registration errors on the global default registry.
+registry = CollectorRegistry()
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests by route template and status.",
+    ["method", "route", "status"], registry=registry,
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.",
+    ["method", "route"], buckets=LATENCY_BUCKETS, registry=registry,
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.",
+    registry=registry,
+)
+surepass_request_duration_seconds = Histogram(
+    "surepass_request_duration_seconds", "Surepass upstream call latency.",
+    ["endpoint"], buckets=LATENCY_BUCKETS, registry=registry,
+)
+surepass_errors_total = Counter(
+    "surepass_errors_total", "Failed Surepass upstream calls (non-2xx status or transport error).",
+    ["endpoint", "reason"], registry=registry,
+)
+surepass_cache_requests_total = Counter(
+    "surepass_cache_requests_total", "Surepass PAN/AIS response cache lookups.",
+    ["source", "result"], registry=registry,
+)
+surepass_deduplicated_total = Counter(
+    "surepass_deduplicated_total", "Surepass calls served without a new upstream request.",
+    ["endpoint", "kind"], registry=registry,
+)
+
+
+def route_label(scope) -> str:
+    """Route template (e.g. /api/v1/assets/{id}) so raw ids don't explode
+    label cardinality; requests that matched no route share one label."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def observe_request(method: str, route: str, status: int, seconds: float):
+    http_requests_total.labels(method, route, str(status)).inc()
+    http_request_duration_seconds.labels(method, route).observe(seconds)
+
+
+class PoolAndCacheCollector:
+    """Reads pool and cache stats at scrape time instead of on every request."""
+
+    def collect(self):
+        # imported lazily: these modules build engines/caches at import time
+        from app import database
+        from app.auth import verified_token_cache
+        from app.cache import dashboard_summary_cache
+        from app.pg_pool import pg_pool_stats
+
+        pg = pg_pool_stats()
+        pg_gauge = GaugeMetricFamily("pg_pool_connections", "asyncpg pool connections.", labels=["state"])
+        for state in ("size", "idle", "in_use", "max_size"):
+            pg_gauge.add_metric([state], pg[state])
+        yield pg_gauge
+        yield CounterMetricFamily("pg_pool_acquires", "asyncpg pool acquires.", value=pg["acquires"])
+        yield CounterMetricFamily("pg_pool_saturated_acquires", "Acquires that had to wait for a connection.", value=pg["saturated_acquires"])
+
+        sa_gauge = GaugeMetricFamily("sqlalchemy_pool_connections", "SQLAlchemy pool connections.", labels=["engine", "state"])
+        sa_events = CounterMetricFamily("sqlalchemy_pool_events", "SQLAlchemy pool events.", labels=["engine", "event"])
+        engines = [("sync", database.engine)]
+        if database._async_engine is not None:
+            engines.append(("async", database._async_engine.sync_engine))
+        for name, bind in engines:
+            stats = database.pool_stats(bind)
+            for state in ("size", "checkedin", "checkedout", "overflow"):
+                if state in stats:
+                    sa_gauge.add_metric([name, state], stats[state])
+            for event in ("connects", "checkouts", "checkins", "invalidations"):
+                sa_events.add_metric([name, event], stats[event])
+        yield sa_gauge
+        yield sa_events
+
+        hits = CounterMetricFamily("cache_hits", "Cache hits.", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache misses.", labels=["cache"])
+        size = GaugeMetricFamily("cache_entries", "Entries held by in-process caches.", labels=["cache"])
+        for name, cache in (("dashboard_summary", dashboard_summary_cache), ("verified_token", verified_token_cache)):
+            stats = cache.stats()
+            hits.add_metric([name], stats["hits"])
+            misses.add_metric([name], stats["misses"])
+            if "size" in stats:
+                size.add_metric([name], stats["size"])
+        yield hits
+        yield misses
+        yield size
+
+
+registry.register(PoolAndCacheCollector())
+
+
+def render_metrics():
+    return generate_latest(registry), CONTENT_TYPE_LATEST
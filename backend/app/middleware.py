@@ -1,22 +1,62 @@
-from fastapi import Request
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from .logger import logger
-import traceback
+from .logger import logger, should_log_access
+from .metrics import http_requests_in_flight, observe_request, route_label
+import logging
 import time
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start = time.time()
+class LoggingMiddleware:
+    """Access log and last-resort 500 handler as a plain ASGI middleware.
+
+    Unlike BaseHTTPMiddleware this calls the app directly: no extra task or
+    memory stream per request, and streaming responses pass through as-is.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status_code = None
+        response_started = False
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_started = True
+            await send(message)
+
+        method = scope["method"]
+        path = scope["path"]
+        http_requests_in_flight.inc()
         try:
-            response = await call_next(request)
-            process_time = (time.time() - start) * 1000
-            logger.info(f"🟢 {request.method} {request.url.path} {response.status_code} {process_time:.2f}ms")
-            return response
+            await self.app(scope, receive, send_wrapper)
         except Exception as exc:
-            tb = traceback.format_exc()
-            logger.error(f"🔴 {request.method} {request.url.path} 500\n{tb}")
-            return JSONResponse(
+            observe_request(method, route_label(scope), 500, time.perf_counter() - start)
+            logger.error(
+                "🔴 %s %s 500", method, path, exc_info=True,
+                extra={"method": method, "path": path, "status": 500},
+            )
+            if response_started:
+                # headers are already on the wire; nothing sane to send now
+                raise
+            response = JSONResponse(
                 status_code=500,
                 content={"error": "Internal server error", "detail": str(exc)},
             )
+            await response(scope, receive, send)
+            return
+        finally:
+            http_requests_in_flight.dec()
+        elapsed = time.perf_counter() - start
+        observe_request(method, route_label(scope), status_code or 500, elapsed)
+        process_time = elapsed * 1000
+        # %-style args: the line is only rendered if it is actually emitted
+        if logger.isEnabledFor(logging.INFO) and should_log_access(status_code or 500, process_time):
+            logger.info(
+                "🟢 %s %s %s %.2fms", method, path, status_code, process_time,
+                extra={"method": method, "path": path, "status": status_code, "duration_ms": round(process_time, 2)},
+            )
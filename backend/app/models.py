@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Date, Enum, ForeignKey, JSON, Boolean, TIMESTAMP, Numeric, DateTime
+from sqlalchemy import Column, Integer, String, Date, Enum, ForeignKey, JSON, Boolean, TIMESTAMP, Numeric, DateTime, Index, UniqueConstraint, Text
+from sqlalchemy.dialects import mysql
 from sqlalchemy.orm import relationship
 from .database import Base
 import uuid
@@ -56,6 +57,7 @@ class IncomeRecord(Base):
     notes = Column(String(255))
     created_at = Column(DateTime)
     updated_at = Column(DateTime)
+    __table_args__ = (Index("idx_income_records_user_date", "user_id", "date_received", "id"),)
 
 class ExpenseRecord(Base):
     __tablename__ = "expense_records"
@@ -70,6 +72,7 @@ class ExpenseRecord(Base):
     notes = Column(String(255))
     created_at = Column(DateTime)
     updated_at = Column(DateTime)
+    __table_args__ = (Index("idx_expense_records_user_date", "user_id", "date_incurred", "id"),)
 
 
 class EPFOOTPRequest(Base):
@@ -90,3 +93,44 @@ class EPFOSummary(Base):
     raw_json = Column(JSON)
     normalized_json = Column(JSON, nullable=True)
     created_at = Column(DateTime, default=lambda: datetime.datetime.utcnow())
+    __table_args__ = (Index("idx_epfo_summaries_user_created", "user_id", "created_at", "id"),)
+
+
+# One monthly contribution per (user, UAN, member id); re-fetching a passbook
+# upserts onto the same row (app/epfo_contributions.py). user_id is part of
+# the key so a UAN fetched by two users (e.g. member and advisor) keeps a
+# copy per user instead of moving between them.
+class EPFOContributionRecord(Base):
+    __tablename__ = "epfo_contributions"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    uan = Column(String(32), nullable=False)
+    member_id = Column(String(64), nullable=False, default="")
+    establishment = Column(String(255))
+    month = Column(Date, nullable=False)
+    employee_share = Column(Numeric(14, 2), nullable=False, default=0)
+    employer_share = Column(Numeric(14, 2), nullable=False, default=0)
+    pension_share = Column(Numeric(14, 2), nullable=False, default=0)
+    transaction_id = Column(String(128))
+    updated_at = Column(DateTime)
+    __table_args__ = (
+        UniqueConstraint("user_id", "uan", "member_id", "month", name="uq_epfo_contributions_user_uan_member_month"),
+        Index("idx_epfo_contributions_user_month", "user_id", "month"),
+    )
+
+
+# Encrypted Surepass PAN/AIS responses (app/surepass_cache.py). lookup_key is
+# an HMAC of the PAN and year, so neither is stored in the clear.
+class SurepassResponseCache(Base):
+    __tablename__ = "surepass_response_cache"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String(36), nullable=False)
+    source = Column(String(32), nullable=False)
+    lookup_key = Column(String(64), nullable=False)
+    # AIS payloads can outgrow MySQL's 64KB TEXT
+    ciphertext = Column(Text().with_variant(mysql.MEDIUMTEXT(), "mysql"), nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    __table_args__ = (
+        UniqueConstraint("user_id", "source", "lookup_key", name="uq_surepass_response_cache_lookup"),
+    )
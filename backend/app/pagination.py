@@ -0,0 +1,86 @@
+import csv
+import io
+import base64
+import datetime
+from fastapi import HTTPException
+from sqlalchemy import select, or_, and_
+from app.database import SessionLocal, AsyncSessionLocal, get_async_engine
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 500
+
+
+def encode_cursor(date_value, record_id) -> str:
+    raw = f"{date_value.isoformat()}|{record_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, parse_date=datetime.date.fromisoformat, parse_id=str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date_part, record_id = base64.urlsafe_b64decode(padded).decode().split("|", 1)
+        return parse_date(date_part), parse_id(record_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def record_query(model, date_col, user_id, date_from=None, date_to=None, category=None, cursor=None, limit=None):
+    """Newest-first listing of a user's records, keyset-paginated on (date, id).
+
+    The (user_id, date, id) index serves both the filter and the ordering, so
+    each page is a bounded index range scan no matter how deep the cursor is.
+    """
+    stmt = select(model).where(model.user_id == user_id)
+    if date_from is not None:
+        stmt = stmt.where(date_col >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(date_col <= date_to)
+    if category is not None:
+        stmt = stmt.where(model.category == category)
+    if cursor is not None:
+        cursor_date, cursor_id = decode_cursor(cursor)
+        stmt = stmt.where(or_(date_col < cursor_date, and_(date_col == cursor_date, model.id < cursor_id)))
+    stmt = stmt.order_by(date_col.desc(), model.id.desc())
+    if limit is not None:
+        # one extra row tells us whether another page exists
+        stmt = stmt.limit(limit + 1)
+    return stmt
+
+
+def split_page(rows, limit, date_attr):
+    """Trim the look-ahead row and return (page, next_cursor or None)."""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(getattr(last, date_attr), last.id)
+
+
+def _csv_line(values):
+    buf = io.StringIO()
+    csv.writer(buf).writerow(values)
+    return buf.getvalue()
+
+
+async def stream_csv_async(stmt, model):
+    """Yield CSV lines for stmt from its own AsyncSession, batch by batch.
+
+    A dedicated session is used because the request-scoped one may be closed
+    before the streaming response finishes.
+    """
+    columns = [c.name for c in model.__table__.columns]
+    yield _csv_line(columns)
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        result = await db.stream(stmt.execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for record in result.scalars():
+            yield _csv_line([getattr(record, c) for c in columns])
+
+
+def stream_csv(stmt, model):
+    """Sync counterpart of stream_csv_async for the sync routers."""
+    columns = [c.name for c in model.__table__.columns]
+    yield _csv_line(columns)
+    with SessionLocal() as db:
+        for record in db.execute(stmt.execution_options(yield_per=STREAM_BATCH_SIZE)).scalars():
+            yield _csv_line([getattr(record, c) for c in columns])
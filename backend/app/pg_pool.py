@@ -0,0 +1,89 @@
+import os
+import time
+import asyncio
+import asyncpg
+from contextlib import asynccontextmanager
+
+# Pool sizing per worker process. With N uvicorn workers per pod and R
+# replicas, Postgres sees up to N * R * PG_POOL_MAX_SIZE backends.
+PG_POOL_MIN_SIZE = int(os.getenv("PG_POOL_MIN_SIZE", "1"))
+PG_POOL_MAX_SIZE = int(os.getenv("PG_POOL_MAX_SIZE", "10"))
+# Set to 0 when connecting through a transaction-mode pgbouncer/Supavisor.
+PG_STATEMENT_CACHE_SIZE = int(os.getenv("PG_STATEMENT_CACHE_SIZE", "100"))
+PG_POOL_MAX_IDLE_SECONDS = float(os.getenv("PG_POOL_MAX_IDLE_SECONDS", "300"))
+PG_COMMAND_TIMEOUT = float(os.getenv("PG_COMMAND_TIMEOUT", "10"))
+
+_pool = None
+_pool_lock = asyncio.Lock()
+_stats = {
+    "acquires": 0,
+    "saturated_acquires": 0,
+    "wait_ms_total": 0.0,
+    "wait_ms_max": 0.0,
+}
+
+
+def get_pg_dsn() -> str:
+    pg_url = os.environ.get("SUPABASE_DB_URL") or os.environ.get("DATABASE_URL")
+    if not pg_url:
+        raise RuntimeError("SUPABASE_DB_URL or DATABASE_URL env var required")
+    return pg_url
+
+
+async def get_pg_pool() -> asyncpg.Pool:
+    """Return the process-wide asyncpg pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await asyncpg.create_pool(
+                    get_pg_dsn(),
+                    min_size=PG_POOL_MIN_SIZE,
+                    max_size=PG_POOL_MAX_SIZE,
+                    statement_cache_size=PG_STATEMENT_CACHE_SIZE,
+                    max_inactive_connection_lifetime=PG_POOL_MAX_IDLE_SECONDS,
+                    command_timeout=PG_COMMAND_TIMEOUT,
+                )
+    return _pool
+
+
+@asynccontextmanager
+async def pg_connection():
+    """Acquire a pooled connection, recording wait time and saturation."""
+    pool = await get_pg_pool()
+    saturated = pool.get_idle_size() == 0 and pool.get_size() >= pool.get_max_size()
+    start = time.perf_counter()
+    async with pool.acquire() as conn:
+        wait_ms = (time.perf_counter() - start) * 1000
+        _stats["acquires"] += 1
+        _stats["saturated_acquires"] += int(saturated)
+        _stats["wait_ms_total"] += wait_ms
+        _stats["wait_ms_max"] = max(_stats["wait_ms_max"], wait_ms)
+        yield conn
+
+
+async def check_pg_pool() -> bool:
+    """Round-trip a trivial query to confirm the pool can reach Postgres."""
+    async with pg_connection() as conn:
+        return await conn.fetchval("SELECT 1") == 1
+
+
+def pg_pool_stats() -> dict:
+    stats = dict(_stats)
+    stats["min_size"] = PG_POOL_MIN_SIZE
+    stats["max_size"] = PG_POOL_MAX_SIZE
+    if _pool is None:
+        stats.update(size=0, idle=0, in_use=0)
+    else:
+        size, idle = _pool.get_size(), _pool.get_idle_size()
+        stats.update(size=size, idle=idle, in_use=size - idle)
+    return stats
+
+
+async def close_pg_pool():
+    """Close the shared pool; called from the application lifespan."""
+    global _pool, _pool_lock
+    if _pool is not None:
+        await _pool.close()
+    _pool = None
+    _pool_lock = asyncio.Lock()
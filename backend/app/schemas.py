@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+import datetime
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 
 class UserCreate(BaseModel):
@@ -23,27 +24,31 @@ class IncomeRecordCreate(BaseModel):
     source: str
     category: str
     amount: float
-    frequency: str = None
+    frequency: Optional[str] = None
     date_received: str
-    notes: str = None
+    notes: Optional[str] = None
 
 class IncomeRecordOut(IncomeRecordCreate):
+    model_config = ConfigDict(from_attributes=True)
     id: str
     user_id: str
-    created_at: str = None
-    updated_at: str = None
+    date_received: datetime.date
+    created_at: Optional[datetime.datetime] = None
+    updated_at: Optional[datetime.datetime] = None
 
 class ExpenseRecordCreate(BaseModel):
     category: str
-    subcategory: str = None
+    subcategory: Optional[str] = None
     amount: float
-    payment_mode: str = None
+    payment_mode: Optional[str] = None
     date_incurred: str
     recurring: bool = False
-    notes: str = None
+    notes: Optional[str] = None
 
 class ExpenseRecordOut(ExpenseRecordCreate):
+    model_config = ConfigDict(from_attributes=True)
     id: str
     user_id: str
-    created_at: str = None
-    updated_at: str = None
+    date_incurred: datetime.date
+    created_at: Optional[datetime.datetime] = None
+    updated_at: Optional[datetime.datetime] = None
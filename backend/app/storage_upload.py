@@ -0,0 +1,297 @@
+import os
+import base64
+from urllib.parse import quote
+import httpx
+from fastapi import HTTPException, Request
+
+try:
+    import python_multipart as multipart
+    from python_multipart.multipart import parse_options_header
+except ModuleNotFoundError:  # pragma: no cover - older python-multipart
+    import multipart
+    from multipart.multipart import parse_options_header
+
+# Uploads are streamed from the request to Supabase storage without holding
+# the whole file: at most a couple of UPLOAD_CHUNK_SIZE buffers per upload.
+# Files that fit in one chunk go up with a single object POST; larger ones use
+# the resumable (TUS) endpoint, which requires 6MB chunks on Supabase.
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(6 * 1024 * 1024)))
+UPLOAD_MAX_RETRIES = int(os.getenv("UPLOAD_MAX_RETRIES", "3"))
+UPLOAD_TIMEOUT = float(os.getenv("UPLOAD_TIMEOUT", "60"))
+TUS_VERSION = "1.0.0"
+
+# "public" returns bucket URLs as before; "signed" hands out short-lived
+# signed URLs so documents are fetched from storage, not via the API.
+DOCUMENT_URL_MODE = os.getenv("DOCUMENT_URL_MODE", "public")
+SIGNED_URL_TTL = int(os.getenv("SIGNED_URL_TTL", "300"))
+
+_client = None
+
+
+class StorageUploadError(Exception):
+    """Non-2xx response from Supabase storage (uploads and URL signing)."""
+
+    def __init__(self, status_code: int, body: str):
+        self.status_code = status_code
+        self.body = body
+        super().__init__(f"Storage error: {status_code} {body}")
+
+
+def _supabase_url():
+    return os.getenv("SUPABASE_URL", "<your-supabase-url>").rstrip("/")
+
+
+def _auth_headers():
+    key = os.getenv("SUPABASE_KEY", "<your-supabase-key>")
+    return {"Authorization": f"Bearer {key}", "apikey": key}
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the process-wide storage client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(base_url=_supabase_url(), headers=_auth_headers(), timeout=UPLOAD_TIMEOUT)
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+
+
+def safe_filename(name: str) -> str:
+    """Client-supplied file name reduced to a single path segment.
+
+    httpx collapses "." and ".." in request paths, so a name like
+    "../u2/x.pdf" would otherwise land outside the caller's folder.
+    """
+    base = (name or "").replace("\\", "/").rsplit("/", 1)[-1].strip()
+    return "upload" if base in ("", ".", "..") else base
+
+
+def _check_object_name(object_name: str) -> None:
+    if any(part in ("", ".", "..") for part in object_name.replace("\\", "/").split("/")):
+        raise ValueError(f"Invalid storage object name: {object_name!r}")
+
+
+def public_url(bucket: str, object_name: str) -> str:
+    return f"{_supabase_url()}/storage/v1/object/public/{bucket}/{quote(object_name)}"
+
+
+async def create_signed_url(bucket: str, object_name: str, expires_in: int = None) -> str:
+    resp = await get_client().post(f"/storage/v1/object/sign/{bucket}/{quote(object_name)}", json={"expiresIn": expires_in or SIGNED_URL_TTL})
+    if resp.status_code != 200:
+        raise StorageUploadError(resp.status_code, resp.text)
+    return f"{_supabase_url()}/storage/v1/{resp.json()['signedURL'].lstrip('/')}"
+
+
+async def document_url(bucket: str, object_name: str) -> str:
+    if DOCUMENT_URL_MODE == "signed":
+        return await create_signed_url(bucket, object_name)
+    return public_url(bucket, object_name)
+
+
+class _MultipartFileReader:
+    """Incremental multipart parser that surfaces one file field's bytes."""
+
+    def __init__(self, boundary: bytes, field: str):
+        self.field = field.encode()
+        self.filename = None
+        self.content_type = None
+        self.done = False
+        self._pending = []
+        self._headers = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._in_target = False
+        self._parser = multipart.MultipartParser(boundary, callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self):
+        self._headers = {}
+
+    def _on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if self.filename is None and options.get(b"name") == self.field and b"filename" in options:
+            self._in_target = True
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+            self.content_type = self._headers.get(b"content-type", b"application/octet-stream").decode("latin-1")
+
+    def _on_part_data(self, data, start, end):
+        if self._in_target:
+            self._pending.append(data[start:end])
+
+    def _on_part_end(self):
+        if self._in_target:
+            self._in_target = False
+            self.done = True
+
+    def feed(self, chunk: bytes):
+        self._parser.write(chunk)
+        pending, self._pending = self._pending, []
+        return pending
+
+
+async def open_multipart_file(request: Request, field: str = "file"):
+    """Parse a multipart request up to `field`'s headers without buffering it.
+
+    Returns (filename, content_type, chunks) where chunks is an async
+    iterator over the file's bytes as they arrive from the client.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+    reader = _MultipartFileReader(params[b"boundary"], field)
+    stream = request.stream().__aiter__()
+    head = []
+    while reader.filename is None:
+        try:
+            chunk = await stream.__anext__()
+        except StopAsyncIteration:
+            raise HTTPException(status_code=400, detail=f"multipart upload must include a '{field}' file")
+        head = reader.feed(chunk)
+
+    async def chunks():
+        for piece in head:
+            yield piece
+        async for chunk in stream:
+            if reader.done:
+                break
+            for piece in reader.feed(chunk):
+                yield piece
+        if not reader.done:
+            # client went away before the closing boundary: don't store a
+            # truncated file as if it were complete
+            raise HTTPException(status_code=400, detail="Incomplete multipart upload")
+
+    return reader.filename, reader.content_type, chunks()
+
+
+async def limit_size(chunks, max_bytes: int):
+    """Pass chunks through, failing with 413 as soon as max_bytes is exceeded."""
+    total = 0
+    async for chunk in chunks:
+        total += len(chunk)
+        if total > max_bytes:
+            raise HTTPException(status_code=413, detail=f"File exceeds {max_bytes} bytes")
+        yield chunk
+
+
+async def fixed_chunks(chunks, size: int):
+    """Regroup arbitrary chunks into size-byte blocks (the last may be short)."""
+    buf = bytearray()
+    async for chunk in chunks:
+        buf += chunk
+        while len(buf) >= size:
+            yield bytes(buf[:size])
+            del buf[:size]
+    if buf:
+        yield bytes(buf)
+
+
+def _tus_metadata(**values):
+    return ",".join(f"{k} {base64.b64encode(v.encode()).decode()}" for k, v in values.items())
+
+
+async def _body(data: bytes):
+    # Passed as a stream rather than bytes: httpx responses sit in reference
+    # cycles with their request, so bytes content would pin every chunk until
+    # the cyclic GC runs. A drained generator holds nothing.
+    yield data
+
+
+async def _upload_simple(client, bucket, object_name, data, content_type):
+    headers = {"Content-Type": content_type, "Content-Length": str(len(data)), "x-upsert": "false"}
+    resp = await client.post(f"/storage/v1/object/{bucket}/{quote(object_name)}", content=_body(data), headers=headers)
+    if resp.status_code not in (200, 201):
+        raise StorageUploadError(resp.status_code, resp.text)
+
+
+async def _tus_create(client, bucket, object_name, content_type):
+    resp = await client.post("/storage/v1/upload/resumable", headers={
+        "Tus-Resumable": TUS_VERSION,
+        "Upload-Defer-Length": "1",
+        "Upload-Metadata": _tus_metadata(bucketName=bucket, objectName=object_name, contentType=content_type),
+        "x-upsert": "false",
+    })
+    if resp.status_code != 201:
+        raise StorageUploadError(resp.status_code, resp.text)
+    return resp.headers["Location"]
+
+
+async def _tus_offset(client, location):
+    resp = await client.head(location, headers={"Tus-Resumable": TUS_VERSION})
+    if resp.status_code not in (200, 204):
+        raise StorageUploadError(resp.status_code, resp.text)
+    return int(resp.headers["Upload-Offset"])
+
+
+async def _tus_patch(client, location, offset, data, final_length=None):
+    """Send data at offset, resuming from the server's offset after failures."""
+    end = offset + len(data)
+    sent = offset
+    for attempt in range(UPLOAD_MAX_RETRIES + 1):
+        body = data[sent - offset:]
+        headers = {
+            "Tus-Resumable": TUS_VERSION,
+            "Upload-Offset": str(sent),
+            "Content-Type": "application/offset+octet-stream",
+            "Content-Length": str(len(body)),
+        }
+        if final_length is not None:
+            headers["Upload-Length"] = str(final_length)
+        try:
+            resp = await client.patch(location, content=_body(body), headers=headers)
+            if resp.status_code == 204:
+                return end
+            if resp.status_code < 500 and resp.status_code != 409:
+                raise StorageUploadError(resp.status_code, resp.text)
+            error = StorageUploadError(resp.status_code, resp.text)
+        except httpx.TransportError as e:
+            error = e
+        if attempt == UPLOAD_MAX_RETRIES:
+            raise error
+        sent = await _tus_offset(client, location)
+        if sent >= end:
+            return end
+
+
+async def upload_stream(bucket: str, object_name: str, chunks, content_type: str, max_bytes: int = None) -> int:
+    """Stream chunks into bucket/object_name; returns the number of bytes stored."""
+    _check_object_name(object_name)
+    client = get_client()
+    blocks = fixed_chunks(limit_size(chunks, max_bytes or UPLOAD_MAX_BYTES), UPLOAD_CHUNK_SIZE)
+    current = await anext(blocks, None) or b""
+    following = await anext(blocks, None)
+    if following is None:
+        await _upload_simple(client, bucket, object_name, current, content_type)
+        return len(current)
+    location = await _tus_create(client, bucket, object_name, content_type)
+    offset = 0
+    while current is not None:
+        # one block of look-ahead tells us when to announce the final length
+        final_length = offset + len(current) if following is None else None
+        offset = await _tus_patch(client, location, offset, current, final_length)
+        current, following = following, (await anext(blocks, None) if following is not None else None)
+    return offset
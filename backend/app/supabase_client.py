@@ -1,8 +1,35 @@
-
 import os
-from supabase import create_client, Client
+import threading
+from supabase import create_client, Client, ClientOptions
+
+_client = None
+_client_lock = threading.Lock()
 
-def get_supabase_client():
+
+def create_supabase_client(options: ClientOptions = None) -> Client:
 	SUPABASE_URL = os.getenv("SUPABASE_URL", "<your-supabase-url>")
 	SUPABASE_KEY = os.getenv("SUPABASE_KEY", "<your-supabase-key>")
-	return create_client(SUPABASE_URL, SUPABASE_KEY)
+	return create_client(SUPABASE_URL, SUPABASE_KEY, options)
+
+
+def get_supabase_client() -> Client:
+	"""Return the process-wide Supabase client, creating it on first use.
+
+	The client (and its PostgREST/storage HTTP sessions) is shared by every
+	request and thread in the worker. Never sign a user in on it: auth events
+	swap the Authorization header for all callers. Auth flows should use
+	create_supabase_client() instead.
+	"""
+	global _client
+	if _client is None:
+		with _client_lock:
+			if _client is None:
+				_client = create_supabase_client(ClientOptions(auto_refresh_token=False, persist_session=False))
+	return _client
+
+
+def reset_supabase_client():
+	"""Drop the cached client so the next call rebuilds it (used by tests)."""
+	global _client
+	with _client_lock:
+		_client = None
@@ -0,0 +1,161 @@
+"""Encrypted-at-rest cache of Surepass PAN and AIS responses.
+
+PAN comprehensive-plus and AIS data change at most yearly, so responses are
+kept per (user, source, PAN, year) in surepass_response_cache and served
+locally until they expire. Payloads are Fernet-encrypted and the PAN/year
+lookup key is an HMAC, so the table holds no readable PII. A hit is only
+served while the user has an active consent covering the source in the
+Supabase consents table (the frontend writes consents there directly), and
+deactivating a consent through the API also deletes the user's entries;
+callers can bypass the cache with force_refresh.
+
+Caching is off unless SUREPASS_CACHE_KEYS (comma-separated Fernet keys,
+newest first, to allow rotation) and SUREPASS_CACHE_HMAC_KEY are set and
+the optional `cryptography` package is installed: responses are never
+stored unencrypted. The HMAC key is separate from the Fernet keys and must
+stay fixed, so rotating the encryption key keeps existing entries
+addressable.
+"""
+import datetime
+import hashlib
+import hmac
+import importlib
+import json
+import os
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal, get_async_engine
+from app.logger import logger
+from app.metrics import surepass_cache_requests_total
+from app.models import SurepassResponseCache
+from app.pg_pool import pg_connection
+
+SUREPASS_CACHE_KEYS = [k.strip() for k in os.getenv("SUREPASS_CACHE_KEYS", "").split(",") if k.strip()]
+SUREPASS_CACHE_HMAC_KEY = os.getenv("SUREPASS_CACHE_HMAC_KEY", "")
+PAN_CACHE_TTL = float(os.getenv("SUREPASS_PAN_CACHE_TTL", str(30 * 86400)))
+AIS_CACHE_TTL = float(os.getenv("SUREPASS_AIS_CACHE_TTL", str(7 * 86400)))
+
+# cached source -> TTL in seconds
+SOURCE_TTLS = {"pan": PAN_CACHE_TTL, "ais": AIS_CACHE_TTL}
+# Consent.source (lowercased) -> cached sources it covers; they are dropped
+# when that consent is deactivated
+CONSENT_SOURCES = {"itr": ("pan", "ais"), "pan": ("pan",), "ais": ("ais",)}
+
+ACTIVE_CONSENT_SQL = """
+    SELECT EXISTS (
+        SELECT 1 FROM consents
+        WHERE user_id::text = $1 AND lower(trim(source)) = ANY($2::text[]) AND active IS NOT FALSE
+    )
+"""
+
+_cryptography_available = importlib.util.find_spec("cryptography") is not None
+_fernet = None
+
+
+def _get_fernet():
+    global _fernet
+    if _fernet is None and SUREPASS_CACHE_KEYS and _cryptography_available:
+        fernet = importlib.import_module("cryptography.fernet")
+        _fernet = fernet.MultiFernet([fernet.Fernet(k.encode()) for k in SUREPASS_CACHE_KEYS])
+    return _fernet
+
+
+def cache_enabled() -> bool:
+    return bool(SUREPASS_CACHE_HMAC_KEY) and _get_fernet() is not None
+
+
+def lookup_key(source: str, pan: str, year=None) -> str:
+    secret = SUREPASS_CACHE_HMAC_KEY.encode()
+    message = f"{source}|{pan.strip().upper()}|{year or ''}".encode()
+    return hmac.new(secret, message, hashlib.sha256).hexdigest()
+
+
+def encrypt(value) -> str:
+    return _get_fernet().encrypt(json.dumps(value, separators=(",", ":")).encode()).decode()
+
+
+def decrypt(token: str):
+    return json.loads(_get_fernet().decrypt(token.encode()))
+
+
+def _session() -> AsyncSession:
+    # own session: PAN and AIS lookups run concurrently and an AsyncSession
+    # can't be shared between tasks
+    return AsyncSessionLocal(bind=get_async_engine())
+
+
+async def _load(user_id, source, key):
+    now = datetime.datetime.utcnow()
+    async with _session() as db:
+        result = await db.execute(
+            select(SurepassResponseCache.ciphertext).where(
+                SurepassResponseCache.user_id == str(user_id),
+                SurepassResponseCache.source == source,
+                SurepassResponseCache.lookup_key == key,
+                SurepassResponseCache.expires_at > now,
+            )
+        )
+        return result.scalar()
+
+
+async def _store(user_id, source, key, value):
+    now = datetime.datetime.utcnow()
+    t = SurepassResponseCache
+    async with _session() as db:
+        # replace this entry and drop the user's expired ones in the same go
+        await db.execute(delete(t).where(
+            t.user_id == str(user_id), t.source == source,
+            (t.lookup_key == key) | (t.expires_at <= now),
+        ))
+        db.add(t(
+            user_id=str(user_id), source=source, lookup_key=key, ciphertext=encrypt(value),
+            created_at=now, expires_at=now + datetime.timedelta(seconds=SOURCE_TTLS[source]),
+        ))
+        await db.commit()
+
+
+async def has_active_consent(user_id, source: str) -> bool:
+    """Whether any active consent of the user covers the cached source."""
+    consent_sources = [c for c, covered in CONSENT_SOURCES.items() if source in covered]
+    async with pg_connection() as conn:
+        return bool(await conn.fetchval(ACTIVE_CONSENT_SQL, str(user_id), consent_sources))
+
+
+async def cached_fetch(source: str, user_id, pan: str, year, fetch, force_refresh: bool = False):
+    """Return the cached response for (user, source, PAN, year), or await
+    fetch() and cache its result. Cache failures fall through to fetch()."""
+    if user_id is None or not cache_enabled():
+        return await fetch()
+    key = lookup_key(source, pan, year)
+    if not force_refresh:
+        try:
+            token = await _load(user_id, source, key)
+            # consents can be revoked straight in Supabase, bypassing
+            # invalidate_consent, so check before serving what was cached
+            if token is not None and await has_active_consent(user_id, source):
+                value = decrypt(token)
+                surepass_cache_requests_total.labels(source, "hit").inc()
+                return value
+        except Exception as e:
+            # unreadable entry (e.g. rotated-out key), DB trouble or no way
+            # to confirm consent: refetch
+            logger.error(f"[surepass_cache.cached_fetch] error={str(e)}")
+    surepass_cache_requests_total.labels(source, "refresh" if force_refresh else "miss").inc()
+    value = await fetch()
+    try:
+        await _store(user_id, source, key, value)
+    except Exception as e:
+        logger.error(f"[surepass_cache.cached_fetch] error={str(e)}")
+    return value
+
+
+async def invalidate_consent(db: AsyncSession, user_id, consent_source: str):
+    """Delete the user's cached responses covered by a consent source; the
+    caller commits with the consent change."""
+    sources = CONSENT_SOURCES.get((consent_source or "").strip().lower())
+    if not sources or user_id is None:
+        return
+    await db.execute(delete(SurepassResponseCache).where(
+        SurepassResponseCache.user_id == str(user_id),
+        SurepassResponseCache.source.in_(sources),
+    ))
@@ -1,22 +1,186 @@
 import os
+import importlib
+import asyncio
+import functools
+import hashlib
+import json
+import time
 import httpx
+from app.cache import build_cache
+from app.metrics import surepass_request_duration_seconds, surepass_errors_total, surepass_deduplicated_total
 
 SUREPASS_BASE = os.getenv("SUREPASS_BASE", "https://api.surepass.io")
 SUREPASS_API_KEY = os.getenv("SUREPASS_API_KEY")
 SUREPASS_AUTH_HEADER = os.getenv("SUREPASS_AUTH_HEADER", "Authorization")
 
-async def sp_post(path: str, payload: dict):
-    url = f"{SUREPASS_BASE}{path}"
-    headers = {
+# Connection pool sizing for the shared client. Defaults are sized for a single
+# uvicorn worker handling OTP bursts; tune per replica via env.
+SUREPASS_MAX_CONNECTIONS = int(os.getenv("SUREPASS_MAX_CONNECTIONS", "100"))
+SUREPASS_MAX_KEEPALIVE = int(os.getenv("SUREPASS_MAX_KEEPALIVE", "20"))
+SUREPASS_KEEPALIVE_EXPIRY = float(os.getenv("SUREPASS_KEEPALIVE_EXPIRY", "30"))
+SUREPASS_CONNECT_TIMEOUT = float(os.getenv("SUREPASS_CONNECT_TIMEOUT", "5"))
+SUREPASS_POOL_TIMEOUT = float(os.getenv("SUREPASS_POOL_TIMEOUT", "5"))
+SUREPASS_DEFAULT_TIMEOUT = float(os.getenv("SUREPASS_TIMEOUT", "30"))
+
+# HTTP/2 needs the optional `h2` package (httpx[http2]); fall back to HTTP/1.1
+# keep-alive when it isn't installed.
+_h2_available = importlib.util.find_spec("h2") is not None
+SUREPASS_HTTP2 = os.getenv("SUREPASS_HTTP2", "1") == "1" and _h2_available
+
+# Read timeouts per upstream endpoint (matched on path suffix). OTP generation
+# should fail fast; passbook/AIS pulls can legitimately take a while.
+ENDPOINT_TIMEOUTS = {
+    "/epfo/generate-otp": 15.0,
+    "/epfo/submit-otp": 30.0,
+    "/epfo/verify-otp": 30.0,
+    "/epfo/passbook": 60.0,
+    "/itr/ais": 60.0,
+    "/pan/comprehensive-plus": 20.0,
+}
+
+# Successful responses replayed for a retried POST carrying the same
+# Idempotency-Key (and payload). Set SUREPASS_IDEMPOTENCY_CACHE_REDIS_URL to
+# share replays across replicas.
+surepass_idempotency_cache = build_cache("surepass_idempotency", max_size=4096, ttl=600.0)
+
+_client = None
+# request key -> _Flight of the one upstream call currently serving it
+_inflight = {}
+
+
+class SurepassError(Exception):
+    """Non-2xx response from Surepass; carries the upstream status and body."""
+
+    def __init__(self, status_code: int, body: str):
+        self.status_code = status_code
+        self.body = body
+        super().__init__(f"Surepass error: {status_code} {body}")
+
+
+def _auth_headers():
+    return {
         SUREPASS_AUTH_HEADER: f"Bearer {SUREPASS_API_KEY}" if SUREPASS_AUTH_HEADER.lower() == "authorization" else SUREPASS_API_KEY,
         "Content-Type": "application/json",
     }
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(url, json=payload, headers=headers, timeout=30)
-        if resp.status_code in (200, 201):
-            try:
-                return resp.json()
-            except Exception:
-                return {"raw_text": resp.text}
-        # bubble upstream status and body for better error handling
-        raise Exception(f"Surepass error: {resp.status_code} {resp.text}")
+
+
+def get_timeout(path: str) -> httpx.Timeout:
+    read = next((t for suffix, t in ENDPOINT_TIMEOUTS.items() if path.endswith(suffix)), SUREPASS_DEFAULT_TIMEOUT)
+    return httpx.Timeout(read, connect=SUREPASS_CONNECT_TIMEOUT, pool=SUREPASS_POOL_TIMEOUT)
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the process-wide Surepass client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=SUREPASS_BASE,
+            headers=_auth_headers(),
+            http2=SUREPASS_HTTP2,
+            limits=httpx.Limits(
+                max_connections=SUREPASS_MAX_CONNECTIONS,
+                max_keepalive_connections=SUREPASS_MAX_KEEPALIVE,
+                keepalive_expiry=SUREPASS_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(SUREPASS_DEFAULT_TIMEOUT, connect=SUREPASS_CONNECT_TIMEOUT, pool=SUREPASS_POOL_TIMEOUT),
+        )
+    return _client
+
+
+async def close_client():
+    """Close the shared client; called from the application lifespan."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+def normalize_payload(payload: dict) -> dict:
+    """Strip surrounding whitespace from string values; this is what gets
+    keyed on and sent upstream."""
+    return {k: v.strip() if isinstance(v, str) else v for k, v in (payload or {}).items()}
+
+
+def request_key(path: str, payload: dict, user_id=None) -> str:
+    """Stable key for (path, normalized payload, user): key order doesn't
+    make two requests different."""
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{user_id}|{path}|{body}".encode()).hexdigest()
+
+
+async def _post(path: str, payload: dict):
+    client = get_client()
+    start = time.perf_counter()
+    try:
+        resp = await client.post(path, json=payload, timeout=get_timeout(path))
+    except httpx.HTTPError as e:
+        surepass_errors_total.labels(path, type(e).__name__).inc()
+        raise
+    finally:
+        surepass_request_duration_seconds.labels(path).observe(time.perf_counter() - start)
+    if resp.status_code not in (200, 201):
+        surepass_errors_total.labels(path, str(resp.status_code)).inc()
+    if resp.status_code in (200, 201):
+        try:
+            return resp.json()
+        except Exception:
+            return {"raw_text": resp.text}
+    # bubble upstream status and body for better error handling
+    raise SurepassError(resp.status_code, resp.text)
+
+
+class _Flight:
+    """One upstream call and the number of callers still waiting on it."""
+
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+def _forget(key, flight, task):
+    if _inflight.get(key) is flight:
+        del _inflight[key]
+    if not task.cancelled():
+        # mark the exception retrieved even if every caller went away
+        task.exception()
+
+
+async def sp_post(path: str, payload: dict, user_id=None, idempotency_key: str = None):
+    """POST to Surepass, sharing one upstream call between identical requests.
+
+    Concurrent calls with the same (path, payload, user_id) await a single
+    upstream request (double clicks, frontend retries). With an
+    idempotency_key, a successful result is also kept for
+    SUREPASS_IDEMPOTENCY_CACHE_TTL seconds and returned to retries instead of
+    paying for another call. Errors are never cached.
+    """
+    # coalesced callers share one upstream call, so they must all mean the
+    # same payload: send exactly what the key was computed from
+    payload = normalize_payload(payload)
+    key = request_key(path, payload, user_id)
+    replay_key = f"{key}:{idempotency_key}" if idempotency_key else None
+    if replay_key:
+        cached = surepass_idempotency_cache.get(replay_key)
+        if cached is not None:
+            surepass_deduplicated_total.labels(path, "idempotent_replay").inc()
+            return cached
+    flight = _inflight.get(key)
+    if flight is None:
+        flight = _inflight[key] = _Flight(asyncio.ensure_future(_post(path, payload)))
+        flight.task.add_done_callback(functools.partial(_forget, key, flight))
+    else:
+        surepass_deduplicated_total.labels(path, "coalesced").inc()
+    flight.waiters += 1
+    try:
+        # shielded so one caller going away doesn't fail the others; the
+        # call itself is cancelled once nobody is waiting for it
+        result = await asyncio.shield(flight.task)
+    except asyncio.CancelledError:
+        if flight.waiters == 1 and not flight.task.done():
+            flight.task.cancel()
+        raise
+    finally:
+        flight.waiters -= 1
+    if replay_key:
+        surepass_idempotency_cache.set(replay_key, result)
+    return result
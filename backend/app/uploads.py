@@ -0,0 +1,40 @@
+import os
+from urllib.parse import quote
+from fastapi.staticfiles import StaticFiles
+from starlette.responses import FileResponse, Response
+
+UPLOADS_DIR = os.getenv("UPLOADS_DIR", "/tmp/uploads")
+
+# Uploaded names carry a uuid prefix and are never rewritten, so clients may
+# cache them for long; "private" keeps shared proxies from storing documents.
+UPLOADS_CACHE_CONTROL = os.getenv("UPLOADS_CACHE_CONTROL", "private, max-age=86400, immutable")
+
+# When set (e.g. "/protected-uploads/"), the API answers with X-Accel-Redirect
+# and nginx serves the file itself with sendfile, including Range and
+# conditional requests, off the API workers. This only offloads the transfer:
+# the /uploads mount does no authentication, so anything that must stay
+# private belongs in storage behind a signed URL.
+UPLOADS_ACCEL_REDIRECT = os.getenv("UPLOADS_ACCEL_REDIRECT", "")
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with cache headers and optional proxy offload.
+
+    Starlette's FileResponse already emits ETag/Last-Modified, answers
+    If-None-Match/If-Modified-Since with 304 and serves Range requests.
+    """
+
+    def __init__(self, *args, cache_control: str = UPLOADS_CACHE_CONTROL, accel_redirect: str = UPLOADS_ACCEL_REDIRECT, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control
+        self.accel_redirect = accel_redirect
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["Cache-Control"] = self.cache_control
+        if self.accel_redirect and isinstance(response, FileResponse) and status_code == 200:
+            rel_path = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+            headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+            headers["X-Accel-Redirect"] = self.accel_redirect.rstrip("/") + "/" + quote(rel_path)
+            return Response(headers=headers)
+        return response
@@ -0,0 +1,77 @@
+"""Rows/second for the single-row create path vs the bulk import path.
+
+Run from backend/: python -m benchmarks.bench_bulk_import
+Uses a throwaway SQLite file via aiosqlite; against MySQL/Postgres the gap
+grows further since each single-row commit is a network round-trip plus fsync.
+"""
+import asyncio
+import datetime
+import os
+import tempfile
+import time
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app import database
+from app.bulk_import import validate_rows, bulk_insert
+from app.models import IncomeRecord
+from app.schemas import IncomeRecordCreate
+
+ROWS = 2000
+
+
+def sample_rows():
+    start = datetime.date(2020, 1, 1)
+    return [
+        {"source": "salary", "category": "salary", "amount": str(50000 + i), "date_received": (start + datetime.timedelta(days=i)).isoformat()}
+        for i in range(ROWS)
+    ]
+
+
+async def single_row(factory, rows):
+    # mirrors create_income_record: one add/commit/refresh per request
+    async with factory() as db:
+        for row in rows:
+            payload = IncomeRecordCreate.model_validate(row)
+            record = IncomeRecord(
+                user_id="bench-user",
+                source=payload.source,
+                category=payload.category,
+                amount=payload.amount,
+                date_received=datetime.date.fromisoformat(payload.date_received),
+                created_at=datetime.datetime.utcnow(),
+                updated_at=datetime.datetime.utcnow(),
+            )
+            db.add(record)
+            await db.commit()
+            await db.refresh(record)
+
+
+async def bulk(factory, rows):
+    async with factory() as db:
+        payloads, errors = validate_rows(rows, IncomeRecordCreate, "date_received")
+        await bulk_insert(db, IncomeRecord, "bench-user", payloads)
+
+
+async def bench(label, fn):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = database.create_async_db_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(IncomeRecord.__table__.create)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+        rows = sample_rows()
+        start = time.perf_counter()
+        await fn(factory, rows)
+        elapsed = time.perf_counter() - start
+        await engine.dispose()
+    rate = ROWS / elapsed
+    print(f"{label:<12} {rate:10.0f} rows/s ({elapsed:.2f}s for {ROWS} rows)")
+    return rate
+
+
+async def main():
+    before = await bench("single-row", single_row)
+    after = await bench("bulk", bulk)
+    print(f"speedup: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,49 @@
+"""EPFO normalization cost vs passbook size.
+
+Run from backend/: python -m benchmarks.bench_epfo_normalize
+Synthetic multi-employer passbooks (one member id per employer, a credit
+row per month plus a yearly interest row). Time per contribution row
+should stay flat as the passbook grows, i.e. normalization is linear.
+"""
+import time
+from app.epfo_normalize import normalize_epfo
+
+SIZES = ((2, 120), (10, 240), (50, 240), (200, 240))  # (employers, months each)
+ROUNDS = 5
+
+
+def make_passbook(employers, months):
+    companies = {}
+    for e in range(employers):
+        entries = []
+        for m in range(months):
+            year, month = 2000 + m // 12, m % 12 + 1
+            entries.append({
+                "month_year": f"{month:02d}{year}",
+                "employee_share": f"{1800 + e:,}",
+                "employer_share": "550",
+                "pension_share": "1250",
+                "type": "CR",
+            })
+            if month == 3:
+                entries.append({"month_year": f"03{year}", "employee_share": "9000", "type": "INT"})
+        companies[f"MHBAN{e:05d}0000012345"] = {"company_name": f"Employer {e}", "passbook": entries}
+    return {"data": {"full_name": "Bench", "uan": "100200300400", "companies": companies}}
+
+
+def main():
+    for employers, months in SIZES:
+        raw = make_passbook(employers, months)
+        rows = employers * months
+        best = min(_time(raw) for _ in range(ROUNDS))
+        print(f"{employers:>4} employers {rows:>7} rows {best * 1000:9.1f} ms {best / rows * 1e6:6.2f} us/row")
+
+
+def _time(raw):
+    start = time.perf_counter()
+    normalize_epfo(raw)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
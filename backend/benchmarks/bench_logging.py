@@ -0,0 +1,92 @@
+"""Access-log cost on the request path: synchronous vs queued + sampled.
+
+Run from backend/: python -m benchmarks.bench_logging
+Several threads log concurrently (like threadpool route handlers). Two
+sinks: a local file, and a "slow" one that blocks 100us per write the way
+stdout does when the container log pipe is backed up. The synchronous path
+waits on the sink under the handler lock; the queued path only builds and
+enqueues records, and the listener thread drains them (after the timer).
+"""
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+from logging.handlers import QueueListener
+from app import logger as log_module
+
+THREADS = 8
+LINES_PER_THREAD = 5000
+
+
+def run(label, test_logger, log_line):
+    def worker():
+        for i in range(LINES_PER_THREAD):
+            log_line(test_logger, i)
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    per_request = (time.perf_counter() - start) / (THREADS * LINES_PER_THREAD) * 1e6
+    print(f"{label:<24} {per_request:8.2f} us/request")
+    return per_request
+
+
+def old_line(test_logger, i):
+    # the previous middleware: f-string built on every request, sync write
+    test_logger.info(f"🟢 GET /api/v1/dashboard/summary 200 {i / 100:.2f}ms")
+
+
+def new_line(test_logger, i):
+    duration = i / 100
+    if test_logger.isEnabledFor(logging.INFO) and log_module.should_log_access(200, duration):
+        test_logger.info("🟢 %s %s %s %.2fms", "GET", "/api/v1/dashboard/summary", 200, duration,
+                         extra={"method": "GET", "path": "/api/v1/dashboard/summary", "status": 200, "duration_ms": duration})
+
+
+class SlowFileHandler(logging.FileHandler):
+    def emit(self, record):
+        time.sleep(0.0001)
+        super().emit(record)
+
+
+def file_handler(path, slow=False):
+    h = SlowFileHandler(path) if slow else logging.FileHandler(path)
+    h.setFormatter(log_module.JsonFormatter())
+    return h
+
+
+def make_logger(name, handler):
+    test_logger = logging.getLogger(name)
+    test_logger.propagate = False
+    test_logger.handlers = [handler]
+    test_logger.setLevel(logging.INFO)
+    return test_logger
+
+
+def compare(tmp, slow):
+    kind = "slow sink" if slow else "file sink"
+    print(f"-- {kind}")
+    sync_handler = file_handler(os.path.join(tmp, f"sync-{slow}.log"), slow)
+    before = run("sync", make_logger(f"bench.sync.{slow}", sync_handler), old_line)
+    sync_handler.close()
+    for rate in (1.0, 0.1):
+        log_module.ACCESS_LOG_SAMPLE_RATE = rate
+        q = queue.SimpleQueue()
+        sink = file_handler(os.path.join(tmp, f"queued-{rate}-{slow}.log"), slow)
+        listener = QueueListener(q, sink)
+        listener.start()
+        after = run(f"queued, sample={rate}", make_logger(f"bench.queued.{rate}.{slow}", log_module._QueueHandler(q)), new_line)
+        listener.stop()
+        sink.close()
+        print(f"{'speedup':<24} {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        compare(tmp, slow=False)
+        compare(tmp, slow=True)
@@ -0,0 +1,89 @@
+"""Requests/second through LoggingMiddleware: BaseHTTPMiddleware vs pure ASGI.
+
+Run from backend/: python -m benchmarks.bench_middleware
+Drives the app in-process over httpx's ASGI transport with 50 concurrent
+requests. Access logging is switched off so the numbers reflect the
+middleware plumbing only, not the log sink.
+"""
+import asyncio
+import logging
+import time
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.logger import logger
+from app.middleware import LoggingMiddleware
+
+REQUESTS = 2000
+CONCURRENCY = 50
+ROUNDS = 3
+
+
+class BaseHTTPLoggingMiddleware(BaseHTTPMiddleware):
+    # the previous implementation, kept here for comparison
+    async def dispatch(self, request: Request, call_next):
+        start = time.perf_counter()
+        try:
+            response = await call_next(request)
+            process_time = (time.perf_counter() - start) * 1000
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("🟢 %s %s %s %.2fms", request.method, request.url.path, response.status_code, process_time)
+            return response
+        except Exception as exc:
+            logger.error("🔴 %s %s 500", request.method, request.url.path, exc_info=True)
+            return JSONResponse(status_code=500, content={"error": "Internal server error", "detail": str(exc)})
+
+
+def make_app(middleware):
+    app = FastAPI()
+    if middleware is not None:
+        app.add_middleware(middleware)
+
+    @app.get("/json")
+    async def json_route():
+        return {"total_assets": 1, "total_liabilities": 2}
+
+    @app.get("/stream")
+    async def stream_route():
+        async def body():
+            for _ in range(10):
+                yield b"x" * 1024
+        return StreamingResponse(body())
+
+    return app
+
+
+async def bench(label, middleware, path):
+    transport = httpx.ASGITransport(app=make_app(middleware))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        sem = asyncio.Semaphore(CONCURRENCY)
+
+        async def one():
+            async with sem:
+                resp = await client.get(path)
+                assert resp.status_code == 200
+
+        rates = []
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            await asyncio.gather(*(one() for _ in range(REQUESTS)))
+            rates.append(REQUESTS / (time.perf_counter() - start))
+    # best round: least disturbed by GC and warm-up
+    rate = max(rates)
+    print(f"{label:<20} {path:<8} {rate:10.0f} req/s")
+    return rate
+
+
+async def main():
+    logger.setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    for path in ("/json", "/stream"):
+        baseline = await bench("no middleware", None, path)
+        before = await bench("BaseHTTPMiddleware", BaseHTTPLoggingMiddleware, path)
+        after = await bench("pure ASGI", LoggingMiddleware, path)
+        print(f"{'':<20} {path:<8} overhead {1 - before / baseline:6.1%} -> {1 - after / baseline:6.1%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,30 @@
+"""Per-request overhead of building a Supabase client vs. reusing the cached one.
+
+Run from backend/: python -m benchmarks.bench_supabase_client
+No network access is needed; clients are built but never used for I/O.
+"""
+import os
+import time
+
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.e30.bench")
+
+from app import supabase_client
+
+ITERATIONS = 200
+
+
+def bench(label, fn):
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn().table("assets")
+    per_call = (time.perf_counter() - start) / ITERATIONS * 1000
+    print(f"{label:<28} {per_call:8.3f} ms/request")
+    return per_call
+
+
+if __name__ == "__main__":
+    before = bench("create_client per request", supabase_client.create_supabase_client)
+    after = bench("cached get_supabase_client", supabase_client.get_supabase_client)
+    print(f"speedup: {before / after:.0f}x")
@@ -0,0 +1,138 @@
+import asyncio
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+pytest.importorskip("aiosqlite")
+from app import database, models
+from app.auth import verify_jwt_token
+from app.api.v1.endpoints import surepass_epfo
+
+
+def test_to_async_url_maps_sync_drivers():
+    assert database.to_async_url("mysql+pymysql://u:p@db/x") == "mysql+aiomysql://u:p@db/x"
+    assert database.to_async_url("postgresql://u:p@db/x") == "postgresql+asyncpg://u:p@db/x"
+    assert database.to_async_url("sqlite:///tmp.db") == "sqlite+aiosqlite:///tmp.db"
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = database.create_async_db_engine(f"sqlite:///{tmp_path}/async.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(database.Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def app(session_factory, monkeypatch):
+    async def slow_sp_post(path, payload, **kwargs):
+        await asyncio.sleep(0.2)
+        return {"transaction_id": "tx-1", "passbook": {"balance": 1000}}
+
+    async def override_db():
+        async with session_factory() as db:
+            yield db
+
+    monkeypatch.setattr(surepass_epfo, "sp_post", slow_sp_post)
+    test_app = FastAPI()
+    test_app.include_router(surepass_epfo.router, prefix="/api")
+    test_app.dependency_overrides[database.get_async_db] = override_db
+    test_app.dependency_overrides[verify_jwt_token] = lambda: {"sub": "test-user-id"}
+    return test_app
+
+
+@pytest.mark.asyncio
+async def test_epfo_routes_persist_through_async_session(app, session_factory):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        gen = await client.post("/api/surepass/epfo/generate-otp", json={"pan": "ABCDE1234F", "mobile": "9999999999"})
+        ver = await client.post("/api/surepass/epfo/verify-otp", json={"transaction_id": "tx-1", "otp": "123456"})
+        latest = await client.get("/api/epfo/latest")
+
+    assert gen.status_code == 200 and gen.json()["transaction_id"] == "tx-1"
+    assert ver.status_code == 200 and ver.json()["normalized"]["balance"] == 1000
+    assert latest.json()["data"]["transaction_id"] == "tx-1"
+    async with session_factory() as db:
+        assert await db.get(models.EPFOOTPRequest, 1) is not None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_otp_requests_overlap(app):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        responses = await asyncio.gather(*(
+            client.post("/api/surepass/epfo/generate-otp", json={"pan": "ABCDE1234F", "mobile": "9999999999"})
+            for _ in range(5)
+        ))
+        elapsed = loop.time() - start
+
+    assert all(r.status_code == 200 for r in responses)
+    # five 0.2s upstream calls run side by side instead of back to back
+    assert elapsed < 0.6
+
+
+@pytest.mark.asyncio
+async def test_coalesced_generate_otp_records_one_request_row(app, session_factory, monkeypatch):
+    from sqlalchemy import func, select
+    from app import surepass_client
+
+    sent = []
+
+    async def slow_post(path, payload):
+        sent.append(payload)
+        await asyncio.sleep(0.1)
+        return {"transaction_id": "tx-shared"}
+
+    monkeypatch.setattr(surepass_client, "_post", slow_post)
+    monkeypatch.setattr(surepass_client, "_inflight", {})
+    monkeypatch.setattr(surepass_epfo, "sp_post", surepass_client.sp_post)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(
+            client.post("/api/surepass/epfo/generate-otp", json={"pan": "ABCDE1234F", "mobile": "9999999999"}),
+            client.post("/api/surepass/epfo/generate-otp", json={"pan": " ABCDE1234F ", "mobile": "9999999999"}),
+        )
+        # a later retry of the same transaction doesn't add a row either
+        await client.post("/api/surepass/epfo/generate-otp", json={"pan": "ABCDE1234F", "mobile": "9999999999"})
+
+    assert all(r.json()["transaction_id"] == "tx-shared" for r in responses)
+    # the coalesced call went upstream with the normalized payload
+    assert sent[0] == {"pan": "ABCDE1234F", "mobile": "9999999999"}
+    assert len(sent) == 2
+    async with session_factory() as db:
+        count = await db.scalar(select(func.count()).select_from(models.EPFOOTPRequest))
+    assert count == 1
+
+
+@pytest.mark.asyncio
+async def test_coalesced_verify_otp_stores_one_summary(app, session_factory, monkeypatch):
+    from sqlalchemy import func, select
+    from app import surepass_client
+
+    sent = []
+
+    async def slow_post(path, payload):
+        sent.append(payload)
+        await asyncio.sleep(0.1)
+        return {"passbook": {"balance": 1000, "uan": "100200300400"}}
+
+    monkeypatch.setattr(surepass_client, "_post", slow_post)
+    monkeypatch.setattr(surepass_client, "_inflight", {})
+    monkeypatch.setattr(surepass_epfo, "sp_post", surepass_client.sp_post)
+    body = {"transaction_id": "tx-1", "otp": "123456"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(*(client.post("/api/surepass/epfo/verify-otp", json=body) for _ in range(3)))
+        # a replay with an Idempotency-Key after the first call finished
+        await client.post("/api/surepass/epfo/verify-otp", json=body, headers={"Idempotency-Key": "k1"})
+
+    assert all(r.status_code == 200 and r.json()["normalized"]["balance"] == 1000 for r in responses)
+    assert len(sent) == 2
+    async with session_factory() as db:
+        count = await db.scalar(select(func.count()).select_from(models.EPFOSummary))
+    assert count == 1
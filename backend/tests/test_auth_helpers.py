@@ -0,0 +1,92 @@
+import asyncio
+import base64
+import httpx
+import pytest
+from starlette.requests import Request
+
+jose = pytest.importorskip("jose")
+from jose import jwt as jose_jwt
+from app import auth_helpers
+
+SECRET = "a" * 32
+
+
+def _jwk(kid, secret=SECRET):
+    k = base64.urlsafe_b64encode(secret.encode()).rstrip(b"=").decode()
+    return {"kty": "oct", "kid": kid, "alg": "HS256", "k": k}
+
+
+def _request(token):
+    return Request({"type": "http", "headers": [(b"authorization", f"Bearer {token}".encode())]})
+
+
+@pytest.fixture
+def jwks(monkeypatch):
+    state = {"keys": [_jwk("k1")], "fetches": 0, "fail": False}
+    real_client = httpx.AsyncClient
+
+    async def handler(request):
+        state["fetches"] += 1
+        await asyncio.sleep(0.01)
+        if state["fail"]:
+            return httpx.Response(500)
+        return httpx.Response(200, json={"keys": state["keys"]})
+
+    monkeypatch.setattr(
+        auth_helpers.httpx, "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs),
+    )
+    store = auth_helpers.JWKSStore("https://example.supabase.co/auth/v1/keys", ttl=3600, min_refetch_interval=0)
+    monkeypatch.setattr(auth_helpers, "jwks_store", store)
+    state["store"] = store
+    return state
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_one_fetch(jwks):
+    results = await asyncio.gather(*(jwks["store"].get_key("k1") for _ in range(20)))
+    assert jwks["fetches"] == 1
+    assert all(r is results[0] for r in results)
+    key, alg = results[0]
+    assert isinstance(key, jose.jwk.Key)
+    assert alg == "HS256"
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_refetches_rotated_keys(jwks):
+    store = jwks["store"]
+    await store.get_key("k1")
+    jwks["keys"] = [_jwk("k1"), _jwk("k2", "b" * 32)]
+    assert await store.get_key("k2") is not None
+    assert jwks["fetches"] == 2
+
+    store.min_refetch_interval = 3600
+    assert await store.get_key("forged") is None
+    assert jwks["fetches"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_serving_cached_keys(jwks):
+    store = jwks["store"]
+    await store.get_key("k1")
+    store.ttl = 0
+    jwks["fail"] = True
+    assert await store.get_key("k1") is not None
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_uses_cached_key(jwks):
+    token = jose_jwt.encode({"sub": "user-1", "email": "u@example.com"}, SECRET, algorithm="HS256", headers={"kid": "k1"})
+    for _ in range(3):
+        user = await auth_helpers.get_current_user(_request(token))
+    assert user == {"id": "user-1", "email": "u@example.com"}
+    assert jwks["fetches"] == 1
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_can_be_stopped(jwks):
+    store = jwks["store"]
+    store.start(interval=3600)
+    await asyncio.sleep(0.05)
+    await store.stop()
+    assert jwks["fetches"] == 1
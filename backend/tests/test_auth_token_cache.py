@@ -0,0 +1,82 @@
+import time
+import hashlib
+import jwt
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from app import auth
+from app.cache import TTLCache
+
+SECRET = "test-secret-with-at-least-32-bytes!!"
+
+
+@pytest.fixture(autouse=True)
+def token_cache(monkeypatch):
+    cache = TTLCache(max_size=2, ttl=300)
+    monkeypatch.setattr(auth, "SUPABASE_JWT_SECRET", SECRET)
+    monkeypatch.setattr(auth, "verified_token_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    calls = []
+    real_decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth.jwt, "decode", counting_decode)
+    return calls
+
+
+def _creds(claims):
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=jwt.encode(claims, SECRET, algorithm="HS256"))
+
+
+def test_repeat_token_is_verified_once(decode_calls):
+    creds = _creds({"sub": "u1", "exp": int(time.time()) + 600})
+    for _ in range(5):
+        assert auth.verify_jwt_token(creds)["sub"] == "u1"
+    assert len(decode_calls) == 1
+
+
+def test_returned_claims_are_copies(decode_calls):
+    creds = _creds({"sub": "u1", "exp": int(time.time()) + 600})
+    auth.verify_jwt_token(creds)["sub"] = "tampered"
+    assert auth.verify_jwt_token(creds)["sub"] == "u1"
+
+
+def test_cached_token_is_rejected_after_exp(token_cache):
+    # simulate an entry whose monotonic TTL outlived the token's wall-clock exp
+    claims = {"sub": "u1", "exp": int(time.time()) - 1}
+    creds = _creds(claims)
+    token_cache.set(hashlib.sha256(creds.credentials.encode()).hexdigest(), claims, ttl=300)
+    with pytest.raises(HTTPException) as exc:
+        auth.verify_jwt_token(creds)
+    assert exc.value.status_code == 401
+    assert exc.value.detail == "Token expired"
+
+
+def test_tokens_without_exp_are_not_cached(token_cache, decode_calls):
+    creds = _creds({"sub": "u1"})
+    auth.verify_jwt_token(creds)
+    auth.verify_jwt_token(creds)
+    assert len(decode_calls) == 2
+    assert token_cache.stats()["size"] == 0
+
+
+def test_invalid_token_is_not_cached(token_cache):
+    bad = HTTPAuthorizationCredentials(scheme="Bearer", credentials=jwt.encode({"sub": "u1", "exp": int(time.time()) + 60}, "wrong-secret-with-at-least-32-bytes", algorithm="HS256"))
+    with pytest.raises(HTTPException):
+        auth.verify_jwt_token(bad)
+    assert token_cache.stats()["size"] == 0
+
+
+def test_cache_is_bounded(token_cache):
+    exp = int(time.time()) + 600
+    for i in range(5):
+        auth.verify_jwt_token(_creds({"sub": f"u{i}", "exp": exp}))
+    assert token_cache.stats()["size"] == 2
+    assert token_cache.stats()["evictions"] == 3
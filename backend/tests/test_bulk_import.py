@@ -0,0 +1,118 @@
+import datetime
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI, Request
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+pytest.importorskip("aiosqlite")
+from app import database, bulk_import
+from app.auth import verify_jwt_token
+from app.database import get_async_db
+from app.models import IncomeRecord, ExpenseRecord
+from app.schemas import IncomeRecordCreate, ExpenseRecordCreate
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = database.create_async_db_engine(f"sqlite:///{tmp_path}/bulk.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(IncomeRecord.__table__.create)
+        await conn.run_sync(ExpenseRecord.__table__.create)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+def test_validate_rows_reports_each_bad_row():
+    rows = [
+        {"source": "salary", "category": "salary", "amount": "1000", "date_received": "2024-04-01"},
+        {"source": "salary", "category": "salary", "date_received": "2024-04-01"},
+        {"source": "salary", "category": "salary", "amount": 5, "date_received": "01/04/2024"},
+        "not a row",
+    ]
+    valid, errors = bulk_import.validate_rows(rows, IncomeRecordCreate, "date_received")
+    assert len(valid) == 1
+    assert valid[0]["amount"] == 1000.0
+    assert valid[0]["date_received"] == datetime.date(2024, 4, 1)
+    assert [e["row"] for e in errors] == [2, 3, 4]
+    assert errors[0]["errors"][0]["loc"] == ("amount",)
+
+
+def test_csv_blank_cells_become_missing():
+    rows = bulk_import._parse_csv("category,subcategory,amount,date_incurred\nrent,,25000,2024-04-05\n")
+    assert rows == [{"category": "rent", "amount": "25000", "date_incurred": "2024-04-05"}]
+    valid, errors = bulk_import.validate_rows(rows, ExpenseRecordCreate, "date_incurred")
+    assert not errors and valid[0]["subcategory"] is None
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_writes_all_rows_in_one_transaction(session_factory):
+    payloads = [
+        {"source": "salary", "category": "salary", "amount": 100 + i, "frequency": None, "notes": None, "date_received": datetime.date(2024, 1, 1)}
+        for i in range(2000)
+    ]
+    async with session_factory() as db:
+        assert await bulk_import.bulk_insert(db, IncomeRecord, "u1", payloads) == 2000
+    async with session_factory() as db:
+        count = await db.scalar(select(func.count()).select_from(IncomeRecord).where(IncomeRecord.user_id == "u1"))
+    assert count == 2000
+
+
+@pytest.mark.asyncio
+async def test_read_rows_accepts_json_csv_and_multipart(monkeypatch):
+    app = FastAPI()
+
+    @app.post("/rows")
+    async def rows(request: Request):
+        return await bulk_import.read_rows(request)
+
+    monkeypatch.setattr(bulk_import, "BULK_IMPORT_MAX_ROWS", 2)
+    csv_body = "category,amount,date_incurred\nfood,10,2024-01-01\n"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        as_json = await client.post("/rows", json=[{"category": "food"}])
+        as_csv = await client.post("/rows", content=csv_body, headers={"content-type": "text/csv"})
+        as_upload = await client.post("/rows", files={"file": ("bank.csv", csv_body, "text/csv")})
+        too_many = await client.post("/rows", json=[{}, {}, {}])
+        not_array = await client.post("/rows", json={"category": "food"})
+
+    assert as_json.json() == [{"category": "food"}]
+    assert as_csv.json() == as_upload.json() == [{"category": "food", "amount": "10", "date_incurred": "2024-01-01"}]
+    assert too_many.status_code == 413
+    assert not_array.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_route(session_factory, monkeypatch):
+    app = FastAPI()
+    app.post("/api/expenses/bulk")(bulk_import.bulk_import_route(ExpenseRecord, ExpenseRecordCreate, "date_incurred"))
+
+    async def db_override():
+        async with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = db_override
+    app.dependency_overrides[verify_jwt_token] = lambda: {"sub": "u1"}
+    monkeypatch.setattr(bulk_import, "BULK_IMPORT_MAX_BYTES", 1024)
+    good = {"category": "rent", "amount": 25000, "date_incurred": "2024-04-05"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        partial = await client.post("/api/expenses/bulk", json=[good, {"category": "rent"}])
+        atomic = await client.post("/api/expenses/bulk?atomic=true", json=[good, {"category": "rent"}])
+        not_utf8 = await client.post("/api/expenses/bulk", content=b"category,amount\n\xff\xfe,1\n", headers={"content-type": "text/csv"})
+
+        async def oversized():
+            for _ in range(8):
+                yield b"x" * 256
+
+        too_big = await client.post("/api/expenses/bulk", content=oversized(), headers={"content-type": "text/csv"})
+
+    assert partial.status_code == 200
+    assert partial.json()["inserted"] == 1 and [e["row"] for e in partial.json()["errors"]] == [2]
+    assert atomic.status_code == 422 and atomic.json()["detail"]["inserted"] == 0
+    assert not_utf8.status_code == 400
+    assert too_big.status_code == 413
+    async with session_factory() as db:
+        count = await db.scalar(select(func.count()).select_from(ExpenseRecord).where(ExpenseRecord.user_id == "u1"))
+    assert count == 1
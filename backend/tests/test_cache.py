@@ -0,0 +1,100 @@
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock
+from app import cache, schemas
+from app.api.v1.endpoints import dashboard, assets
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+
+def test_ttl_cache_lru_eviction_and_counters():
+    c = cache.TTLCache(max_size=2, ttl=60)
+    c.set("a", 1)
+    c.set("b", 2)
+    assert c.get("a") == 1  # a is now most recently used
+    c.set("c", 3)
+    assert c.get("b") is None
+    assert c.get("c") == 3
+    stats = c.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (2, 1, 1, 2)
+
+
+def test_ttl_cache_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    c = cache.TTLCache(max_size=10, ttl=5)
+    c.set("a", 1)
+    now[0] += 4.9
+    assert c.get("a") == 1
+    now[0] += 0.2
+    assert c.get("a") is None
+    assert c.stats()["expirations"] == 1
+
+
+def test_redis_cache_with_stand_in_client():
+    c = cache.RedisCache(FakeRedis(), ttl=30, prefix="t:")
+    assert c.get("u1") is None
+    c.set("u1", {"net_worth": 10})
+    assert c.get("u1") == {"net_worth": 10}
+    c.delete("u1")
+    assert c.get("u1") is None
+    assert c.stats()["hits"] == 1
+    assert c.stats()["misses"] == 2
+
+
+@pytest.fixture
+def summary_cache(monkeypatch):
+    c = cache.TTLCache(max_size=10, ttl=60)
+    monkeypatch.setattr(cache, "dashboard_summary_cache", c)
+    monkeypatch.setattr(dashboard, "dashboard_summary_cache", c)
+    return c
+
+
+@pytest.fixture
+def db_calls(monkeypatch):
+    calls = []
+
+    class Conn:
+        async def fetchrow(self, query, *args):
+            calls.append(args)
+            return {"total_assets": 100, "total_liabilities": 40, "epfo_balance": 5, "last_updated": None}
+
+    @asynccontextmanager
+    async def fake_pg_connection():
+        yield Conn()
+
+    async def fake_contributions_total(user_id):
+        return 0.0, None
+
+    monkeypatch.setattr(dashboard, "pg_connection", fake_pg_connection)
+    monkeypatch.setattr(dashboard, "contributions_total", fake_contributions_total)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_dashboard_summary_is_cached_and_invalidated_on_asset_write(summary_cache, db_calls, monkeypatch):
+    first = await dashboard.get_dashboard_summary(None, "user-1")
+    second = await dashboard.get_dashboard_summary(None, "user-1")
+    assert first == second
+    assert len(db_calls) == 1
+
+    supabase = MagicMock()
+    supabase.table.return_value.insert.return_value.execute.return_value = {"data": [{"id": 1}], "error": None}
+    monkeypatch.setattr(assets, "get_supabase_client", lambda: supabase)
+    assets.create_asset(schemas.AssetCreate(type="Stock", details={}), user={"sub": "user-1"})
+
+    await dashboard.get_dashboard_summary(None, "user-1")
+    assert len(db_calls) == 2
+    assert summary_cache.stats()["hits"] == 1
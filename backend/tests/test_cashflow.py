@@ -0,0 +1,75 @@
+import datetime
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+pytest.importorskip("aiosqlite")
+from app import database
+from app.auth import verify_jwt_token
+from app.models import IncomeRecord, ExpenseRecord
+from app.api.v1.endpoints import cashflow
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = database.create_async_db_engine(f"sqlite:///{tmp_path}/cashflow.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(IncomeRecord.__table__.create)
+        await conn.run_sync(ExpenseRecord.__table__.create)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with factory() as db:
+        db.add_all([
+            IncomeRecord(user_id="u1", source="salary", category="salary", amount=1000, date_received=datetime.date(2024, 1, 31)),
+            IncomeRecord(user_id="u1", source="bonus", category="bonus", amount=500, date_received=datetime.date(2024, 1, 2)),
+            ExpenseRecord(user_id="u1", category="rent", amount=300, date_incurred=datetime.date(2024, 1, 5)),
+            ExpenseRecord(user_id="u1", category="rent", amount=300, date_incurred=datetime.date(2024, 3, 5)),
+            IncomeRecord(user_id="u2", source="salary", category="salary", amount=9999, date_received=datetime.date(2024, 1, 15)),
+        ])
+        await db.commit()
+    yield factory
+    await engine.dispose()
+
+
+@pytest.fixture
+def app(session_factory):
+    async def override_db():
+        async with session_factory() as db:
+            yield db
+
+    test_app = FastAPI()
+    test_app.include_router(cashflow.router, prefix="/api/v1/cashflow")
+    test_app.dependency_overrides[database.get_async_db] = override_db
+    test_app.dependency_overrides[verify_jwt_token] = lambda: {"sub": "u1"}
+    return test_app
+
+
+async def get(app, **params):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get("/api/v1/cashflow/monthly", params=params)
+
+
+@pytest.mark.asyncio
+async def test_one_row_per_month_with_gaps_filled(app):
+    resp = await get(app)
+    assert resp.json() == [
+        {"month": "2024-01", "income": 1500.0, "expenses": 300.0, "net": 1200.0},
+        {"month": "2024-02", "income": 0.0, "expenses": 0.0, "net": 0.0},
+        {"month": "2024-03", "income": 0.0, "expenses": 300.0, "net": -300.0},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_date_range_bounds_the_months(app):
+    resp = await get(app, date_from="2024-01-03", date_to="2024-04-30")
+    months = resp.json()
+    assert [m["month"] for m in months] == ["2024-01", "2024-02", "2024-03", "2024-04"]
+    assert months[0]["income"] == 1000.0
+
+
+@pytest.mark.asyncio
+async def test_inverted_range_is_rejected(app):
+    resp = await get(app, date_from="2024-05-01", date_to="2024-01-01")
+    assert resp.status_code == 400
@@ -0,0 +1,82 @@
+import datetime
+import pytest
+from contextlib import asynccontextmanager
+from app.api.v1.endpoints import dashboard
+from app.cache import TTLCache
+
+
+class RecordingConn:
+    def __init__(self, row):
+        self.row = row
+        self.queries = []
+
+    async def fetchrow(self, query, *args):
+        self.queries.append((query, args))
+        return self.row
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    conn = RecordingConn({
+        "total_assets": 2000,
+        "total_liabilities": 500,
+        "epfo_balance": 300,
+        "last_updated": datetime.datetime(2024, 1, 2, 3, 4, 5),
+    })
+
+    @asynccontextmanager
+    async def fake_pg_connection():
+        yield conn
+
+    async def fake_contributions_total(user_id):
+        return conn.contributions
+
+    conn.contributions = (120.0, None)
+    monkeypatch.setattr(dashboard, "pg_connection", fake_pg_connection)
+    monkeypatch.setattr(dashboard, "contributions_total", fake_contributions_total)
+    monkeypatch.setattr(dashboard, "dashboard_summary_cache", TTLCache())
+    return conn
+
+
+@pytest.mark.asyncio
+async def test_summary_is_a_single_round_trip(conn):
+    result = await dashboard.get_dashboard_summary(None, "user-1")
+    assert len(conn.queries) == 1
+    assert conn.queries[0] == (dashboard.DASHBOARD_SUMMARY_SQL, ("user-1",))
+    assert result == {
+        "total_assets": 2000,
+        "total_liabilities": 500,
+        "net_worth": 1500,
+        "epfo_balance": 300,
+        "epfo_contributions": 120,
+        "last_updated": "2024-01-02T03:04:05",
+    }
+
+
+@pytest.mark.asyncio
+async def test_summary_without_rows_has_no_last_updated(conn):
+    conn.row = {"total_assets": 0, "total_liabilities": 0, "epfo_balance": 0, "last_updated": None}
+    result = await dashboard.get_dashboard_summary(None, "user-1")
+    assert result["last_updated"] is None
+    assert result["net_worth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_contributions_update_time_counts_towards_last_updated(conn):
+    conn.contributions = (50.0, datetime.datetime(2024, 6, 1))
+    result = await dashboard.get_dashboard_summary(None, "user-1")
+    assert result["epfo_contributions"] == 50.0
+    assert result["last_updated"] == "2024-06-01T00:00:00"
+
+
+@pytest.mark.asyncio
+async def test_failed_contributions_read_is_reported_and_not_cached(conn, monkeypatch):
+    async def failing(user_id):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(dashboard, "contributions_total", failing)
+    result = await dashboard.get_dashboard_summary(None, "user-1")
+    assert result["epfo_contributions"] is None
+    assert result["total_assets"] == 2000
+    await dashboard.get_dashboard_summary(None, "user-1")
+    assert len(conn.queries) == 2
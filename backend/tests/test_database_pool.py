@@ -0,0 +1,67 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from app import database
+
+
+@pytest.fixture
+def make_engine(tmp_path):
+    engines = []
+
+    def _make(**overrides):
+        engine = database.create_db_engine(f"sqlite:///{tmp_path}/pool.db", poolclass=QueuePool, **overrides)
+        engines.append(engine)
+        return engine
+
+    yield _make
+    for engine in engines:
+        engine.dispose()
+
+
+def test_pool_contention_stays_within_bounds(make_engine):
+    engine = make_engine(pool_size=2, max_overflow=1, pool_timeout=10)
+    peak = {"checked_out": 0}
+    lock = threading.Lock()
+
+    def worker(_):
+        with engine.connect() as conn:
+            with lock:
+                peak["checked_out"] = max(peak["checked_out"], engine.pool.checkedout())
+            conn.execute(text("SELECT 1"))
+            time.sleep(0.02)
+        return True
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        results = list(pool.map(worker, range(48)))
+
+    stats = database.pool_stats(engine)
+    assert all(results)
+    assert peak["checked_out"] == 3
+    assert stats["checkouts"] == stats["checkins"] == 48
+    assert stats["connects"] <= 3
+    assert stats["checkedout"] == 0
+
+
+def test_exhausted_pool_times_out(make_engine):
+    engine = make_engine(pool_size=1, max_overflow=0, pool_timeout=0.1)
+    with engine.connect():
+        start = time.perf_counter()
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+        assert time.perf_counter() - start < 1
+
+
+def test_env_pool_settings_are_applied(monkeypatch):
+    monkeypatch.setattr(database, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(database, "DB_MAX_OVERFLOW", 3)
+    monkeypatch.setattr(database, "DB_POOL_RECYCLE", 600)
+    monkeypatch.setattr(database, "DB_POOL_PRE_PING", True)
+    engine = database.create_db_engine("mysql+pymysql://u:p@db/family_office")
+    assert engine.pool.size() == 7
+    assert engine.pool._max_overflow == 3
+    assert engine.pool._recycle == 600
+    assert engine.pool._pre_ping is True
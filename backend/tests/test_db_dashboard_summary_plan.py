@@ -0,0 +1,30 @@
+import os
+import importlib
+import pytest
+
+
+def test_dashboard_summary_plan_uses_user_id_indexes():
+    # Same optional-driver pattern as test_db_dashboard_schema: only runs
+    # against a real database with migrations applied.
+    if importlib.util.find_spec("psycopg2") is None:
+        pytest.skip("psycopg2 not installed; skipping dashboard plan test")
+    db_url = os.environ.get("SUPABASE_DB_URL")
+    if not db_url:
+        pytest.skip("SUPABASE_DB_URL not set; skipping dashboard plan test")
+
+    psycopg2 = importlib.import_module("psycopg2")
+    from app.api.v1.endpoints.dashboard import DASHBOARD_SUMMARY_SQL
+
+    conn = psycopg2.connect(db_url)
+    cur = conn.cursor()
+    # Test tables are tiny, so force the planner off seq scans to check the
+    # indexes are usable for each per-table aggregate.
+    cur.execute("SET enable_seqscan = off")
+    cur.execute("EXPLAIN " + DASHBOARD_SUMMARY_SQL.replace("$1", "%s"), ("00000000-0000-0000-0000-000000000000",))
+    plan = "\n".join(r[0] for r in cur.fetchall())
+    cur.close()
+    conn.close()
+
+    for table in ("assets", "liabilities", "epfo_data"):
+        assert f"idx_{table}_user_id" in plan, plan
+    assert "Seq Scan" not in plan, plan
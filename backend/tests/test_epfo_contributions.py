@@ -0,0 +1,146 @@
+import datetime
+from decimal import Decimal
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+pytest.importorskip("aiosqlite")
+from app import database, models
+from app.auth import verify_jwt_token
+from app.api.v1.endpoints import surepass_epfo
+from app import epfo_contributions
+from app.epfo_contributions import contributions_total, financial_year_totals, monthly_contributions, upsert_contributions
+from app.epfo_normalize import EPFOContribution
+
+
+def row(month, ee, member_id="M1"):
+    return EPFOContribution(member_id, "ACME", month, Decimal(ee), Decimal("550"), Decimal("1250"))
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = database.create_async_db_engine(f"sqlite:///{tmp_path}/epfo.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(database.Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_refetch_upserts_instead_of_duplicating(session_factory):
+    mar, apr = datetime.date(2023, 3, 1), datetime.date(2023, 4, 1)
+    async with session_factory() as db:
+        assert await upsert_contributions(db, "u1", "UAN1", [row(mar, "1800"), row(apr, "1800")], "tx-1") == 2
+        await db.commit()
+        # second fetch: March revised, April posted twice (arrears) and a new employer
+        await upsert_contributions(db, "u1", "UAN1", [row(mar, "2000"), row(apr, "100"), row(apr, "200"), row(apr, "900", "M2")], "tx-2")
+        await db.commit()
+
+        records = (await db.execute(
+            select(models.EPFOContributionRecord).order_by(models.EPFOContributionRecord.month, models.EPFOContributionRecord.member_id)
+        )).scalars().all()
+    assert [(r.member_id, r.month, r.employee_share) for r in records] == [
+        ("M1", mar, Decimal("2000")),
+        ("M1", apr, Decimal("300")),
+        ("M2", apr, Decimal("900")),
+    ]
+    assert {r.transaction_id for r in records} == {"tx-2"}
+
+
+@pytest.mark.asyncio
+async def test_same_uan_fetched_by_two_users_keeps_both_ledgers(session_factory):
+    mar = datetime.date(2023, 3, 1)
+    async with session_factory() as db:
+        await upsert_contributions(db, "member", "UAN1", [row(mar, "1800")], "tx-1")
+        await db.commit()
+        await upsert_contributions(db, "advisor", "UAN1", [row(mar, "2000")], "tx-2")
+        await db.commit()
+
+        member = await monthly_contributions(db, "member")
+        advisor = await monthly_contributions(db, "advisor")
+        member_fy = await financial_year_totals(db, "member")
+    assert member[0]["employee_share"] == 1800.0
+    assert advisor[0]["employee_share"] == 2000.0
+    assert member_fy[0]["total"] == 3600.0
+
+
+@pytest.mark.asyncio
+async def test_monthly_and_financial_year_aggregates(session_factory):
+    async with session_factory() as db:
+        await upsert_contributions(db, "u1", "UAN1", [
+            row(datetime.date(2023, 3, 1), "1000"),
+            row(datetime.date(2023, 4, 1), "1000"),
+            row(datetime.date(2023, 4, 1), "500", "M2"),
+        ])
+        await upsert_contributions(db, "other-user", "UAN2", [row(datetime.date(2023, 4, 1), "9999")])
+        await db.commit()
+
+        monthly = await monthly_contributions(db, "u1")
+        by_year = await financial_year_totals(db, "u1")
+        ranged = await monthly_contributions(db, "u1", date_from=datetime.date(2023, 4, 1))
+
+    assert monthly == [
+        {"month": "2023-03", "employee_share": 1000.0, "employer_share": 550.0, "pension_share": 1250.0, "total": 2800.0},
+        {"month": "2023-04", "employee_share": 1500.0, "employer_share": 1100.0, "pension_share": 2500.0, "total": 5100.0},
+    ]
+    assert [m["month"] for m in ranged] == ["2023-04"]
+    assert [(y["financial_year"], y["total"], y["months"]) for y in by_year] == [("2022-23", 2800.0, 1), ("2023-24", 5100.0, 1)]
+
+
+@pytest.mark.asyncio
+async def test_contributions_total_reads_the_sqlalchemy_database(session_factory, monkeypatch):
+    monkeypatch.setattr(epfo_contributions, "get_async_engine", lambda: session_factory.kw["bind"])
+    assert await contributions_total("u1") == (0.0, None)
+    async with session_factory() as db:
+        await upsert_contributions(db, "u1", "UAN1", [row(datetime.date(2023, 3, 1), "1000")])
+        await db.commit()
+    total, updated_at = await contributions_total("u1")
+    assert total == 2800.0 and updated_at is not None
+
+
+@pytest.mark.asyncio
+async def test_verify_otp_persists_ledger_and_serves_totals(session_factory, monkeypatch):
+    passbook = {
+        "data": {
+            "uan": "100200300400",
+            "companies": {
+                "MH01": {"company_name": "ACME", "passbook": [
+                    {"month_year": "032023", "employee_share": "1800", "employer_share": "550", "pension_share": "1250"},
+                    {"month_year": "042023", "employee_share": "1800", "employer_share": "550", "pension_share": "1250"},
+                ]},
+            },
+        }
+    }
+
+    async def fake_sp_post(path, payload, **kwargs):
+        return passbook
+
+    async def override_db():
+        async with session_factory() as db:
+            yield db
+
+    monkeypatch.setattr(surepass_epfo, "sp_post", fake_sp_post)
+    app = FastAPI()
+    app.include_router(surepass_epfo.router, prefix="/api")
+    app.dependency_overrides[database.get_async_db] = override_db
+    app.dependency_overrides[verify_jwt_token] = lambda: {"sub": "u1"}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        for txn in ("tx-1", "tx-2"):
+            resp = await client.post("/api/surepass/epfo/verify-otp", json={"transaction_id": txn, "otp": "1"})
+            assert resp.status_code == 200
+        monthly = await client.get("/api/epfo/contributions")
+        totals = await client.get("/api/epfo/contributions/totals")
+        bad = await client.get("/api/epfo/contributions", params={"date_from": "2024-01-01", "date_to": "2023-01-01"})
+
+    async with session_factory() as db:
+        count = await db.scalar(select(func.count()).select_from(models.EPFOContributionRecord))
+    assert count == 2
+    assert [m["month"] for m in monthly.json()["data"]] == ["2023-03", "2023-04"]
+    assert totals.json()["data"]["total"]["total"] == 7200.0
+    assert [y["financial_year"] for y in totals.json()["data"]["by_financial_year"]] == ["2022-23", "2023-24"]
+    assert bad.status_code == 400
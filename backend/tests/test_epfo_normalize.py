@@ -0,0 +1,113 @@
+import json
+import datetime
+from decimal import Decimal
+
+from app.epfo_normalize import (
+    EPFOContribution,
+    financial_year,
+    normalize_epfo,
+    parse_amount,
+    parse_ledger,
+    parse_month,
+    totals_by_financial_year,
+)
+
+
+MULTI_EMPLOYER = {
+    "data": {
+        "full_name": "Asha Rao",
+        "uan": "100200300400",
+        "companies": {
+            "MHBAN00123450000012345": {
+                "company_name": "ACME PVT LTD",
+                "passbook": [
+                    {"month_year": "032023", "employee_share": "1,800", "employer_share": "550", "pension_share": "1250", "type": "CR"},
+                    {"month_year": "042023", "employee_share": "1800", "employer_share": "550", "pension_share": "1250", "type": "CR"},
+                    {"month_year": "032023", "employee_share": "5000", "employer_share": "4000", "pension_share": "0", "type": "INT"},
+                ],
+            },
+            "KNBNG00999990000067890": {
+                "company_name": "GLOBEX LTD",
+                "passbook": [
+                    {"wage_month": "Jan-2024", "ee_share": 2000, "er_share": 700.5, "eps": 1250},
+                ],
+            },
+        },
+    }
+}
+
+
+def test_parse_month_formats():
+    expected = datetime.date(2023, 3, 1)
+    for value in ("032023", "03-2023", "2023-03", "2023-03-17", "17/03/2023", "Mar-2023", "MARCH 2023", "Mar-23"):
+        assert parse_month(value) == expected, value
+    assert parse_month("13-2023") is None
+    assert parse_month("01-0000") is None
+    assert parse_month("2023-00") is None
+    assert parse_month(None) is None
+
+
+def test_parse_amount_rejects_non_finite():
+    assert parse_amount("₹1,800.50") == Decimal("1800.50")
+    for value in ("NaN", "nan", "Infinity", "-inf", float("nan"), Decimal("sNaN"), "abc"):
+        assert parse_amount(value) == 0, value
+    # a garbage ledger entry doesn't poison the totals or the stored JSON
+    raw = {"contributions": [
+        {"month": "01-0000", "employee_share": 100},
+        {"month": "2024-01", "employee_share": "NaN", "employer_share": 50},
+    ]}
+    norm = normalize_epfo(raw)
+    assert norm["totals_by_financial_year"] == [
+        {"financial_year": "2023-24", "employee_share": 0.0, "employer_share": 50.0, "pension_share": 0.0, "total": 50.0, "months": 1}
+    ]
+    json.dumps(norm, allow_nan=False)
+
+
+def test_financial_year_boundaries():
+    assert financial_year(datetime.date(2023, 3, 1)) == "2022-23"
+    assert financial_year(datetime.date(2023, 4, 1)) == "2023-24"
+    assert financial_year(datetime.date(1999, 12, 1)) == "1999-00"
+
+
+def test_parse_ledger_multi_employer_skips_interest():
+    rows = parse_ledger(MULTI_EMPLOYER)
+    assert len(rows) == 3
+    first = rows[0]
+    assert isinstance(first, EPFOContribution)
+    assert first.member_id == "MHBAN00123450000012345"
+    assert first.establishment == "ACME PVT LTD"
+    assert first.month == datetime.date(2023, 3, 1)
+    assert first.employee_share == Decimal("1800")
+    assert first.total == Decimal("3600")
+    assert rows[2].employer_share == Decimal("700.5")
+
+
+def test_totals_by_financial_year():
+    totals = totals_by_financial_year(parse_ledger(MULTI_EMPLOYER))
+    assert [t["financial_year"] for t in totals] == ["2022-23", "2023-24"]
+    assert totals[0] == {
+        "financial_year": "2022-23", "employee_share": 1800.0, "employer_share": 550.0,
+        "pension_share": 1250.0, "total": 3600.0, "months": 1,
+    }
+    assert totals[1]["employee_share"] == 3800.0
+    assert totals[1]["employer_share"] == 1250.5
+    assert totals[1]["months"] == 2
+
+
+def test_normalize_summary_and_ledger():
+    norm = normalize_epfo(MULTI_EMPLOYER)
+    assert norm["member_name"] == "Asha Rao"
+    assert norm["uan"] == "100200300400"
+    assert norm["contributions_count"] == 3
+    assert norm["last_contribution"] == "2024-01-01"
+    assert norm["member_ids"] == ["KNBNG00999990000067890", "MHBAN00123450000012345"]
+    assert len(norm["totals_by_financial_year"]) == 2
+    assert "normalized_at" in norm
+
+
+def test_normalize_legacy_shapes():
+    assert normalize_epfo({"passbook": {"balance": 1000}})["balance"] == 1000
+    norm = normalize_epfo({"passbook": {"total_balance": 5, "contributions": [{}, {}]}, "uan": "U1"})
+    assert norm["balance"] == 5 and norm["uan"] == "U1" and norm["contributions_count"] == 2
+    assert normalize_epfo({"amount": 7})["balance"] == 7
+    assert set(normalize_epfo(["not", "a", "dict"])) == {"normalized_at"}
@@ -0,0 +1,84 @@
+import datetime
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+pytest.importorskip("aiosqlite")
+from app import database, models
+from app.auth import verify_jwt_token
+from app.api.v1.endpoints import surepass_epfo
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = database.create_async_db_engine(f"sqlite:///{tmp_path}/summaries.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(database.Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    base = datetime.datetime(2024, 1, 1)
+    async with factory() as db:
+        for i in range(5):
+            db.add(models.EPFOSummary(
+                user_id="u1", transaction_id=f"tx-{i}", raw_json={"big": "x" * 1000, "i": i},
+                normalized_json={"balance": i}, created_at=base + datetime.timedelta(days=i),
+            ))
+        # same timestamp as tx-4: the id tiebreak keeps pages stable
+        db.add(models.EPFOSummary(user_id="u1", transaction_id="tx-5", raw_json={}, normalized_json={}, created_at=base + datetime.timedelta(days=4)))
+        db.add(models.EPFOSummary(user_id="u2", transaction_id="other", raw_json={}, normalized_json={}, created_at=base))
+        await db.commit()
+    yield factory
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def client(session_factory):
+    async def override_db():
+        async with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(surepass_epfo.router, prefix="/api")
+    app.dependency_overrides[database.get_async_db] = override_db
+    app.dependency_overrides[verify_jwt_token] = lambda: {"sub": "u1"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+        yield c
+
+
+@pytest.mark.asyncio
+async def test_listing_pages_newest_first_without_raw(client):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        resp = await client.get("/api/epfo/summaries", params=params)
+        assert resp.status_code == 200
+        page = resp.json()["data"]
+        assert all("raw" not in item for item in page)
+        seen += [item["transaction_id"] for item in page]
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == ["tx-5", "tx-4", "tx-3", "tx-2", "tx-1", "tx-0"]
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_400(client):
+    resp = await client.get("/api/epfo/summaries", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_latest_and_raw_on_demand(client):
+    latest = (await client.get("/api/epfo/latest")).json()["data"]
+    assert latest["transaction_id"] == "tx-5" and "raw" not in latest
+
+    listing = (await client.get("/api/epfo/summaries")).json()["data"]
+    tx1 = next(item for item in listing if item["transaction_id"] == "tx-1")
+    raw = await client.get(f"/api/epfo/summaries/{tx1['id']}/raw")
+    assert raw.status_code == 200 and raw.json()["raw"]["i"] == 1
+
+    # another user's summary is not visible
+    other = await client.get("/api/epfo/summaries/7/raw")
+    assert other.status_code == 404
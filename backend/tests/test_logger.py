@@ -0,0 +1,54 @@
+import io
+import json
+import logging
+import queue
+from logging.handlers import QueueListener
+
+from app import logger as log_module
+
+
+def make_pipeline():
+    stream = io.StringIO()
+    sink = logging.StreamHandler(stream)
+    sink.setFormatter(log_module.JsonFormatter())
+    q = queue.SimpleQueue()
+    listener = QueueListener(q, sink)
+    test_logger = logging.getLogger("test_logger_pipeline")
+    test_logger.propagate = False
+    test_logger.handlers = [log_module._QueueHandler(q)]
+    test_logger.setLevel(logging.INFO)
+    return test_logger, listener, stream
+
+
+def test_records_are_serialised_on_listener_with_extras_and_traceback():
+    test_logger, listener, stream = make_pipeline()
+    listener.start()
+    payload = {"n": 1}
+    test_logger.info("user %s", payload, extra={"path": "/api/health", "status": 200})
+    # later mutation must not leak into the already-logged line
+    payload["n"] = 2
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        test_logger.error("failed", exc_info=True)
+    listener.stop()
+
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first["message"] == "user {'n': 1}"
+    assert first["path"] == "/api/health" and first["status"] == 200
+    assert second["message"] == "failed"
+    assert "ValueError: boom" in second["exc_info"]
+
+
+def test_sampling_always_keeps_errors_and_slow_requests(monkeypatch):
+    monkeypatch.setattr(log_module, "ACCESS_LOG_SAMPLE_RATE", 0.0)
+    assert not log_module.should_log_access(200, 5.0)
+    assert log_module.should_log_access(404, 5.0)
+    assert log_module.should_log_access(500, 5.0)
+    assert log_module.should_log_access(200, log_module.ACCESS_LOG_SLOW_MS)
+
+
+def test_sampling_rate_is_roughly_respected(monkeypatch):
+    monkeypatch.setattr(log_module, "ACCESS_LOG_SAMPLE_RATE", 0.1)
+    kept = sum(log_module.should_log_access(200, 1.0) for _ in range(10000))
+    assert 700 < kept < 1300
@@ -0,0 +1,65 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app import metrics, surepass_client
+from app.middleware import LoggingMiddleware
+
+
+def sample(name, labels):
+    return metrics.registry.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture
+def app():
+    test_app = FastAPI()
+    test_app.add_middleware(LoggingMiddleware)
+
+    @test_app.get("/api/v1/assets/{id}")
+    async def get_asset(id: int):
+        return {"id": id}
+
+    return test_app
+
+
+@pytest.mark.asyncio
+async def test_requests_are_counted_by_route_template(app):
+    labels = {"method": "GET", "route": "/api/v1/assets/{id}", "status": "200"}
+    before = sample("http_requests_total", labels)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for i in range(3):
+            await client.get(f"/api/v1/assets/{i}")
+        await client.get("/no/such/route")
+
+    assert sample("http_requests_total", labels) == before + 3
+    assert sample("http_requests_total", {"method": "GET", "route": "unmatched", "status": "404"}) >= 1
+    assert sample("http_request_duration_seconds_count", {"method": "GET", "route": "/api/v1/assets/{id}"}) >= 3
+    assert sample("http_requests_in_flight", {}) == 0
+
+
+@pytest.mark.asyncio
+async def test_surepass_latency_and_errors(monkeypatch):
+    def handler(request):
+        return httpx.Response(502, text="bad gateway")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://surepass")
+    monkeypatch.setattr(surepass_client, "_client", client)
+    path = "/v1/epfo/generate-otp"
+    errors_before = sample("surepass_errors_total", {"endpoint": path, "reason": "502"})
+    count_before = sample("surepass_request_duration_seconds_count", {"endpoint": path})
+    with pytest.raises(surepass_client.SurepassError):
+        await surepass_client.sp_post(path, {"uan": "1"})
+
+    assert sample("surepass_errors_total", {"endpoint": path, "reason": "502"}) == errors_before + 1
+    assert sample("surepass_request_duration_seconds_count", {"endpoint": path}) == count_before + 1
+
+
+def test_exposition_includes_pool_and_cache_metrics():
+    body, content_type = metrics.render_metrics()
+    text = body.decode()
+    assert content_type.startswith("text/plain")
+    assert 'pg_pool_connections{state="max_size"}' in text
+    assert 'sqlalchemy_pool_events_total{engine="sync",event="connects"}' in text
+    assert 'cache_hits_total{cache="verified_token"}' in text
+    assert 'cache_entries{cache="dashboard_summary"}' in text
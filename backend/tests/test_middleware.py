@@ -0,0 +1,79 @@
+import logging
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from app import logger as log_module
+from app.middleware import LoggingMiddleware
+
+
+@pytest.fixture
+def app():
+    test_app = FastAPI()
+    test_app.add_middleware(LoggingMiddleware)
+
+    @test_app.get("/ok")
+    async def ok():
+        return {"ok": True}
+
+    @test_app.get("/boom")
+    async def boom():
+        raise RuntimeError("kaput")
+
+    @test_app.get("/stream")
+    async def stream():
+        async def body():
+            for i in range(3):
+                yield f"chunk{i}\n"
+        return StreamingResponse(body(), media_type="text/plain")
+
+    return test_app
+
+
+@pytest.fixture
+def records(monkeypatch):
+    captured = []
+
+    class Capture(logging.Handler):
+        def emit(self, record):
+            captured.append(record)
+
+    handler = Capture()
+    log_module.logger.addHandler(handler)
+    monkeypatch.setattr(log_module, "ACCESS_LOG_SAMPLE_RATE", 1.0)
+    yield captured
+    log_module.logger.removeHandler(handler)
+
+
+async def call(app, path):
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path)
+
+
+@pytest.mark.asyncio
+async def test_success_is_logged_with_structured_fields(app, records):
+    resp = await call(app, "/ok")
+    assert resp.status_code == 200
+    (record,) = records
+    assert record.levelno == logging.INFO
+    assert (record.method, record.path, record.status) == ("GET", "/ok", 200)
+    assert record.duration_ms >= 0
+
+
+@pytest.mark.asyncio
+async def test_unhandled_exception_becomes_json_500(app, records):
+    resp = await call(app, "/boom")
+    assert resp.status_code == 500
+    assert resp.json() == {"error": "Internal server error", "detail": "kaput"}
+    (record,) = records
+    assert record.levelno == logging.ERROR and record.status == 500
+    assert record.exc_info[0] is RuntimeError
+
+
+@pytest.mark.asyncio
+async def test_streaming_response_passes_through(app, records):
+    resp = await call(app, "/stream")
+    assert resp.text == "chunk0\nchunk1\nchunk2\n"
+    assert records[0].status == 200
@@ -0,0 +1,116 @@
+import asyncio
+import pytest
+from contextlib import AsyncExitStack, asynccontextmanager
+from app import pg_pool
+
+
+class FakeConn:
+    async def fetchval(self, query):
+        return 1
+
+
+class FakePool:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.in_use = 0
+        self.closed = False
+        # acquire() waits while every connection is checked out, like asyncpg
+        self.slots = asyncio.Semaphore(max_size)
+
+    def get_size(self):
+        return self.max_size
+
+    def get_idle_size(self):
+        return self.max_size - self.in_use
+
+    def get_max_size(self):
+        return self.max_size
+
+    @asynccontextmanager
+    async def acquire(self):
+        async with self.slots:
+            self.in_use += 1
+            try:
+                yield FakeConn()
+            finally:
+                self.in_use -= 1
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    created = []
+
+    async def create_pool(dsn, **kwargs):
+        pool = FakePool(kwargs["max_size"])
+        created.append((dsn, kwargs, pool))
+        return pool
+
+    monkeypatch.setenv("SUPABASE_DB_URL", "postgresql://test/db")
+    monkeypatch.setattr(pg_pool.asyncpg, "create_pool", create_pool)
+    monkeypatch.setattr(pg_pool, "_pool", None)
+    monkeypatch.setattr(pg_pool, "_stats", dict.fromkeys(pg_pool._stats, 0))
+    return created
+
+
+@pytest.mark.asyncio
+async def test_pool_is_created_once_and_reused(fake_pool):
+    first = await pg_pool.get_pg_pool()
+    assert await pg_pool.get_pg_pool() is first
+    assert len(fake_pool) == 1
+    dsn, kwargs, _ = fake_pool[0]
+    assert dsn == "postgresql://test/db"
+    assert kwargs["statement_cache_size"] == pg_pool.PG_STATEMENT_CACHE_SIZE
+    assert kwargs["max_inactive_connection_lifetime"] == pg_pool.PG_POOL_MAX_IDLE_SECONDS
+    await pg_pool.close_pg_pool()
+    assert fake_pool[0][2].closed
+
+
+@pytest.mark.asyncio
+async def test_stats_track_in_use_and_saturation(fake_pool, monkeypatch):
+    monkeypatch.setattr(pg_pool, "PG_POOL_MAX_SIZE", 1)
+    async with pg_pool.pg_connection():
+        stats = pg_pool.pg_pool_stats()
+        assert stats["in_use"] == 1
+        assert stats["idle"] == 0
+    assert await pg_pool.check_pg_pool() is True
+    stats = pg_pool.pg_pool_stats()
+    assert stats["acquires"] == 2
+    assert stats["saturated_acquires"] == 0
+    assert stats["in_use"] == 0
+    await pg_pool.close_pg_pool()
+
+
+@pytest.mark.asyncio
+async def test_acquire_on_full_pool_counts_as_saturated(fake_pool, monkeypatch):
+    monkeypatch.setattr(pg_pool, "PG_POOL_MAX_SIZE", 2)
+    async with AsyncExitStack() as held:
+        for _ in range(2):
+            await held.enter_async_context(pg_pool.pg_connection())
+        assert pg_pool.pg_pool_stats()["idle"] == 0
+
+        async def one_more():
+            async with pg_pool.pg_connection():
+                pass
+
+        waiter = asyncio.create_task(one_more())
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+    # releasing the held connections lets the waiting acquire through
+    await asyncio.wait_for(waiter, 1)
+    stats = pg_pool.pg_pool_stats()
+    assert stats["acquires"] == 3
+    assert stats["saturated_acquires"] == 1
+    assert stats["wait_ms_max"] >= 40
+    await pg_pool.close_pg_pool()
+
+
+@pytest.mark.asyncio
+async def test_missing_dsn_raises(monkeypatch):
+    monkeypatch.delenv("SUPABASE_DB_URL", raising=False)
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.setattr(pg_pool, "_pool", None)
+    with pytest.raises(RuntimeError):
+        await pg_pool.get_pg_pool()
@@ -0,0 +1,181 @@
+import base64
+import tracemalloc
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app import storage_upload
+from app.api.v1.endpoints import assets
+from app.auth import verify_jwt_token
+
+CHUNK = 256 * 1024
+BOUNDARY = "test-boundary-1234"
+
+
+class FakeStorage(httpx.AsyncBaseTransport):
+    """Counts bytes per upload instead of keeping them, like a real bucket.
+
+    Request bodies are drained like a network transport would, rather than
+    buffered the way httpx.MockTransport does.
+    """
+
+    def __init__(self, fail_first_patch=False):
+        self.simple = {}
+        self.tus = {}
+        self.patch_sizes = []
+        self.fail_first_patch = fail_first_patch
+
+    async def handle_async_request(self, request: httpx.Request):
+        size = 0
+        async for chunk in request.stream:
+            size += len(chunk)
+        return self.handle(request, size)
+
+    def handle(self, request: httpx.Request, size: int):
+        path = request.url.path
+        if request.method == "POST" and path.startswith("/storage/v1/object/"):
+            self.simple[path] = size
+            return httpx.Response(200, json={"Key": path})
+        if request.method == "POST" and path == "/storage/v1/upload/resumable":
+            assert request.headers["Upload-Defer-Length"] == "1"
+            self.tus["metadata"] = dict(item.split(" ") for item in request.headers["Upload-Metadata"].split(","))
+            self.tus["offset"] = 0
+            return httpx.Response(201, headers={"Location": "/storage/v1/upload/resumable/abc"})
+        if request.method == "HEAD":
+            return httpx.Response(200, headers={"Upload-Offset": str(self.tus["offset"])})
+        if request.method == "PATCH":
+            assert int(request.headers["Upload-Offset"]) == self.tus["offset"]
+            if self.fail_first_patch:
+                # accept half the chunk, then drop the connection
+                self.fail_first_patch = False
+                self.tus["offset"] += size // 2
+                raise httpx.ReadError("connection reset")
+            self.patch_sizes.append(size)
+            self.tus["offset"] += size
+            if "Upload-Length" in request.headers:
+                self.tus["length"] = int(request.headers["Upload-Length"])
+            return httpx.Response(204, headers={"Upload-Offset": str(self.tus["offset"])})
+        return httpx.Response(404)
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    fake = FakeStorage()
+    monkeypatch.setattr(storage_upload, "UPLOAD_CHUNK_SIZE", CHUNK)
+    monkeypatch.setattr(storage_upload, "_client", httpx.AsyncClient(transport=fake, base_url="http://storage"))
+    return fake
+
+
+@pytest.fixture
+def app():
+    test_app = FastAPI()
+    test_app.include_router(assets.router, prefix="/api/v1/assets")
+    test_app.dependency_overrides[verify_jwt_token] = lambda: {"sub": "u1"}
+    return test_app
+
+
+async def multipart_body(size, piece=64 * 1024, truncated=False, filename="big.pdf"):
+    yield (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"note\"\r\n\r\nstatement\r\n"
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode()
+    block = b"x" * piece
+    sent = 0
+    while sent < size:
+        n = min(piece, size - sent)
+        yield block[:n]
+        sent += n
+    if not truncated:
+        yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def upload(app, size, truncated=False, filename="big.pdf"):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post(
+            "/api/v1/assets/upload-supabase",
+            content=multipart_body(size, truncated=truncated, filename=filename),
+            headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+        )
+
+
+@pytest.mark.asyncio
+async def test_small_file_uses_single_object_upload(app, storage):
+    resp = await upload(app, 1000)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["filename"].startswith("u1/") and body["filename"].endswith("_big.pdf")
+    assert body["url"].endswith(body["filename"])
+    assert list(storage.simple.values()) == [1000]
+
+
+@pytest.mark.asyncio
+async def test_large_upload_streams_in_bounded_memory(app, storage):
+    size = 64 * CHUNK + 123
+    tracemalloc.start()
+    try:
+        resp = await upload(app, size)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert resp.status_code == 200
+    assert storage.tus["length"] == size
+    assert sum(storage.patch_sizes) == size
+    assert all(n == CHUNK for n in storage.patch_sizes[:-1])
+    # a 16MB upload never holds more than a few chunk buffers at once
+    assert peak < 10 * CHUNK < size
+
+
+@pytest.mark.asyncio
+async def test_interrupted_patch_resumes_from_server_offset(app, storage):
+    storage.fail_first_patch = True
+    size = 3 * CHUNK
+    resp = await upload(app, size)
+    assert resp.status_code == 200
+    assert storage.tus["offset"] == storage.tus["length"] == size
+    # the retry only resends the half the server didn't confirm
+    assert storage.patch_sizes[0] == CHUNK - CHUNK // 2
+
+
+@pytest.mark.asyncio
+async def test_size_limit_enforced_while_streaming(app, storage, monkeypatch):
+    monkeypatch.setattr(storage_upload, "UPLOAD_MAX_BYTES", 4 * CHUNK)
+    resp = await upload(app, 10 * CHUNK)
+    assert resp.status_code == 413
+    # rejected before the whole body went upstream
+    assert sum(storage.patch_sizes) <= 4 * CHUNK
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [1000, 3 * CHUNK])
+async def test_truncated_body_is_rejected_not_stored(app, storage, size):
+    resp = await upload(app, size, truncated=True)
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Incomplete multipart upload"
+    assert storage.simple == {}
+    assert "length" not in storage.tus
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("filename", ["../../../u2/evil.pdf", "..\\..\\u2\\evil.pdf", "../../../../avatars/evil.pdf"])
+async def test_upload_stays_in_callers_folder(app, storage, filename):
+    resp = await upload(app, 1000, filename=filename)
+    assert resp.status_code == 200
+    (path,) = storage.simple
+    assert path.startswith("/storage/v1/object/documents/u1/") and path.endswith("_evil.pdf")
+    assert resp.json()["filename"].count("/") == 1
+
+    resp = await upload(app, 2 * CHUNK, filename=filename)
+    assert resp.status_code == 200
+    object_name = base64.b64decode(storage.tus["metadata"]["objectName"]).decode()
+    assert object_name.startswith("u1/") and object_name.count("/") == 1
+
+
+def test_safe_filename():
+    assert storage_upload.safe_filename("../../u2/evil.pdf") == "evil.pdf"
+    assert storage_upload.safe_filename("C:\\docs\\form16.pdf") == "form16.pdf"
+    assert storage_upload.safe_filename("..") == "upload"
+    with pytest.raises(ValueError):
+        storage_upload._check_object_name("u1/../u2/evil.pdf")
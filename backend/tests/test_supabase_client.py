@@ -0,0 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+import pytest
+from app import supabase_client
+
+
+@pytest.fixture(autouse=True)
+def fake_create_client(monkeypatch):
+    created = []
+
+    def _create(url, key, options=None):
+        client = MagicMock()
+        created.append((client, options))
+        return client
+
+    monkeypatch.setattr(supabase_client, "create_client", _create)
+    supabase_client.reset_supabase_client()
+    yield created
+    supabase_client.reset_supabase_client()
+
+
+def test_get_supabase_client_is_cached(fake_create_client):
+    first = supabase_client.get_supabase_client()
+    assert supabase_client.get_supabase_client() is first
+    assert len(fake_create_client) == 1
+    options = fake_create_client[0][1]
+    assert options.persist_session is False
+    assert options.auto_refresh_token is False
+
+
+def test_concurrent_first_use_creates_one_client(fake_create_client):
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        clients = list(pool.map(lambda _: supabase_client.get_supabase_client(), range(64)))
+    assert len({id(c) for c in clients}) == 1
+    assert len(fake_create_client) == 1
+
+
+def test_reset_supabase_client_rebuilds(fake_create_client):
+    first = supabase_client.get_supabase_client()
+    supabase_client.reset_supabase_client()
+    assert supabase_client.get_supabase_client() is not first
+    assert len(fake_create_client) == 2
+
+
+def test_create_supabase_client_is_never_cached(fake_create_client):
+    assert supabase_client.create_supabase_client() is not supabase_client.create_supabase_client()
+    assert len(fake_create_client) == 2
@@ -0,0 +1,231 @@
+import datetime
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+pytest.importorskip("aiosqlite")
+fernet = pytest.importorskip("cryptography.fernet")
+from app import database, models, surepass_cache
+from app.auth import verify_jwt_token
+from app.api.v1.endpoints import surepass_epfo, tax_itr
+
+
+class FakeConsents:
+    """Stands in for the Supabase consents table: user -> {source: active}."""
+
+    def __init__(self):
+        self.rows = {}
+
+    async def has_active_consent(self, user_id, source):
+        return any(
+            active and source in surepass_cache.CONSENT_SOURCES.get(s.strip().lower(), ())
+            for s, active in self.rows.get(user_id, {}).items()
+        )
+
+
+@pytest.fixture
+def fake_consents():
+    consents = FakeConsents()
+    consents.rows["u1"] = {"ITR": True}
+    return consents
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path, monkeypatch, fake_consents):
+    engine = database.create_async_db_engine(f"sqlite:///{tmp_path}/cache.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(database.Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    monkeypatch.setattr(surepass_cache, "SUREPASS_CACHE_KEYS", [fernet.Fernet.generate_key().decode()])
+    monkeypatch.setattr(surepass_cache, "SUREPASS_CACHE_HMAC_KEY", "test-hmac-key")
+    monkeypatch.setattr(surepass_cache, "_fernet", None)
+    monkeypatch.setattr(surepass_cache, "_session", factory)
+    monkeypatch.setattr(surepass_cache, "has_active_consent", fake_consents.has_active_consent)
+    yield factory
+    await engine.dispose()
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    calls = []
+
+    async def fake_sp_post(path, payload, **kwargs):
+        calls.append(path)
+        return {"path": path, "pan": payload["pan"], "name": "Asha Rao", "n": len(calls)}
+
+    monkeypatch.setattr(tax_itr, "sp_post", fake_sp_post)
+    monkeypatch.setattr(tax_itr, "store_itr_in_supabase", lambda user_id, data: [{"user_id": user_id}])
+    return calls
+
+
+@pytest_asyncio.fixture
+async def client(session_factory, upstream):
+    async def override_db():
+        async with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(tax_itr.router, prefix="/api/v1/tax-itr")
+    app.include_router(surepass_epfo.router, prefix="/api")
+    app.dependency_overrides[database.get_async_db] = override_db
+    app.dependency_overrides[verify_jwt_token] = lambda: {"sub": "u1"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+        yield c
+
+
+@pytest.mark.asyncio
+async def test_repeat_lookups_are_served_from_encrypted_cache(client, upstream, session_factory):
+    body = {"pan": "ABCDE1234F", "year": "2024"}
+    first = await client.post("/api/v1/tax-itr/surepass/itr/connect", json=body)
+    again = await client.post("/api/v1/tax-itr/surepass/itr/connect", json=body)
+    ais = await client.post("/api/v1/tax-itr/surepass/itr/ais", json=body)
+    assert first.status_code == again.status_code == ais.status_code == 200
+    assert sorted(upstream) == ["/v1/itr/ais", "/v1/pan/comprehensive-plus"]
+    assert ais.json()["data"]["path"] == "/v1/itr/ais"
+
+    async with session_factory() as db:
+        rows = (await db.execute(select(models.SurepassResponseCache))).scalars().all()
+    assert {r.source for r in rows} == {"pan", "ais"}
+    for r in rows:
+        assert "ABCDE1234F" not in r.ciphertext and "Asha" not in r.ciphertext
+        assert "ABCDE1234F" not in r.lookup_key
+
+    # another year is a separate AIS entry; PAN stays cached
+    await client.post("/api/v1/tax-itr/surepass/itr/connect", json={**body, "year": "2023"})
+    assert upstream.count("/v1/itr/ais") == 2 and upstream.count("/v1/pan/comprehensive-plus") == 1
+
+
+@pytest.mark.asyncio
+async def test_force_refresh_bypasses_and_replaces_entry(client, upstream):
+    body = {"pan": "ABCDE1234F", "year": "2024"}
+    await client.post("/api/v1/tax-itr/surepass/itr/ais", json=body)
+    refreshed = await client.post("/api/v1/tax-itr/surepass/itr/ais", json={**body, "force_refresh": True})
+    cached = await client.post("/api/v1/tax-itr/surepass/itr/ais", json=body)
+    assert len(upstream) == 2
+    assert refreshed.json()["data"]["n"] == cached.json()["data"]["n"] == 2
+
+
+@pytest.mark.asyncio
+async def test_raw_json_routes_only_refresh_on_a_real_boolean(client, upstream):
+    body = {"pan": "ABCDE1234F", "year": "2024"}
+    await client.post("/api/v1/tax-itr/surepass/itr/connect", json=body)
+    for flag in ("false", "true", 1):
+        await client.post("/api/v1/tax-itr/surepass/itr/connect", json={**body, "force_refresh": flag})
+    assert len(upstream) == 2
+    await client.post("/api/v1/tax-itr/surepass/itr/connect", json={**body, "force_refresh": True})
+    assert len(upstream) == 4
+
+
+@pytest.mark.asyncio
+async def test_deactivating_consent_drops_cached_responses(client, upstream):
+    body = {"pan": "ABCDE1234F", "year": "2024"}
+    await client.post("/api/v1/tax-itr/surepass/itr/connect", json=body)
+    consent = {"source": "ITR", "scope": "pan,ais", "duration": "1y"}
+    await client.post("/api/consent/upsert", json={**consent, "active": True})
+    await client.post("/api/v1/tax-itr/surepass/itr/connect", json=body)
+    assert len(upstream) == 2
+
+    resp = await client.post("/api/consent/upsert", json={**consent, "active": False})
+    assert resp.status_code == 200
+    await client.post("/api/v1/tax-itr/surepass/itr/connect", json=body)
+    assert len(upstream) == 4
+
+
+@pytest.mark.asyncio
+async def test_consent_revoked_in_supabase_stops_cache_hits(client, upstream, fake_consents):
+    body = {"pan": "ABCDE1234F", "year": "2024"}
+    await client.post("/api/v1/tax-itr/surepass/itr/ais", json=body)
+    await client.post("/api/v1/tax-itr/surepass/itr/ais", json=body)
+    assert len(upstream) == 1
+
+    fake_consents.rows["u1"]["ITR"] = False
+    await client.post("/api/v1/tax-itr/surepass/itr/ais", json=body)
+    assert len(upstream) == 2
+
+
+@pytest.mark.asyncio
+async def test_unconfirmed_consent_is_a_miss(session_factory, monkeypatch):
+    async def unreachable(user_id, source):
+        raise OSError("consents table unreachable")
+
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return {"n": len(calls)}
+
+    await surepass_cache.cached_fetch("pan", "u1", "ABCDE1234F", None, fetch)
+    monkeypatch.setattr(surepass_cache, "has_active_consent", unreachable)
+    assert await surepass_cache.cached_fetch("pan", "u1", "ABCDE1234F", None, fetch) == {"n": 2}
+
+
+@pytest.mark.asyncio
+async def test_expired_and_undecryptable_entries_are_refetched(session_factory, upstream, monkeypatch):
+    async def fetch():
+        return {"fresh": True}
+
+    assert await surepass_cache.cached_fetch("pan", "u1", "ABCDE1234F", None, fetch) == {"fresh": True}
+    async with session_factory() as db:
+        row = (await db.execute(select(models.SurepassResponseCache))).scalar_one()
+        row.expires_at = datetime.datetime.utcnow() - datetime.timedelta(seconds=1)
+        await db.commit()
+
+    async def fetch_again():
+        return {"fresh": 2}
+
+    assert await surepass_cache.cached_fetch("pan", "u1", "ABCDE1234F", None, fetch_again) == {"fresh": 2}
+
+    # a token written under a key that has since been dropped can't be read
+    monkeypatch.setattr(surepass_cache, "lookup_key", lambda source, pan, year=None: "fixed")
+    await surepass_cache._store("u1", "pan", "fixed", {"old": True})
+    monkeypatch.setattr(surepass_cache, "SUREPASS_CACHE_KEYS", [fernet.Fernet.generate_key().decode()])
+    monkeypatch.setattr(surepass_cache, "_fernet", None)
+
+    async def fetch_third():
+        return {"fresh": 3}
+
+    assert await surepass_cache.cached_fetch("pan", "u1", "ABCDE1234F", None, fetch_third) == {"fresh": 3}
+
+
+@pytest.mark.asyncio
+async def test_entries_still_hit_after_key_rotation(session_factory, monkeypatch):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return {"n": len(calls)}
+
+    assert await surepass_cache.cached_fetch("ais", "u1", "ABCDE1234F", "2024", fetch) == {"n": 1}
+    # new key in front, old one kept for decryption
+    rotated = [fernet.Fernet.generate_key().decode()] + surepass_cache.SUREPASS_CACHE_KEYS
+    monkeypatch.setattr(surepass_cache, "SUREPASS_CACHE_KEYS", rotated)
+    monkeypatch.setattr(surepass_cache, "_fernet", None)
+    assert await surepass_cache.cached_fetch("ais", "u1", "ABCDE1234F", "2024", fetch) == {"n": 1}
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_disabled_without_keys(monkeypatch):
+    monkeypatch.setattr(surepass_cache, "SUREPASS_CACHE_KEYS", [])
+    monkeypatch.setattr(surepass_cache, "_fernet", None)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return {}
+
+    await surepass_cache.cached_fetch("pan", "u1", "ABCDE1234F", None, fetch)
+    await surepass_cache.cached_fetch("pan", "u1", "ABCDE1234F", None, fetch)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_disabled_without_hmac_key(monkeypatch):
+    monkeypatch.setattr(surepass_cache, "SUREPASS_CACHE_KEYS", [fernet.Fernet.generate_key().decode()])
+    monkeypatch.setattr(surepass_cache, "SUREPASS_CACHE_HMAC_KEY", "")
+    monkeypatch.setattr(surepass_cache, "_fernet", None)
+    assert not surepass_cache.cache_enabled()
@@ -0,0 +1,133 @@
+import asyncio
+import httpx
+import pytest
+from app import surepass_client
+from app.cache import TTLCache
+
+
+@pytest.fixture(autouse=True)
+def reset_client(monkeypatch):
+    monkeypatch.setattr(surepass_client, "_client", None)
+
+
+@pytest.fixture
+def mock_transport(monkeypatch):
+    calls = {"clients": 0, "requests": []}
+    real_client = httpx.AsyncClient
+
+    def handler(request):
+        calls["requests"].append((request.url.path, request.extensions["timeout"]["read"]))
+        return httpx.Response(200, json={"ok": True})
+
+    def make_client(**kwargs):
+        calls["clients"] += 1
+        return real_client(transport=httpx.MockTransport(handler), **kwargs)
+
+    monkeypatch.setattr(surepass_client.httpx, "AsyncClient", make_client)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_sp_post_reuses_shared_client(mock_transport):
+    assert await surepass_client.sp_post("/v1/epfo/generate-otp", {"uan": "1"}) == {"ok": True}
+    assert await surepass_client.sp_post("/v1/itr/ais", {"pan": "X"}) == {"ok": True}
+    assert mock_transport["clients"] == 1
+    assert mock_transport["requests"] == [("/v1/epfo/generate-otp", 15.0), ("/v1/itr/ais", 60.0)]
+    await surepass_client.close_client()
+
+
+@pytest.mark.asyncio
+async def test_close_client_recreates_on_next_use(mock_transport):
+    first = surepass_client.get_client()
+    await surepass_client.close_client()
+    assert first.is_closed
+    assert surepass_client.get_client() is not first
+    assert mock_transport["clients"] == 2
+    await surepass_client.close_client()
+
+
+def test_get_timeout_falls_back_to_default():
+    timeout = surepass_client.get_timeout("/v1/unknown")
+    assert timeout.read == surepass_client.SUREPASS_DEFAULT_TIMEOUT
+    assert timeout.connect == surepass_client.SUREPASS_CONNECT_TIMEOUT
+
+
+@pytest.fixture
+def slow_upstream(monkeypatch):
+    calls = {"requests": 0, "cancelled": 0, "status": 200}
+    real_client = httpx.AsyncClient
+
+    async def handler(request):
+        calls["requests"] += 1
+        n = calls["requests"]
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            calls["cancelled"] += 1
+            raise
+        return httpx.Response(calls["status"], json={"n": n})
+
+    def make_client(**kwargs):
+        return real_client(transport=httpx.MockTransport(handler), **kwargs)
+
+    monkeypatch.setattr(surepass_client.httpx, "AsyncClient", make_client)
+    monkeypatch.setattr(surepass_client, "_inflight", {})
+    monkeypatch.setattr(surepass_client, "surepass_idempotency_cache", TTLCache())
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_calls_share_one_upstream_request(slow_upstream):
+    results = await asyncio.gather(
+        surepass_client.sp_post("/v1/epfo/passbook", {"uan": "1", "dob": "2000-01-01"}, user_id="u1"),
+        surepass_client.sp_post("/v1/epfo/passbook", {"dob": "2000-01-01", "uan": " 1 "}, user_id="u1"),
+        surepass_client.sp_post("/v1/epfo/passbook", {"uan": "1", "dob": "2000-01-01"}, user_id="u2"),
+    )
+    assert slow_upstream["requests"] == 2
+    assert results[0] == results[1] != results[2]
+    assert surepass_client._inflight == {}
+    # once finished, the same request goes upstream again
+    await surepass_client.sp_post("/v1/epfo/passbook", {"uan": "1", "dob": "2000-01-01"}, user_id="u1")
+    assert slow_upstream["requests"] == 3
+    await surepass_client.close_client()
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_replays_success_but_not_errors(slow_upstream):
+    payload = {"pan": "ABCDE1234F", "mobile": "9999999999"}
+    first = await surepass_client.sp_post("/v1/epfo/generate-otp", payload, user_id="u1", idempotency_key="k1")
+    retry = await surepass_client.sp_post("/v1/epfo/generate-otp", payload, user_id="u1", idempotency_key="k1")
+    assert first == retry and slow_upstream["requests"] == 1
+    # a different key, payload or user is a new request
+    await surepass_client.sp_post("/v1/epfo/generate-otp", payload, user_id="u1", idempotency_key="k2")
+    await surepass_client.sp_post("/v1/epfo/generate-otp", {**payload, "mobile": "8"}, user_id="u1", idempotency_key="k1")
+    await surepass_client.sp_post("/v1/epfo/generate-otp", payload, user_id="u2", idempotency_key="k1")
+    assert slow_upstream["requests"] == 4
+
+    slow_upstream["status"] = 500
+    for _ in range(2):
+        with pytest.raises(surepass_client.SurepassError):
+            await surepass_client.sp_post("/v1/itr/ais", {"pan": "X"}, user_id="u1", idempotency_key="k3")
+    assert slow_upstream["requests"] == 6
+    await surepass_client.close_client()
+
+
+@pytest.mark.asyncio
+async def test_upstream_call_cancelled_only_when_every_caller_leaves(slow_upstream):
+    payload = {"uan": "1"}
+    leaver = asyncio.create_task(surepass_client.sp_post("/v1/epfo/passbook", payload, user_id="u1"))
+    stayer = asyncio.create_task(surepass_client.sp_post("/v1/epfo/passbook", payload, user_id="u1"))
+    await asyncio.sleep(0.01)
+    leaver.cancel()
+    assert await stayer == {"n": 1}
+    assert slow_upstream["cancelled"] == 0
+
+    lone = asyncio.create_task(surepass_client.sp_post("/v1/epfo/passbook", payload, user_id="u1"))
+    await asyncio.sleep(0.01)
+    lone.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await lone
+    await asyncio.sleep(0)
+    assert slow_upstream["cancelled"] == 1
+    assert surepass_client._inflight == {}
+    await surepass_client.close_client()
@@ -12,7 +12,7 @@ def mock_verify_jwt_token(monkeypatch):
 
 
 def test_generate_otp_success(monkeypatch):
-    async def fake_sp_post(path, payload):
+    async def fake_sp_post(path, payload, **kwargs):
         return {"transaction_id": "tx-12345", "status": "OTP_SENT"}
 
     monkeypatch.setattr("backend.app.surepass_client.sp_post", fake_sp_post)
@@ -29,7 +29,7 @@ def test_generate_otp_success(monkeypatch):
 
 
 def test_verify_otp_success(monkeypatch):
-    async def fake_sp_post(path, payload):
+    async def fake_sp_post(path, payload, **kwargs):
         return {"passbook": {"balance": 1000}, "request_id": payload.get("transaction_id")}
 
     monkeypatch.setattr("backend.app.surepass_client.sp_post", fake_sp_post)
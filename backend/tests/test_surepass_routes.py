@@ -0,0 +1,114 @@
+import asyncio
+import time
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from app import surepass_client
+from app.auth import verify_jwt_token
+from app.api.v1.endpoints import tax_itr, epfo
+
+SLOW_UPSTREAM_SECONDS = 0.5
+
+
+@pytest.fixture
+def app(monkeypatch):
+    async def slow_handler(request):
+        await asyncio.sleep(SLOW_UPSTREAM_SECONDS)
+        return httpx.Response(200, json={"name": "Test User", "total_income": 100})
+
+    upstream = httpx.AsyncClient(transport=httpx.MockTransport(slow_handler), base_url=surepass_client.SUREPASS_BASE)
+    monkeypatch.setattr(surepass_client, "_client", upstream)
+    monkeypatch.setattr(tax_itr, "store_itr_in_supabase", lambda user_id, data: [{"user_id": user_id, **data}])
+    monkeypatch.setattr(epfo, "store_epfo_in_supabase", lambda user_id, data: [{"user_id": user_id, **data}])
+
+    test_app = FastAPI()
+    test_app.include_router(tax_itr.router, prefix="/api/v1/tax-itr")
+    test_app.include_router(epfo.router, prefix="/api/v1/epfo")
+    test_app.dependency_overrides[verify_jwt_token] = lambda: {"sub": "test-user-id"}
+
+    @test_app.get("/api/health")
+    async def health():
+        return {"status": "ok"}
+
+    return test_app
+
+
+async def _timed(coro):
+    resp = await coro
+    return resp, time.perf_counter()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path,body", [
+    ("/api/v1/tax-itr/collect", {"user_id": "u1", "pan": "ABCDE1234F", "year": "2024"}),
+    ("/api/v1/tax-itr/surepass/itr/connect", {"pan": "ABCDE1234F", "year": "2024"}),
+    ("/api/v1/tax-itr/surepass/itr/ais", {"pan": "ABCDE1234F", "year": "2024"}),
+    ("/api/v1/epfo/generate-otp", {"user_id": "u1", "uan": "100", "mobile": "9999999999"}),
+    ("/api/v1/epfo/submit-otp", {"user_id": "u1", "uan": "100", "otp": "123456"}),
+])
+async def test_other_routes_keep_flowing_during_slow_surepass_call(app, path, body):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        slow = asyncio.create_task(_timed(client.post(path, json=body)))
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        health = await client.get("/api/health")
+        health_done = time.perf_counter()
+        slow_resp, slow_done = await slow
+
+    assert health.status_code == 200
+    assert slow_resp.status_code == 200
+    # health must not wait behind the in-flight upstream call
+    assert health_done - start < SLOW_UPSTREAM_SECONDS / 2
+    assert health_done < slow_done
+
+
+@pytest.mark.asyncio
+async def test_upstream_error_maps_to_400(app, monkeypatch):
+    async def failing_sp_post(path, payload, **kwargs):
+        raise surepass_client.SurepassError(422, "bad pan")
+
+    monkeypatch.setattr(tax_itr, "sp_post", failing_sp_post)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.post("/api/v1/tax-itr/collect", json={"user_id": "u1", "pan": "X", "year": "2024"})
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "PAN verification failed"
+
+
+@pytest.mark.asyncio
+async def test_pan_and_ais_are_fetched_concurrently(monkeypatch):
+    async def fake_sp_post(path, payload, **kwargs):
+        await asyncio.sleep(SLOW_UPSTREAM_SECONDS)
+        return {"path": path}
+
+    monkeypatch.setattr(tax_itr, "sp_post", fake_sp_post)
+    start = time.perf_counter()
+    pan_data, ais_data = await tax_itr.fetch_pan_and_ais("ABCDE1234F", "2024")
+    elapsed = time.perf_counter() - start
+
+    assert pan_data == {"path": "/v1/pan/comprehensive-plus"}
+    assert ais_data == {"path": "/v1/itr/ais"}
+    assert elapsed < SLOW_UPSTREAM_SECONDS * 1.5
+
+
+@pytest.mark.asyncio
+async def test_pan_failure_cancels_ais(monkeypatch):
+    ais_cancelled = asyncio.Event()
+
+    async def fake_sp_post(path, payload, **kwargs):
+        if path.endswith("/pan/comprehensive-plus"):
+            raise surepass_client.SurepassError(404, "no such pan")
+        try:
+            await asyncio.sleep(SLOW_UPSTREAM_SECONDS)
+        except asyncio.CancelledError:
+            ais_cancelled.set()
+            raise
+        return {}
+
+    monkeypatch.setattr(tax_itr, "sp_post", fake_sp_post)
+    with pytest.raises(HTTPException) as exc:
+        await tax_itr.fetch_pan_and_ais("ABCDE1234F", "2024")
+
+    assert exc.value.detail == "PAN verification failed"
+    assert ais_cancelled.is_set()
@@ -0,0 +1,72 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import storage_upload
+from app.auth import verify_jwt_token
+from app.uploads import CachedStaticFiles
+from app.api.v1.endpoints import assets
+
+
+@pytest.fixture
+def uploads_dir(tmp_path):
+    (tmp_path / "abc_statement.pdf").write_bytes(b"0123456789" * 100)
+    return tmp_path
+
+
+def make_client(directory, **kwargs):
+    app = FastAPI()
+    app.mount("/uploads", CachedStaticFiles(directory=directory, **kwargs), name="uploads")
+    return TestClient(app)
+
+
+def test_serves_with_validators_and_cache_headers(uploads_dir):
+    client = make_client(uploads_dir)
+    resp = client.get("/uploads/abc_statement.pdf")
+    assert resp.status_code == 200
+    assert resp.headers["cache-control"] == "private, max-age=86400, immutable"
+    assert resp.headers["etag"] and resp.headers["last-modified"]
+
+    again = client.get("/uploads/abc_statement.pdf", headers={"If-None-Match": resp.headers["etag"]})
+    assert again.status_code == 304
+    assert again.headers["cache-control"] == "private, max-age=86400, immutable"
+
+
+def test_range_requests_return_partial_content(uploads_dir):
+    client = make_client(uploads_dir)
+    resp = client.get("/uploads/abc_statement.pdf", headers={"Range": "bytes=10-19"})
+    assert resp.status_code == 206
+    assert resp.content == b"0123456789"
+    assert resp.headers["content-range"] == "bytes 10-19/1000"
+
+
+def test_accel_redirect_hands_transfer_to_proxy(uploads_dir):
+    client = make_client(uploads_dir, accel_redirect="/protected-uploads/")
+    resp = client.get("/uploads/abc_statement.pdf")
+    assert resp.status_code == 200
+    assert resp.content == b""
+    assert resp.headers["x-accel-redirect"] == "/protected-uploads/abc_statement.pdf"
+    assert resp.headers["etag"]
+
+
+def test_signed_url_endpoint(monkeypatch):
+    def handler(request: httpx.Request):
+        if request.url.path.endswith("/missing.pdf"):
+            return httpx.Response(400, json={"error": "not_found"})
+        assert request.url.path == "/storage/v1/object/sign/documents/u1/abc_statement.pdf"
+        return httpx.Response(200, json={"signedURL": "/object/sign/documents/u1/abc_statement.pdf?token=t"})
+
+    monkeypatch.setattr(storage_upload, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://storage"))
+    monkeypatch.setenv("SUPABASE_URL", "https://proj.supabase.co")
+    app = FastAPI()
+    app.include_router(assets.router, prefix="/api/v1/assets")
+    app.dependency_overrides[verify_jwt_token] = lambda: {"sub": "u1"}
+    client = TestClient(app)
+
+    resp = client.get("/api/v1/assets/documents/signed-url", params={"filename": "u1/abc_statement.pdf", "expires_in": 60})
+    assert resp.json() == {"url": "https://proj.supabase.co/storage/v1/object/sign/documents/u1/abc_statement.pdf?token=t", "expires_in": 60}
+    assert client.get("/api/v1/assets/documents/signed-url", params={"filename": "u1/missing.pdf"}).status_code == 404
+    # other users' documents are never signed
+    for filename in ("u2/abc_statement.pdf", "abc_statement.pdf", "u1/../u2/abc_statement.pdf"):
+        assert client.get("/api/v1/assets/documents/signed-url", params={"filename": filename}).status_code == 404
@@ -14,6 +14,44 @@ const TILES = [
   { key: "itr", label: "ITR" },
 ];
 
+async function authHeaders() {
+  const { supabase } = await import("../../supabaseClient");
+  const { data } = await supabase.auth.getSession();
+  const t = data?.session?.access_token;
+  return t ? { Authorization: `Bearer ${t}` } : {};
+}
+
+// raw_json can be large, so it is only fetched when the panel is opened
+function EPFORawJson({ summaryId }) {
+  const [raw, setRaw] = useState(undefined);
+  const [error, setError] = useState(null);
+
+  const handleToggle = async (e) => {
+    if (!e.currentTarget.open || raw !== undefined) return;
+    try {
+      const res = await fetch(`/api/epfo/summaries/${summaryId}/raw`, {
+        headers: await authHeaders(),
+      });
+      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      const pj = await res.json();
+      setRaw(pj?.raw ?? null);
+      setError(null);
+    } catch (err) {
+      console.warn("Failed to fetch EPFO raw JSON", err);
+      setError("Could not load raw JSON");
+    }
+  };
+
+  return (
+    <details className="text-xs mt-2" onToggle={handleToggle}>
+      <summary className="cursor-pointer text-blue-600">Show raw JSON</summary>
+      <pre className="text-xs max-h-48 overflow-auto bg-gray-50 p-2 rounded mt-2">
+        {error || (raw === undefined ? "Loading…" : JSON.stringify(raw, null, 2))}
+      </pre>
+    </details>
+  );
+}
+
 export default function DataSourcesStep({ userId }) {
   const [connected, setConnected] = useState([]);
   const [openModal, setOpenModal] = useState(null);
@@ -44,14 +82,8 @@ export default function DataSourcesStep({ userId }) {
       );
       if (hasEPFO) {
         try {
-          const token = (await import("../../supabaseClient")).supabase.auth
-            .getSession()
-            .then((r) => r.data.session?.access_token);
-          const t = await token;
           const res = await fetch("/api/epfo/latest", {
-            headers: {
-              ...(t ? { Authorization: `Bearer ${t}` } : {}),
-            },
+            headers: await authHeaders(),
           });
           if (res.ok) {
             const pj = await res.json();
@@ -163,14 +195,7 @@ export default function DataSourcesStep({ userId }) {
                     </tr>
                   </tbody>
                 </table>
-                <details className="text-xs mt-2">
-                  <summary className="cursor-pointer text-blue-600">
-                    Show raw JSON
-                  </summary>
-                  <pre className="text-xs max-h-48 overflow-auto bg-gray-50 p-2 rounded mt-2">
-                    {JSON.stringify(s.raw, null, 2)}
-                  </pre>
-                </details>
+                <EPFORawJson summaryId={s.id} />
               </div>
             );
           })}
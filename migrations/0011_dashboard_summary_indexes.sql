@@ -0,0 +1,13 @@
+-- Covering indexes for the single-statement dashboard summary query
+-- (backend/app/api/v1/endpoints/dashboard.py DASHBOARD_SUMMARY_SQL).
+-- Each per-table SUM/MAX is answered from the user_id index; INCLUDE lets
+-- the planner use index-only scans once the visibility map is current.
+
+CREATE INDEX IF NOT EXISTS idx_assets_user_id_summary
+  ON public.assets (user_id) INCLUDE (value, updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_liabilities_user_id_summary
+  ON public.liabilities (user_id) INCLUDE (value, updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_epfo_data_user_id_summary
+  ON public.epfo_data (user_id) INCLUDE (balance, updated_at);
@@ -0,0 +1,186 @@
+-- Per-user net worth and asset allocation aggregates, maintained by triggers.
+-- vw_net_worth and vw_asset_allocation used to rescan assets/liabilities for
+-- every profile on each read; they now read these tables instead.
+-- Drift can be checked/repaired with scripts/check_net_worth_aggregates.py or
+-- directly via check_net_worth_aggregates(), check_asset_allocation_aggregates()
+-- and rebuild_net_worth_aggregates().
+
+CREATE TABLE IF NOT EXISTS public.user_net_worth
+(
+  user_id uuid PRIMARY KEY,
+  total_assets numeric NOT NULL DEFAULT 0,
+  total_liabilities numeric NOT NULL DEFAULT 0,
+  updated_at timestamp with time zone NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS public.user_asset_allocation
+(
+  user_id uuid NOT NULL,
+  category text NOT NULL,
+  value numeric NOT NULL DEFAULT 0,
+  asset_count integer NOT NULL DEFAULT 0,
+  updated_at timestamp with time zone NOT NULL DEFAULT now(),
+  PRIMARY KEY (user_id, category)
+);
+
+-- Apply a signed delta to one user's totals. ON CONFLICT takes the row lock,
+-- so concurrent writes for the same user serialise instead of losing updates.
+CREATE OR REPLACE FUNCTION public.apply_net_worth_delta(p_user_id uuid, p_assets numeric, p_liabilities numeric)
+RETURNS void AS $$
+BEGIN
+  IF p_user_id IS NULL OR (p_assets = 0 AND p_liabilities = 0) THEN
+    RETURN;
+  END IF;
+  INSERT INTO public.user_net_worth AS n (user_id, total_assets, total_liabilities)
+  VALUES (p_user_id, p_assets, p_liabilities)
+  ON CONFLICT (user_id) DO UPDATE
+    SET total_assets = n.total_assets + EXCLUDED.total_assets,
+        total_liabilities = n.total_liabilities + EXCLUDED.total_liabilities,
+        updated_at = now();
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.apply_allocation_delta(p_user_id uuid, p_category text, p_value numeric, p_count integer)
+RETURNS void AS $$
+BEGIN
+  IF p_user_id IS NULL THEN
+    RETURN;
+  END IF;
+  INSERT INTO public.user_asset_allocation AS a (user_id, category, value, asset_count)
+  VALUES (p_user_id, COALESCE(p_category, 'Other'), p_value, p_count)
+  ON CONFLICT (user_id, category) DO UPDATE
+    SET value = a.value + EXCLUDED.value,
+        asset_count = a.asset_count + EXCLUDED.asset_count,
+        updated_at = now();
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.trg_assets_net_worth()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM public.apply_net_worth_delta(OLD.user_id, -COALESCE(OLD.amount, 0), 0);
+    PERFORM public.apply_allocation_delta(OLD.user_id, OLD.category, -COALESCE(OLD.amount, 0), -1);
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM public.apply_net_worth_delta(NEW.user_id, COALESCE(NEW.amount, 0), 0);
+    PERFORM public.apply_allocation_delta(NEW.user_id, NEW.category, COALESCE(NEW.amount, 0), 1);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.trg_liabilities_net_worth()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM public.apply_net_worth_delta(OLD.user_id, 0, -COALESCE(OLD.outstanding_amount, 0));
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM public.apply_net_worth_delta(NEW.user_id, 0, COALESCE(NEW.outstanding_amount, 0));
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS assets_net_worth ON public.assets;
+CREATE TRIGGER assets_net_worth
+AFTER INSERT OR DELETE OR UPDATE OF user_id, amount, category ON public.assets
+FOR EACH ROW EXECUTE FUNCTION public.trg_assets_net_worth();
+
+DROP TRIGGER IF EXISTS liabilities_net_worth ON public.liabilities;
+CREATE TRIGGER liabilities_net_worth
+AFTER INSERT OR DELETE OR UPDATE OF user_id, outstanding_amount ON public.liabilities
+FOR EACH ROW EXECUTE FUNCTION public.trg_liabilities_net_worth();
+
+-- Full recomputation from the base tables. Rows that disagree with the
+-- aggregates are returned by check_net_worth_aggregates() and
+-- check_asset_allocation_aggregates().
+CREATE OR REPLACE VIEW public.vw_net_worth_expected AS
+SELECT
+  u.user_id,
+  COALESCE(a.total, 0)::numeric AS total_assets,
+  COALESCE(l.total, 0)::numeric AS total_liabilities
+FROM (
+  SELECT user_id FROM public.assets
+  UNION
+  SELECT user_id FROM public.liabilities
+) u
+LEFT JOIN (SELECT user_id, SUM(COALESCE(amount, 0)) AS total FROM public.assets GROUP BY user_id) a ON a.user_id = u.user_id
+LEFT JOIN (SELECT user_id, SUM(COALESCE(outstanding_amount, 0)) AS total FROM public.liabilities GROUP BY user_id) l ON l.user_id = u.user_id
+WHERE u.user_id IS NOT NULL;
+
+CREATE OR REPLACE FUNCTION public.check_net_worth_aggregates()
+RETURNS TABLE (user_id uuid, expected_assets numeric, actual_assets numeric, expected_liabilities numeric, actual_liabilities numeric) AS $$
+  SELECT
+    COALESCE(e.user_id, n.user_id),
+    COALESCE(e.total_assets, 0),
+    COALESCE(n.total_assets, 0),
+    COALESCE(e.total_liabilities, 0),
+    COALESCE(n.total_liabilities, 0)
+  FROM public.vw_net_worth_expected e
+  FULL OUTER JOIN public.user_net_worth n ON n.user_id = e.user_id
+  WHERE COALESCE(e.total_assets, 0) <> COALESCE(n.total_assets, 0)
+     OR COALESCE(e.total_liabilities, 0) <> COALESCE(n.total_liabilities, 0);
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE VIEW public.vw_asset_allocation_expected AS
+SELECT user_id, COALESCE(category, 'Other') AS category, SUM(COALESCE(amount, 0))::numeric AS value, COUNT(*)::integer AS asset_count
+FROM public.assets
+WHERE user_id IS NOT NULL
+GROUP BY user_id, COALESCE(category, 'Other');
+
+-- Trigger deltas leave (0, 0) rows behind when a category empties; those
+-- match a missing expected row and aren't reported.
+CREATE OR REPLACE FUNCTION public.check_asset_allocation_aggregates()
+RETURNS TABLE (user_id uuid, category text, expected_value numeric, actual_value numeric, expected_count integer, actual_count integer) AS $$
+  SELECT
+    COALESCE(e.user_id, a.user_id),
+    COALESCE(e.category, a.category),
+    COALESCE(e.value, 0),
+    COALESCE(a.value, 0),
+    COALESCE(e.asset_count, 0),
+    COALESCE(a.asset_count, 0)
+  FROM public.vw_asset_allocation_expected e
+  FULL OUTER JOIN public.user_asset_allocation a ON a.user_id = e.user_id AND a.category = e.category
+  WHERE COALESCE(e.value, 0) <> COALESCE(a.value, 0)
+     OR COALESCE(e.asset_count, 0) <> COALESCE(a.asset_count, 0);
+$$ LANGUAGE sql STABLE;
+
+-- Rebuild both aggregate tables from scratch. Locks the base tables against
+-- writes for the duration so no trigger delta is lost mid-rebuild.
+CREATE OR REPLACE FUNCTION public.rebuild_net_worth_aggregates()
+RETURNS void AS $$
+BEGIN
+  LOCK TABLE public.assets, public.liabilities IN SHARE MODE;
+  DELETE FROM public.user_net_worth;
+  INSERT INTO public.user_net_worth (user_id, total_assets, total_liabilities)
+  SELECT user_id, total_assets, total_liabilities FROM public.vw_net_worth_expected;
+  DELETE FROM public.user_asset_allocation;
+  INSERT INTO public.user_asset_allocation (user_id, category, value, asset_count)
+  SELECT user_id, category, value, asset_count FROM public.vw_asset_allocation_expected;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT public.rebuild_net_worth_aggregates();
+
+-- Re-point the dashboard views at the aggregates. Column names and types are
+-- unchanged so existing readers keep working.
+CREATE OR REPLACE VIEW public.vw_net_worth AS
+SELECT
+  p.id AS user_id,
+  COALESCE(n.total_assets, 0)::numeric AS total_assets,
+  COALESCE(n.total_liabilities, 0)::numeric AS total_liabilities,
+  (COALESCE(n.total_assets, 0) - COALESCE(n.total_liabilities, 0))::numeric AS net_worth,
+  now() AS as_of_date
+FROM public.profiles p
+LEFT JOIN public.user_net_worth n ON n.user_id = p.id;
+
+CREATE OR REPLACE VIEW public.vw_asset_allocation AS
+SELECT
+  user_id,
+  category,
+  value::numeric AS value,
+  now() AS as_of_date
+FROM public.user_asset_allocation
+WHERE asset_count > 0;
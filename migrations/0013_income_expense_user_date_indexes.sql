@@ -0,0 +1,10 @@
+-- Keyset pagination for GET /api/income and /api/expenses
+-- (backend/app/pagination.py record_query). Listings filter on user_id and
+-- walk (date, id) newest first, so each page is a range scan of these
+-- indexes instead of a full per-user sort.
+
+CREATE INDEX IF NOT EXISTS idx_income_records_user_date
+  ON public.income_records (user_id, date_received DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_expense_records_user_date
+  ON public.expense_records (user_id, date_incurred DESC, id DESC);
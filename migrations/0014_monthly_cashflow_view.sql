@@ -0,0 +1,22 @@
+-- vw_monthly_cashflow (0001_dashboard_views.sql) emitted one income row and
+-- one expense row per month via UNION ALL. Merge them so each (user, month)
+-- is a single row, and expose month_start for ordering/range filters.
+-- Column names and order are unchanged; month_start is appended.
+
+CREATE OR REPLACE VIEW public.vw_monthly_cashflow AS
+SELECT
+    user_id,
+    to_char(month_start, 'Mon YYYY') AS month,
+    SUM(income) AS income,
+    SUM(expenses) AS expenses,
+    month_start::date AS month_start
+FROM (
+    SELECT user_id, date_trunc('month', date_received) AS month_start, SUM(amount) AS income, 0::numeric AS expenses
+    FROM public.income_records
+    GROUP BY user_id, date_trunc('month', date_received)
+    UNION ALL
+    SELECT user_id, date_trunc('month', date_incurred) AS month_start, 0::numeric AS income, SUM(amount) AS expenses
+    FROM public.expense_records
+    GROUP BY user_id, date_trunc('month', date_incurred)
+) per_table
+GROUP BY user_id, month_start;
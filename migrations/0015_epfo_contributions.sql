@@ -0,0 +1,25 @@
+-- Migration: create epfo_contributions
+-- EPFO contribution ledger as rows instead of per-fetch JSON blobs
+-- (backend/app/epfo_contributions.py). Lives in the application database
+-- next to epfo_summaries (0008) and is written and read through the same
+-- SQLAlchemy session, including the dashboard's contributions total.
+-- One row per user, UAN, member id (one per employer) and wage month;
+-- re-fetching a passbook upserts on the unique key. Charts, per-FY totals
+-- and the dashboard total are range scans of the (user_id, month) index.
+
+CREATE TABLE IF NOT EXISTS epfo_contributions
+(
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  user_id VARCHAR(36) NOT NULL,
+  uan VARCHAR(32) NOT NULL,
+  member_id VARCHAR(64) NOT NULL DEFAULT '',
+  establishment VARCHAR(255),
+  month DATE NOT NULL,
+  employee_share DECIMAL(14, 2) NOT NULL DEFAULT 0,
+  employer_share DECIMAL(14, 2) NOT NULL DEFAULT 0,
+  pension_share DECIMAL(14, 2) NOT NULL DEFAULT 0,
+  transaction_id VARCHAR(128),
+  updated_at TIMESTAMP NULL,
+  UNIQUE KEY uq_epfo_contributions_user_uan_member_month (user_id, uan, member_id, month),
+  KEY idx_epfo_contributions_user_month (user_id, month)
+);
@@ -0,0 +1,8 @@
+-- Migration: index epfo_summaries for keyset pagination
+-- GET /api/epfo/summaries and /api/epfo/latest
+-- (backend/app/api/v1/endpoints/surepass_epfo.py summaries_query) filter on
+-- user_id and walk (created_at, id) newest first, so a page is a bounded
+-- range scan and latest reads a single index entry, without sorting the
+-- user's history or touching raw_json. Same database and dialect as 0008.
+
+CREATE INDEX idx_epfo_summaries_user_created ON epfo_summaries (user_id, created_at, id);
@@ -0,0 +1,20 @@
+-- Migration: create surepass_response_cache
+-- Encrypted cache of Surepass PAN / AIS responses
+-- (backend/app/surepass_cache.py), read and written through the SQLAlchemy
+-- session, so it lives in the application database next to 0008's tables.
+-- ciphertext is a Fernet token and lookup_key an HMAC of source, PAN and
+-- year, so no PII is stored in the clear. Rows are looked up by the unique
+-- key, replaced on refresh, and deleted per user and source when the
+-- matching consent is deactivated.
+
+CREATE TABLE IF NOT EXISTS surepass_response_cache
+(
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  user_id VARCHAR(36) NOT NULL,
+  source VARCHAR(32) NOT NULL,
+  lookup_key VARCHAR(64) NOT NULL,
+  ciphertext MEDIUMTEXT NOT NULL,
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  expires_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE KEY uq_surepass_response_cache_lookup (user_id, source, lookup_key)
+);
@@ -0,0 +1,57 @@
+"""Check (and optionally rebuild) the trigger-maintained net worth aggregates.
+
+Compares user_net_worth and user_asset_allocation against a full
+recomputation from assets/liabilities (migrations/0012_net_worth_aggregates.sql)
+and reports any drift.
+
+Usage:
+    SUPABASE_DB_URL=postgresql://... python scripts/check_net_worth_aggregates.py [--rebuild]
+
+Exits non-zero when drift is found and --rebuild was not given.
+"""
+import os
+import sys
+import argparse
+import psycopg2
+
+
+def check(cur):
+    cur.execute("SELECT * FROM public.check_net_worth_aggregates()")
+    net_worth = cur.fetchall()
+    cur.execute("SELECT * FROM public.check_asset_allocation_aggregates()")
+    return net_worth, cur.fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rebuild", action="store_true", help="rebuild aggregates from scratch when drift is found")
+    args = parser.parse_args()
+
+    db_url = os.environ.get("SUPABASE_DB_URL") or os.environ.get("DATABASE_URL")
+    if not db_url:
+        print("ERROR: SUPABASE_DB_URL or DATABASE_URL must be set")
+        return 2
+
+    conn = psycopg2.connect(db_url)
+    try:
+        with conn, conn.cursor() as cur:
+            drift, allocation_drift = check(cur)
+            for user_id, exp_a, act_a, exp_l, act_l in drift:
+                print(f"drift user={user_id} assets expected={exp_a} actual={act_a} liabilities expected={exp_l} actual={act_l}")
+            for user_id, category, exp_v, act_v, exp_n, act_n in allocation_drift:
+                print(f"drift user={user_id} category={category} value expected={exp_v} actual={act_v} count expected={exp_n} actual={act_n}")
+            print(f"{len(drift)} user(s) out of sync, {len(allocation_drift)} allocation row(s) out of sync")
+            if not drift and not allocation_drift:
+                return 0
+            if not args.rebuild:
+                return 1
+            cur.execute("SELECT public.rebuild_net_worth_aggregates()")
+            remaining, allocation_remaining = check(cur)
+            print(f"rebuilt aggregates; {len(remaining)} user(s), {len(allocation_remaining)} allocation row(s) out of sync after rebuild")
+            return 1 if remaining or allocation_remaining else 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())